@@ -1,60 +0,0 @@
-from flask import Flask, request, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_cors import CORS
-import os
-import logging
-
-# Import models and routes
-from models import db
-from routes.students import students_bp
-from routes.fee import fee_bp
-from config import Config, config
-
-# Configure logging with more detail
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-# Initialize Flask app
-app = Flask(__name__)
-
-# Load configuration based on environment
-env = os.getenv('FLASK_ENV', 'development')
-app.config.from_object(config[env])
-
-# Initialize extensions with app
-db.init_app(app)
-migrate = Migrate(app, db)
-
-# Enable CORS for all routes
-CORS(app,
-     resources={
-         r"/api/*": {
-             "origins": ["http://localhost:3000"],
-             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-             "allow_headers": ["Content-Type", "Authorization"],
-             "supports_credentials": True
-         }
-     })
-
-# Register blueprints
-app.register_blueprint(students_bp)
-app.register_blueprint(fee_bp)
-
-@app.route('/')
-def hello_world():
-    return 'Hello, World!'
-
-# Create tables on startup
-with app.app_context():
-    try:
-        db.create_all()
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Error creating database tables: {str(e)}")
-
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8080, debug=True)
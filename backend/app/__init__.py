@@ -1,41 +1,99 @@
+import os
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_cors import CORS
-from flask_jwt_extended import JWTManager
-from config import Config
+from config import config
 
-db = SQLAlchemy()
-migrate = Migrate()
-jwt = JWTManager()
+# Alembic revisions for `flask db`, wherever the command is run from.
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Blueprints mounted by create_app as (module, attribute, url_prefix);
+# None keeps the prefix the blueprint declares.
+BLUEPRINTS = [
+    ('routes.students', 'students_bp', None),
+    ('routes.fee', 'fee_bp', None),
+    ('routes.export', 'export_bp', None),
+    ('routes.dashboard', 'dashboard_bp', None),
+    ('routes.reports', 'reports_bp', None),
+    ('routes.debug', 'debug_bp', None),
+    ('app.routes.auth', 'bp', '/api/auth'),
+]
+
+
+def create_app(config_name=None, overrides=None):
+    """Build the API with its configuration, extensions and blueprints.
+
+    `config_name` picks an entry of config.config (FLASK_ENV when omitted);
+    `overrides` is applied on top. No schema work happens here: migrations
+    (`flask db upgrade`) and `flask init-db` own the database, so building
+    an app, in a worker or a test, never touches the schema. Route modules
+    and extensions are imported here rather than at package import.
+    """
+    from importlib import import_module
+    from flask_cors import CORS
+    from flask_jwt_extended import JWTManager
+    from flask_migrate import Migrate
+    from sqlalchemy.orm import configure_mappers
+    from models import db
+    from models.storage import init_db
+    from models.cache import init_cache
+    from utils.metrics import init_metrics
+    from utils.compression import init_compression
+    from utils.ratelimit import init_ratelimit, EXPOSED_HEADERS
+    from utils.logging_setup import init_logging
+    from services.credentials import init_credentials
+    from services.revocation import init_revocation
+    from commands import register_commands
 
-def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(config_class)
-
-    # Initialize extensions
-    db.init_app(app)
-    migrate.init_app(app, db)
-    
-    # Configure CORS
-    CORS(app, resources={
-        r"/*": {
-            "origins": ["http://localhost:3000"],
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
-            "supports_credentials": True
-        }
-    })
-    
-    jwt.init_app(app)
-
-    # Register blueprints
-    from app.routes import auth
-    
-    app.register_blueprint(auth.bp)
-
-    @app.route('/health')
-    def health_check():
-        return {'status': 'healthy'}
+    app.config.from_object(config[config_name or os.getenv('FLASK_ENV', 'development')])
+    if overrides:
+        app.config.update(overrides)
+    init_logging(app)
+
+    init_db(app)
+    init_cache(app)
+    init_metrics(app)
+    init_ratelimit(app)
+    init_compression(app)
+    init_credentials(app)
+    init_revocation(app, JWTManager(app))
+    Migrate(app, db, directory=MIGRATIONS)
+
+    CORS(app,
+         resources={
+             r"/api/*": {
+                 "origins": app.config['CORS_ORIGINS'],
+                 "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+                 "allow_headers": ["Content-Type", "Authorization"],
+                 "expose_headers": list(EXPOSED_HEADERS),
+                 "supports_credentials": True
+             }
+         })
+
+    for module, attribute, url_prefix in BLUEPRINTS:
+        app.register_blueprint(getattr(import_module(module), attribute), url_prefix=url_prefix)
 
+    register_commands(app)
+
+    @app.route('/')
+    def hello_world():
+        return 'Hello, World!'
+
+    # Otherwise done by the first query; a preloading master does it once
+    # for every worker.
+    configure_mappers()
     return app
+
+
+def after_fork(app):
+    """Per-worker setup for an app built before forking (gunicorn preload).
+
+    Pooled connections must not be shared between processes, and the
+    logging listener thread does not survive the fork.
+    """
+    from models import db
+    from utils.logging_setup import configure_logging
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    configure_logging(app.config)
@@ -0,0 +1,264 @@
+"""Async read path: the student and fee GET endpoints as an ASGI app.
+
+Serves GET/HEAD for
+
+    /api/students                  (list, search, cursor pages)
+    /api/students/<id>
+    /api/students/<id>/fees
+    /api/fee-types
+
+with the same queries, bytes, validators, CORS, rate limits and
+compression as the Flask views, but on an event loop: a request waiting
+for SQLite holds a coroutine, not a thread, so a worker keeps accepting
+connections during a spike instead of queueing them behind worker x
+threads. Queries run on
+the read-only engine from a bounded set of threads (models/async_pool.py).
+
+Everything else, writes included, stays on the gunicorn app; route these
+paths to `uvicorn asgi:app` (or gunicorn with uvicorn workers) in front.
+"""
+import logging
+import time
+from urllib.parse import parse_qsl
+
+from sqlalchemy import func, select
+from werkzeug.datastructures import Headers, MultiDict
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from werkzeug.http import http_date, parse_accept_header, parse_date, parse_etags
+from werkzeug.routing import Map, Rule
+
+from app import create_app
+from utils.conditional import CACHE_CONTROL, make_etag, validators_match
+from utils.logging_setup import REQUEST_ID_HEADER, resolve_request_id
+from utils.ratelimit import EXPOSED_HEADERS, rate_limit_headers
+from utils.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ('GET', 'HEAD')
+
+# Endpoint names match the Flask views, so rate-limit budgets apply alike.
+ROUTES = Map([
+    Rule('/api/students', endpoint='students.get_students', methods=READ_METHODS),
+    Rule('/api/students/<int:student_id>', endpoint='students.get_student', methods=READ_METHODS),
+    Rule('/api/students/<int:student_id>/fees', endpoint='fee.get_student_fees', methods=READ_METHODS),
+    Rule('/api/fee-types', endpoint='fee.get_fee_types', methods=READ_METHODS),
+])
+
+
+class ReadRequest:
+    """The parts of an ASGI request the handlers and the rate limiter use."""
+
+    def __init__(self, scope, endpoint):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.endpoint = endpoint
+        self.blueprint = endpoint.split('.', 1)[0] if endpoint else None
+        self.args = MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True))
+        self.headers = Headers([(name.decode('latin-1'), value.decode('latin-1'))
+                                for name, value in scope.get('headers', ())])
+        client = scope.get('client')
+        self.remote_addr = client[0] if client else None
+
+    def not_modified(self, etag, last_modified):
+        return validators_match(parse_etags(self.headers.get('If-None-Match')),
+                                parse_date(self.headers.get('If-Modified-Since')), etag, last_modified)
+
+
+class Reply:
+    __slots__ = ('status', 'body', 'headers')
+
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self.body = dumps(payload) + b'\n' if payload is not None else b''
+        self.headers = headers or {}
+
+
+def _validator_headers(etag, last_modified):
+    headers = {'ETag': f'W/"{etag}"', 'Cache-Control': CACHE_CONTROL}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.replace(microsecond=0))
+    return headers
+
+
+def create_asgi_app(config_name=None, overrides=None):
+    """Build the async read app on the same configuration as create_app.
+
+    A Flask app is still built: the handlers use its configuration, its
+    rate limiter and the ORM to build (never run) their queries.
+    """
+    from models import db, Student, FeeType
+    from models.async_pool import AsyncReader
+    from models.session import READER_BIND
+    from models.serializers import student_serializer, fee_type_serializer, parse_fields
+    from routes.students import plan_student_list, CREATED_AT, UPDATED_AT
+    from services.ledger import ledger_plan, ledger_filters, payments_statement
+    from services.ledger import ledger_validator_statement, validator_from_row
+
+    flask_app = create_app(config_name, overrides)
+    with flask_app.app_context():
+        engines = db.engines
+        engine = engines.get(READER_BIND, engines[None])
+    pool = AsyncReader(engine, size=flask_app.config.get('ASYNC_READ_POOL_SIZE', 8))
+    limiter = flask_app.extensions.get('ratelimit')
+    compressor = flask_app.extensions.get('compression')
+    origins = set(flask_app.config.get('CORS_ORIGINS', ()))
+
+    async def get_students(request):
+        with flask_app.app_context():
+            try:
+                rows_query, count_query, total_mode, _, finish = plan_student_list(request.args)
+            except ValueError as ve:
+                return Reply(400, {'error': str(ve)})
+            rows_statement = rows_query.statement
+            count_statement = None
+            if total_mode != 'off':
+                # 'cached' counts are a per-process cache of the sync workers; count here.
+                count_statement = select(func.count()).select_from(count_query.order_by(None).statement.subquery())
+        total = await pool.scalar(count_statement) if count_statement is not None else None
+        return Reply(200, finish(await pool.all(rows_statement), total))
+
+    async def get_student(request, student_id):
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            keys = student_serializer.project(fields).keys
+        except ValueError as ve:
+            return Reply(400, {'error': str(ve)})
+        row = await pool.first(select(*student_serializer.columns).where(Student.id == student_id))
+        if row is None:
+            return Reply(404, {'error': 'Student not found'})
+        last_modified = row[UPDATED_AT] or row[CREATED_AT]
+        etag = make_etag('student', student_id, last_modified, fields)
+        headers = _validator_headers(etag, last_modified)
+        if request.not_modified(etag, last_modified):
+            return Reply(304, headers=headers)
+        data = student_serializer(row)
+        if fields:
+            data = {key: data[key] for key in keys}
+        return Reply(200, {'data': data}, headers)
+
+    async def get_student_fees(request, student_id):
+        include_payments = 'payments' in set(filter(None, request.args.get('include', '').split(',')))
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            plan = ledger_plan(fields)
+            academic_year, paid_from, paid_to, include_archived = filters = ledger_filters(request.args)
+        except ValueError as ve:
+            return Reply(400, {'error': str(ve)})
+        validator = validator_from_row(await pool.first(ledger_validator_statement(student_id, include_archived)))
+        if validator is None:
+            return Reply(404, {'error': 'Student not found'})
+        fee_count, amount_paid, last_modified = validator
+        etag = make_etag('fees', student_id, include_payments, fee_count, amount_paid, last_modified, fields, filters)
+        headers = _validator_headers(etag, last_modified)
+        if request.not_modified(etag, last_modified):
+            return Reply(304, headers=headers)
+        rows = await pool.all(plan.statement(student_id, academic_year, include_archived))
+        payments = None
+        if include_payments and plan.payments:
+            fee_ids = [row[-1] for row in rows]
+            payments = await pool.all(payments_statement(fee_ids, paid_from, paid_to, include_archived)) if rows else []
+        return Reply(200, {'fees': plan.shape(rows, payments)}, headers)
+
+    async def get_fee_types(request):
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            serializer = fee_type_serializer.project(fields)
+        except ValueError as ve:
+            return Reply(400, {'error': str(ve)})
+        count, last_modified = await pool.first(select(
+            func.count(FeeType.id), func.max(func.coalesce(FeeType.updated_at, FeeType.created_at))
+        ))
+        etag = make_etag('fee-types', count, last_modified, fields)
+        headers = _validator_headers(etag, last_modified)
+        if request.not_modified(etag, last_modified):
+            return Reply(304, headers=headers)
+        fee_types = await pool.all(select(*serializer.columns))
+        return Reply(200, {'fee_types': serializer.many(fee_types)}, headers)
+
+    handlers = {
+        'students.get_students': get_students,
+        'students.get_student': get_student,
+        'fee.get_student_fees': get_student_fees,
+        'fee.get_fee_types': get_fee_types,
+    }
+    adapter = ROUTES.bind('')
+
+    async def dispatch(scope):
+        if scope['method'] == 'OPTIONS':
+            return Reply(204, headers={
+                'Access-Control-Allow-Methods': ', '.join(READ_METHODS),
+                'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+            })
+        try:
+            endpoint, params = adapter.match(scope['path'], method=scope['method'])
+        except NotFound:
+            return Reply(404, {'error': 'Not found'})
+        except MethodNotAllowed:
+            return Reply(405, {'error': 'Method not allowed'}, {'Allow': ', '.join(READ_METHODS)})
+
+        request = ReadRequest(scope, endpoint)
+        state = None
+        if limiter is not None:
+            with flask_app.app_context():
+                allowed, state = limiter.check(request)
+            if not allowed:
+                return Reply(429, {'error': 'Too many requests, please slow down'},
+                                      rate_limit_headers(state))
+        try:
+            reply = await handlers[endpoint](request, **params)
+        except Exception as e:
+            logger.error("Error in async %s: %s", endpoint, e, exc_info=True)
+            reply = Reply(500, {'error': str(e)})
+        if state is not None:
+            reply.headers.update(rate_limit_headers(state))
+        return reply
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    pool.close()
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+
+        started = time.perf_counter()
+        reply = await dispatch(scope)
+        incoming = dict(scope.get('headers', ()))
+        body = reply.body
+        vary = []
+        origin = incoming.get(b'origin', b'').decode('latin-1')
+        if origin in origins:
+            vary.append('Origin')
+        if compressor is not None and reply.status != 304 and len(body) >= compressor.min_size:
+            vary.append('Accept-Encoding')
+            encoding = compressor.negotiate(parse_accept_header(incoming.get(b'accept-encoding', b'').decode('latin-1')))
+            if encoding is not None:
+                etag = reply.headers.get('ETag') if reply.status == 200 else None
+                body = compressor.encode(scope['path'], body, encoding, etag)
+                reply.headers['Content-Encoding'] = encoding
+        headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+        headers += [(name.lower().encode('latin-1'), str(value).encode('latin-1')) for name, value in reply.headers.items()]
+        request_id = resolve_request_id(incoming.get(REQUEST_ID_HEADER.lower().encode(), b'').decode('latin-1'))
+        headers.append((REQUEST_ID_HEADER.lower().encode(), request_id.encode()))
+        if origin in origins:
+            headers += [(b'access-control-allow-origin', origin.encode('latin-1')),
+                        (b'access-control-allow-credentials', b'true'),
+                        (b'access-control-expose-headers', ', '.join(EXPOSED_HEADERS).encode())]
+        if vary:
+            headers.append((b'vary', ', '.join(vary).encode()))
+        await send({'type': 'http.response.start', 'status': reply.status, 'headers': headers})
+        if scope['method'] == 'HEAD' or reply.status == 304:
+            body = b''
+        await send({'type': 'http.response.body', 'body': body})
+        logger.debug("%s %s %s %.1fms [%s]", scope['method'], scope['path'], reply.status,
+                     (time.perf_counter() - started) * 1000, request_id)
+
+    app.flask_app = flask_app
+    app.pool = pool
+    return app
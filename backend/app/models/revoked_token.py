@@ -0,0 +1,16 @@
+from models import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    """A revoked JWT, kept until the token would have expired anyway."""
+    __tablename__ = 'revoked_tokens'
+    # Workers poll for rows above the last id they saw, so ids must never
+    # be reused after a purge.
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    token_type = db.Column(db.String(10), nullable=False)  # access, refresh
+    user_id = db.Column(db.Integer)
+    expires_at = db.Column(db.DateTime, index=True)  # None: the token never expires
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
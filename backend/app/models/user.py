@@ -1,5 +1,5 @@
-from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from models import db
+from services.credentials import credentials
 from datetime import datetime
 
 class User(db.Model):
@@ -13,11 +13,12 @@ class User(db.Model):
     last_login = db.Column(db.DateTime)
     is_active = db.Column(db.Boolean, default=True)
 
+    # Both run on the credential service's pool and may raise HashingBusy.
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = credentials.hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return credentials.check_password(self.password_hash, password)
 
     def to_dict(self):
         return {
@@ -8,10 +8,33 @@ from flask_jwt_extended import (
 )
 from datetime import datetime, timedelta
 from app.models.user import User
-from app import db
+from models import db
+from models.cache import auth_users
+from services.credentials import credentials, HashingBusy
+from services.revocation import revocations
 
 bp = Blueprint('auth', __name__)
 
+
+def _busy(e):
+    response = jsonify({'message': str(e)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
+def _cached_user(user_id):
+    """The user's to_dict() for a token identity, cached for AUTH_USER_CACHE_TTL.
+
+    Writes to the user drop the entry (models/cache.py), so a changed or
+    deactivated account is seen at once by this worker and within the TTL
+    by the others.
+    """
+    def load():
+        user = db.session.get(User, user_id)
+        return tuple(user.to_dict().items()) if user else None
+    row = auth_users.get_or_load(user_id, load)
+    return dict(row) if row is not None else None
+
 @bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
@@ -21,11 +44,18 @@ def login():
     
     user = User.query.filter_by(email=data['email']).first()
     
-    if not user or not user.check_password(data['password']):
-        return jsonify({'message': 'Invalid email or password'}), 401
-    
-    if not user.is_active:
-        return jsonify({'message': 'Account is deactivated'}), 401
+    try:
+        if not user or not user.check_password(data['password']):
+            return jsonify({'message': 'Invalid email or password'}), 401
+        
+        if not user.is_active:
+            return jsonify({'message': 'Account is deactivated'}), 401
+        
+        # Upgrade hashes made with older parameters while we have the password
+        if credentials.needs_rehash(user.password_hash):
+            user.set_password(data['password'])
+    except HashingBusy as e:
+        return _busy(e)
     
     # Update last login
     user.last_login = datetime.utcnow()
@@ -33,7 +63,7 @@ def login():
     
     # Create tokens
     access_token = create_access_token(
-        identity=user.id,
+        identity=str(user.id),
         additional_claims={
             'email': user.email,
             'role': user.role,
@@ -41,7 +71,7 @@ def login():
             'last_name': user.last_name
         }
     )
-    refresh_token = create_refresh_token(identity=user.id)
+    refresh_token = create_refresh_token(identity=str(user.id))
     
     return jsonify({
         'access_token': access_token,
@@ -52,19 +82,19 @@ def login():
 @bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
 def refresh():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    current_user_id = int(get_jwt_identity())
+    user = _cached_user(current_user_id)
     
-    if not user or not user.is_active:
+    if not user or not user['is_active']:
         return jsonify({'message': 'User not found or inactive'}), 401
     
     access_token = create_access_token(
-        identity=user.id,
+        identity=str(user['id']),
         additional_claims={
-            'email': user.email,
-            'role': user.role,
-            'first_name': user.first_name,
-            'last_name': user.last_name
+            'email': user['email'],
+            'role': user['role'],
+            'first_name': user['first_name'],
+            'last_name': user['last_name']
         }
     )
     
@@ -88,7 +118,10 @@ def register():
         last_name=data['last_name'],
         role=data['role']
     )
-    user.set_password(data['password'])
+    try:
+        user.set_password(data['password'])
+    except HashingBusy as e:
+        return _busy(e)
     
     db.session.add(user)
     db.session.commit()
@@ -98,16 +131,18 @@ def register():
 @bp.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    current_user_id = int(get_jwt_identity())
+    user = _cached_user(current_user_id)
     
     if not user:
         return jsonify({'message': 'User not found'}), 404
     
-    return jsonify(user.to_dict()), 200
+    return jsonify(user), 200
 
 @bp.route('/logout', methods=['POST'])
-@jwt_required()
+@jwt_required(verify_type=False)
 def logout():
-    # In a real application, you might want to blacklist the token here
+    # Revokes the token the request was made with; clients call this with
+    # the access token and again with the refresh token.
+    revocations.revoke(get_jwt())
     return jsonify({'message': 'Successfully logged out'}), 200
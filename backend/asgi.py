@@ -0,0 +1,5 @@
+from app.asgi import create_asgi_app
+
+# Read endpoints on an event loop, next to the gunicorn app for the rest:
+# `uvicorn asgi:app --workers 4`
+app = create_asgi_app()
@@ -0,0 +1,104 @@
+"""Read latency before and after archiving closed academic years.
+
+Usage (from backend/):
+
+    python -m benchmarks.archive_benchmark --students 20000 --years 4
+
+Generates a school with --years academic years of fees, times the fee
+ledger, the dues and defaulters reports, the dashboard and the fees
+export, then archives every year but the latest and times them again:
+once as served by default (live years only) and once with
+include_archived=true. Reports p50/p95 per path and phase, and how long
+archiving and restoring took.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import select
+
+from benchmarks.datagen import generate
+from benchmarks.runner import build_app, percentile
+from models import db, Fee
+from models.storage import write_transaction
+from services.archive import archive_year, restore_year
+
+PHASES = ('before', 'archived', 'include_archived')
+
+
+def paths(rng, students, samples):
+    """(name, [request paths]) per timed path."""
+    return [
+        ('ledger', [f'/api/students/{rng.randint(1, students)}/fees?include=payments' for _ in range(samples)]),
+        ('dues report', ['/api/reports/dues'] * max(samples // 20, 3)),
+        ('defaulters', ['/api/reports/defaulters?limit=50'] * max(samples // 20, 3)),
+        ('dashboard', ['/api/dashboard/stats'] * max(samples // 4, 3)),
+        ('fees export', ['/api/export/fees?format=csv'] * 3),
+    ]
+
+
+def time_requests(client, requests, query=''):
+    latencies = []
+    for path in requests:
+        url = path + ('&' if '?' in path else '?') + query if query else path
+        started = time.perf_counter()
+        response = client.get(url, buffered=False)
+        for _ in response.response:
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, (url, response.status_code)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=20_000)
+    parser.add_argument('--years', type=int, default=4, help='academic years of fees to generate')
+    parser.add_argument('--samples', type=int, default=200, help='ledger requests per phase')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if args.years < 2:
+        parser.error('--years must be at least 2 to have a year to archive')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive.db')
+        counts = generate(path, args.students, args.seed, years=args.years)
+        print(f"{counts['students']} students, {counts['fees']} fees, {counts['payments']} payments")
+        app = build_app(path)
+        client = app.test_client()
+        timed = paths(random.Random(args.seed), args.students, args.samples)
+        results = {}
+
+        def measure(phase, query=''):
+            for name, requests in timed:
+                results[name, phase] = time_requests(client, requests, query)
+
+        with app.app_context():
+            years = sorted(db.session.scalars(select(Fee.academic_year).distinct()))[:-1]
+
+            measure('before')
+            started = time.perf_counter()
+            for year in years:
+                write_transaction(archive_year, year)
+            archive_seconds = time.perf_counter() - started
+            measure('archived')
+            measure('include_archived', 'include_archived=true')
+            started = time.perf_counter()
+            for year in years:
+                write_transaction(restore_year, year)
+            restore_seconds = time.perf_counter() - started
+
+        print(f"archived {', '.join(years)} in {archive_seconds:.2f}s, restored in {restore_seconds:.2f}s")
+        print(f"{'path':<12}" + ''.join(f'{phase + " p50":>22}{"p95":>9}' for phase in PHASES))
+        for name, _ in timed:
+            row = ''.join(
+                f'{percentile(results[name, phase], 0.5):>22.1f}{percentile(results[name, phase], 0.95):>9.1f}'
+                for phase in PHASES
+            )
+            print(f'{name:<12}{row}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""Concurrency and tail latency of the sync workers against the async read path.
+
+Usage (from backend/):
+
+    python -m benchmarks.async_load --target servers --workers 4 --concurrency 16 64 256
+    python -m benchmarks.async_load --target inprocess --threads 16 --concurrency 16 64 256
+
+Clients each issue the read scenarios of benchmarks.runner (student list,
+detail, search, fee ledger) back to back for --duration seconds, at each
+--concurrency level, and every request's latency is recorded from the
+moment it is issued, so time spent queued for a free worker thread counts.
+
+- servers: gunicorn with gunicorn.conf.py (sync, gthread) and uvicorn
+  serving asgi:app, same worker count, driven over keep-alive HTTP
+  connections by an asyncio client;
+- inprocess: no servers needed. The Flask app behind a pool of --threads
+  threads (what workers x threads allows at once) against the ASGI app
+  called on the event loop.
+
+Without --database a school is generated into a temporary file. Only GETs
+are sent, so an existing database is left as it was.
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks.datagen import generate
+from benchmarks.runner import SCENARIOS, load_state, percentile, start_gunicorn
+
+READ_SCENARIOS = ('student_list', 'student_get', 'search', 'fee_ledger')
+
+
+# -- targets -----------------------------------------------------------------
+# A target is an async send(path) -> status.
+
+async def http_target(host, port):
+    """Keep-alive HTTP/1.1 GETs; one connection per concurrent client."""
+    idle = []
+
+    async def open_connection():
+        return await asyncio.open_connection(host, port)
+
+    async def send(path):
+        reader, writer = idle.pop() if idle else await open_connection()
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode('latin-1'))
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length, close = 0, False
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'connection' and value.strip().lower() == 'close':
+                close = True
+        await reader.readexactly(length)
+        if close:
+            writer.close()
+        else:
+            idle.append((reader, writer))
+        return status
+
+    return send
+
+
+def asgi_target(app):
+    async def send(path):
+        url = urlsplit(path)
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': url.path, 'query_string': url.query.encode(),
+            'headers': [], 'client': ('127.0.0.1', 0),
+        }
+        status = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def reply(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        await app(scope, receive, reply)
+        return status[0]
+    return send
+
+
+def threaded_target(app, threads):
+    """The WSGI app with at most `threads` requests in progress, as in gunicorn."""
+    executor = ThreadPoolExecutor(max_workers=threads)
+    local = threading.local()
+
+    def call(path):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        return client.get(path).status_code
+
+    async def send(path):
+        return await asyncio.get_running_loop().run_in_executor(executor, call, path)
+    return send
+
+
+# -- load --------------------------------------------------------------------
+
+async def run_load(send, state, concurrency, duration, seed):
+    latencies = []
+    errors = [0]
+    deadline = time.perf_counter() + duration
+
+    async def client(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            _, path, _ = SCENARIOS[rng.choice(READ_SCENARIOS)](rng, state)
+            started = time.perf_counter()
+            try:
+                status = await send(path)
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                status = 599
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors[0],
+        'throughput': len(ordered) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(ordered, 0.50) * 1000,
+        'p95_ms': percentile(ordered, 0.95) * 1000,
+        'p99_ms': percentile(ordered, 0.99) * 1000,
+    }
+
+
+def start_uvicorn(path, workers, port):
+    env = dict(os.environ, FLASK_ENV='production', DATABASE_URL='sqlite:///' + os.path.abspath(path),
+               RATELIMIT_ENABLED='False')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(workers), '--host', '127.0.0.1',
+         '--port', str(port), '--log-level', 'warning', '--no-access-log'],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            status = asyncio.run(_probe(port))
+            if status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('uvicorn did not come up within 30s')
+
+
+async def _probe(port):
+    send = await http_target('127.0.0.1', port)
+    return await send('/api/fee-types')
+
+
+def print_row(target, concurrency, result):
+    print(f"{target:<8} {concurrency:>5} {result['requests']:>7} {result['errors']:>5} "
+          f"{result['throughput']:>8.0f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', choices=('servers', 'inprocess'), default='servers')
+    parser.add_argument('--workers', type=int, default=4, help='worker processes per server')
+    parser.add_argument('--threads', type=int, default=16, help='inprocess: sync threads (workers x threads)')
+    parser.add_argument('--database', help='existing SQLite file to read from')
+    parser.add_argument('--students', type=int, default=20_000, help='school size when generating')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per level and target')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if args.target == 'servers':
+        missing = [name for name in ('gunicorn', 'uvicorn') if shutil.which(name) is None]
+        if missing:
+            parser.error(f"{' and '.join(missing)} not installed; pip install them or use --target inprocess")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database
+        if path is None:
+            path = os.path.join(tmp, 'school.db')
+            generate(path, args.students, seed=args.seed)
+        state = load_state(path)
+
+        processes = []
+        try:
+            if args.target == 'servers':
+                processes.append(start_gunicorn(path, args.workers, 8097))
+                processes.append(start_uvicorn(path, args.workers, 8098))
+                targets = {'sync': lambda: http_target('127.0.0.1', 8097),
+                           'async': lambda: http_target('127.0.0.1', 8098)}
+            else:
+                from app import create_app
+                from app.asgi import create_asgi_app
+                overrides = {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path, 'RATELIMIT_ENABLED': False}
+                sync_send = threaded_target(create_app('production', overrides), args.threads)
+                async_send = asgi_target(create_asgi_app('production', overrides))
+
+                async def sync_target():
+                    return sync_send
+
+                async def async_target():
+                    return async_send
+                targets = {'sync': sync_target, 'async': async_target}
+
+            print(f"{'target':<8} {'conc':>5} {'req':>7} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>9}")
+            for concurrency in args.concurrency:
+                for name, make_target in targets.items():
+                    async def measure():
+                        send = await make_target()
+                        # Unrecorded warm-up: connections, statement caches.
+                        await run_load(send, state, min(concurrency, 8), 1.0, args.seed)
+                        return await run_load(send, state, concurrency, args.duration, args.seed)
+                    print_row(name, concurrency, asyncio.run(measure()))
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
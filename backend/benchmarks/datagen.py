@@ -0,0 +1,232 @@
+"""Generate a synthetic school straight into a fresh SQLite file.
+
+Usage (from backend/):
+
+    python -m benchmarks.datagen school.db --students 20000 --seed 1
+
+Students are spread over classes 1-12 and sections A-D. Every student gets
+the fee heads that apply to them for each academic year, and each fee is
+paid in installments: most in full, some part way, some not at all. The
+same seed always produces the same school.
+
+The search index and dashboard rollups are rebuilt in one pass after the
+load instead of being maintained row by row by their triggers.
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from flask import Flask
+
+from models import db
+from models.rollups import install_rollups, drop_rollups
+from models.search import install_search_index, drop_search_index
+
+FIRST_NAMES = ['Aarav', 'Diya', 'Sarah', 'John', 'Priya', 'Rahul', 'Ananya', 'Vikram',
+               'Meera', 'Arjun', 'Kavya', 'Rohan', 'Isha', 'Karthik', 'Neha', 'Sreekar',
+               'Aditi', 'Nikhil', 'Pooja', 'Siddharth', 'Lakshmi', 'Varun', 'Tara', 'Manoj',
+               'Emily', 'David', 'Fatima', 'Omar', 'Grace', 'Leo', 'Maya', 'Noah']
+LAST_NAMES = ['Sharma', 'Reddy', 'Smith', 'Doe', 'Iyer', 'Nair', 'Gupta', 'Rao',
+              'Patel', 'Menon', 'Kumar', 'Shodhan', 'Das', 'Joshi', 'Verma', 'Bose',
+              'Pillai', 'Chopra', 'Mehta', 'Kapoor', 'Banerjee', 'Mishra', 'Khan', 'Singh',
+              'Brown', 'Wilson', 'Garcia', 'Lee', 'Thomas', 'Walker', 'Young', 'Hughes']
+
+CLASSES = [str(grade) for grade in range(1, 13)]
+SECTIONS = 'ABCD'
+
+# (name, description, base amount, added per class, share of students, installments)
+FEE_HEADS = [
+    ('Tuition', 'Annual tuition', 12000.0, 1500.0, 1.0, 3),
+    ('Transport', 'School bus', 9000.0, 0.0, 0.4, 3),
+    ('Exam', 'Term examinations', 1800.0, 100.0, 1.0, 2),
+    ('Library', 'Library and lab', 1500.0, 0.0, 1.0, 1),
+    ('Sports', 'Sports and activities', 2500.0, 0.0, 0.6, 1),
+]
+
+# Share of fees paid in full, part way, or not at all.
+PAID_IN_FULL = 0.6
+PAID_PART = 0.25
+
+PAYMENT_METHODS = ['cash', 'card', 'bank', 'upi']
+PAYMENT_METHOD_WEIGHTS = [4, 2, 3, 3]
+_METHOD_CUM_WEIGHTS = list(itertools.accumulate(PAYMENT_METHOD_WEIGHTS))
+
+# Rows per INSERT batch.
+CHUNK = 20_000
+
+
+def build_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db.init_app(app)
+    return app
+
+
+def academic_years(last_year, years):
+    """['2023-2024', '2024-2025'] for last_year='2024-2025', years=2."""
+    start = int(last_year[:4])
+    return [f'{year}-{year + 1}' for year in range(start - years + 1, start + 1)]
+
+
+# Column order of the generated tuples.
+STUDENT_COLUMNS = ('id', 'student_name', 'parents_name', 'roll_number', 'class_name', 'section',
+                   'school_joined_date', 'date_of_birth', 'phone_number', 'created_at')
+FEE_COLUMNS = ('id', 'student_id', 'fee_type_id', 'total_amount', 'amount_paid', 'academic_year', 'created_at')
+PAYMENT_COLUMNS = ('fee_id', 'amount_paid', 'payment_date', 'payment_method', 'remarks', 'reference', 'created_at')
+
+
+def _timestamp(day, hour=0):
+    # SQLAlchemy's SQLite DateTime storage format; rows go in through the
+    # driver, skipping per-value type processing.
+    return f'{day.isoformat()} {hour:02d}:00:00.000000'
+
+
+def _student_rows(rng, count, first_year):
+    """Yield (student tuple, class grade, join date)."""
+    for student_id in range(1, count + 1):
+        joined = date(first_year - rng.randint(0, 6), 6, 1) + timedelta(days=rng.randint(0, 20))
+        grade = rng.randint(1, len(CLASSES))
+        born = date(joined.year - 5 - grade, rng.randint(1, 12), rng.randint(1, 28))
+        row = (
+            student_id,
+            f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            f'{joined.year}{student_id:07d}',
+            CLASSES[grade - 1],
+            rng.choice(SECTIONS),
+            joined.isoformat(),
+            born.isoformat(),
+            f'9{rng.randint(0, 999999999):09d}',
+            _timestamp(joined),
+        )
+        yield row, grade, joined
+
+
+def _fee_rows(rng, enrolled, years, today):
+    """Yield (fee tuple, [payment tuple, ...]) for every student, head and year."""
+    fee_id = 0
+    reference = 0
+    for student_id, grade, joined in enrolled:
+        for year in years:
+            year_start = date(int(year[:4]), 6, 1)
+            if joined > year_start + timedelta(days=30):
+                continue
+            for head_id, (_, _, base, per_class, share, installments) in enumerate(FEE_HEADS, start=1):
+                if share < 1.0 and rng.random() >= share:
+                    continue
+                fee_id += 1
+                total = base + per_class * grade
+                draw = rng.random()
+                if draw < PAID_IN_FULL:
+                    amounts = [round(total / installments, 2)] * installments
+                    amounts[-1] = round(total - sum(amounts[:-1]), 2)
+                elif draw < PAID_IN_FULL + PAID_PART:
+                    if installments > 1:
+                        amounts = [round(total / installments, 2)] * rng.randint(1, installments - 1)
+                    else:
+                        amounts = [round(total * rng.choice((0.25, 0.5, 0.75)), 2)]
+                else:
+                    amounts = []
+
+                payments = []
+                for part, amount in enumerate(amounts):
+                    due = year_start + timedelta(days=part * 365 // installments)
+                    paid_on = min(due + timedelta(days=rng.randint(-10, 45)), today)
+                    method = rng.choices(PAYMENT_METHODS, cum_weights=_METHOD_CUM_WEIGHTS)[0]
+                    reference += 1
+                    payments.append((
+                        fee_id,
+                        amount,
+                        _timestamp(paid_on, 9),
+                        method,
+                        f'Installment {part + 1} of {installments}',
+                        None if method == 'cash' else f'TXN{reference:010d}',
+                        _timestamp(paid_on, 9),
+                    ))
+                fee = (fee_id, student_id, head_id, total, round(sum(amounts), 2), year, _timestamp(year_start))
+                yield fee, payments
+
+
+def _insert(connection, table, columns, rows):
+    if rows:
+        connection.exec_driver_sql(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows
+        )
+    return len(rows)
+
+
+def generate(path, students=10_000, seed=42, academic_year='2024-2025', years=1, today=None):
+    """Create `path` and fill it with a school; returns row counts.
+
+    Refuses to touch an existing file so it can never overwrite real data.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f'{path} already exists')
+    rng = random.Random(seed)
+    today = today or date(int(academic_year[5:]), 5, 31)
+    year_list = academic_years(academic_year, years)
+
+    app = build_app(path)
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('PRAGMA journal_mode=WAL')
+            # Load without the per-row triggers; both are rebuilt below.
+            drop_search_index(connection)
+            drop_rollups(connection)
+
+            _insert(connection, 'fee_types', ('id', 'name', 'description', 'created_at'), [
+                (head_id, name, description, _timestamp(date(2020, 1, 1)))
+                for head_id, (name, description, *_) in enumerate(FEE_HEADS, start=1)
+            ])
+
+            counts = {'students': 0, 'fees': 0, 'payments': 0}
+            enrolled = []
+            batch = []
+            for row, grade, joined in _student_rows(rng, students, int(year_list[0][:4])):
+                batch.append(row)
+                enrolled.append((row[0], grade, joined))
+                if len(batch) == CHUNK:
+                    counts['students'] += _insert(connection, 'students', STUDENT_COLUMNS, batch)
+                    batch = []
+            counts['students'] += _insert(connection, 'students', STUDENT_COLUMNS, batch)
+
+            fees, payments = [], []
+            for fee, fee_payments in _fee_rows(rng, enrolled, year_list, today):
+                fees.append(fee)
+                payments.extend(fee_payments)
+                if len(payments) >= CHUNK:
+                    counts['fees'] += _insert(connection, 'fees', FEE_COLUMNS, fees)
+                    counts['payments'] += _insert(connection, 'fee_payments', PAYMENT_COLUMNS, payments)
+                    fees, payments = [], []
+            counts['fees'] += _insert(connection, 'fees', FEE_COLUMNS, fees)
+            counts['payments'] += _insert(connection, 'fee_payments', PAYMENT_COLUMNS, payments)
+
+            install_search_index(connection, rebuild=True)
+            install_rollups(connection, rebuild=True)
+            connection.exec_driver_sql('ANALYZE')
+        db.engine.dispose()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='SQLite file to create')
+    parser.add_argument('--students', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--academic-year', default='2024-2025', help='latest academic year')
+    parser.add_argument('--years', type=int, default=1, help='academic years of fees to generate')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = generate(args.path, args.students, args.seed, args.academic_year, args.years)
+    print(f"{counts['students']} students, {counts['fees']} fees, {counts['payments']} payments "
+          f"in {time.perf_counter() - started:.1f}s -> {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Measure streaming export throughput and peak memory.
+
+Usage (from backend/):
+
+    python -m benchmarks.export_benchmark --rows 500000
+
+Builds a SQLite file with `rows` students and `rows` fees, then streams each
+export in a fresh child process so peak RSS reflects only that export.
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+from flask import Flask
+
+from models import db, Student, Fee, FeeType
+from routes.export import export_bp
+
+
+def build_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db.init_app(app)
+    app.register_blueprint(export_bp)
+    return app
+
+
+def populate(path, rows, seed=7):
+    rng = random.Random(seed)
+    app = build_app(path)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(FeeType.__table__.insert(), [{'name': 'Tuition'}, {'name': 'Transport'}])
+        chunk = 50_000
+        for start in range(0, rows, chunk):
+            db.session.execute(Student.__table__.insert(), [{
+                'student_name': f'Student {i}',
+                'parents_name': f'Parent {i}',
+                'roll_number': f'R{i:07d}',
+                'class_name': str(rng.randint(1, 12)),
+                'section': rng.choice('ABCD'),
+                'school_joined_date': date(2024, 6, 1),
+                'date_of_birth': date(2012, 1, 1),
+                'phone_number': '555-0100',
+            } for i in range(start, min(start + chunk, rows))])
+            db.session.execute(Fee.__table__.insert(), [{
+                'student_id': i + 1,
+                'fee_type_id': 1 + i % 2,
+                'total_amount': 1200.0,
+                'amount_paid': float(rng.randint(0, 12) * 100),
+                'academic_year': '2024-2025',
+            } for i in range(start, min(start + chunk, rows))])
+            db.session.commit()
+
+
+def _status_mb(field):
+    # ru_maxrss survives exec and would report the parent's peak, so read the
+    # child's own high-water mark from /proc.
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+
+
+def measure(path, dataset, file_format):
+    """Child-process entry: stream one export and print its numbers."""
+    app = build_app(path)
+    client = app.test_client()
+    baseline = _status_mb('VmRSS')
+    started = time.perf_counter()
+    response = client.get(f'/api/export/{dataset}?format={file_format}', buffered=False)
+    lines = 0
+    size = 0
+    for chunk in response.response:
+        lines += chunk.count(b'\n') if isinstance(chunk, bytes) else chunk.count('\n')
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+    rows = lines - 1 if file_format == 'csv' else lines
+    peak = _status_mb('VmHWM')
+    print(f'{dataset:<9} {file_format:<7} {rows:>9} {elapsed:>7.2f} {rows / elapsed:>10.0f} '
+          f'{size / 2**20:>8.1f} {baseline:>8.1f} {peak:>8.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.db')
+        populate(path, args.rows)
+        print(f"{'dataset':<9} {'format':<7} {'rows':>9} {'sec':>7} {'rows/sec':>10} "
+              f"{'MiB out':>8} {'base MB':>8} {'peak MB':>8}")
+        for dataset in ('students', 'fees'):
+            for file_format in ('csv', 'ndjson'):
+                subprocess.run([sys.executable, '-m', 'benchmarks.export_benchmark',
+                                '--measure', path, dataset, file_format], check=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 5 and sys.argv[1] == '--measure':
+        measure(*sys.argv[2:])
+    else:
+        main()
@@ -0,0 +1,101 @@
+"""Per-request cost of the JWT revocation check.
+
+Usage (from backend/):
+
+    python -m benchmarks.revocation_benchmark --revoked 50000
+
+Against a temporary database holding --revoked unexpired revocations:
+
+- the in-memory check alone, between polls;
+- one poll that finds nothing new (what each worker pays per
+  JWT_REVOCATION_POLL_INTERVAL), and the first load of the whole table
+  after a fork;
+- GET /api/auth/me end to end, with the check and with it stubbed out.
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app import create_app
+from commands import init_schema
+from models import db
+from services.revocation import revocations
+
+
+def seed(count):
+    expires = (datetime.utcnow() + timedelta(days=30)).strftime('%Y-%m-%d %H:%M:%S.%f')
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql(
+            'INSERT INTO revoked_tokens (jti, token_type, user_id, expires_at) VALUES (?, ?, ?, ?)',
+            [(str(uuid.uuid4()), 'refresh', 1, expires) for _ in range(count)]
+        )
+
+
+def per_call_us(fn, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--revoked', type=int, default=50_000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app('production', {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+            'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+            'RATELIMIT_ENABLED': False,
+        })
+        logging.disable(logging.WARNING)
+        client = app.test_client()
+        with app.app_context():
+            init_schema()
+            seed(args.revoked)
+        client.post('/api/auth/register', json={
+            'email': 'bench@example.com', 'password': 'bench', 'first_name': 'Bench',
+            'last_name': 'Mark', 'role': 'admin'})
+        token = client.post('/api/auth/login', json={
+            'email': 'bench@example.com', 'password': 'bench'}).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        jti = str(uuid.uuid4())
+
+        with app.app_context():
+            revocations.configure()
+            started = time.perf_counter()
+            revocations.is_revoked(jti)
+            load_ms = (time.perf_counter() - started) * 1000
+            check_us = per_call_us(lambda: revocations.is_revoked(jti), 200_000)
+
+            def poll():
+                revocations._next_poll = 0.0
+                revocations.is_revoked(jti)
+            poll_us = per_call_us(poll, 200)
+
+        me = lambda: client.get('/api/auth/me', headers=headers)
+        per_call_us(me, 200)  # warm up
+        with_check = per_call_us(me, args.requests)
+        checked = revocations.is_revoked
+        revocations.is_revoked = lambda jti: False
+        try:
+            without_check = per_call_us(me, args.requests)
+        finally:
+            revocations.is_revoked = checked
+
+        print(f'revoked tokens held:         {revocations.stats()["revoked"]:>10}')
+        print(f'first load after fork:       {load_ms:>10.1f} ms')
+        print(f'check between polls:         {check_us:>10.2f} us')
+        print(f'poll with nothing new:       {poll_us:>10.1f} us')
+        print(f'GET /api/auth/me with check: {with_check:>10.1f} us')
+        print(f'GET /api/auth/me without:    {without_check:>10.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,404 @@
+"""Latency and throughput of the main API paths, with saved baselines.
+
+Usage (from backend/):
+
+    python -m benchmarks.runner --students 20000 --save benchmarks/baselines/laptop.json
+    python -m benchmarks.runner --students 20000 --compare benchmarks/baselines/laptop.json
+    python -m benchmarks.runner --target gunicorn --workers 4 --concurrency 16
+
+Each scenario (student CRUD, search, fee ledger, payment posting) runs as
+its own phase of --requests requests spread over --concurrency threads,
+and reports p50/p95/p99 latency and throughput. Targets are the Flask test
+client in this process, gunicorn started with gunicorn.conf.py, or any
+running server (--url) backed by --database.
+
+Without --database a school is generated with benchmarks.datagen into a
+temporary file. The run writes to the database (new students, payments),
+so point --database only at a disposable copy.
+
+--compare exits with status 1 when a scenario's p50/p95 latency grew, or
+its throughput dropped, by more than --tolerance against the baseline.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from app import create_app
+from benchmarks.datagen import FIRST_NAMES, LAST_NAMES, generate
+
+# Latency differences below this are noise, whatever the ratio.
+MIN_LATENCY_DELTA_MS = 0.5
+# Fees sampled for payment posting; each payment is 1.00 so they never fill up.
+PAYMENT_FEES = 5000
+
+
+def build_app(path):
+    """The API as served in production, on the SQLite file at `path`."""
+    # One client firing as fast as it can is what the rate limiter is for.
+    return create_app('production', {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path, 'RATELIMIT_ENABLED': False})
+
+
+# -- scenarios ---------------------------------------------------------------
+# Each takes (rng, state) and returns (method, path, json body or None).
+
+def _student_list(rng, state):
+    return 'GET', f'/api/students?page={rng.randint(1, 50)}&limit=20', None
+
+
+def _student_get(rng, state):
+    return 'GET', f"/api/students/{rng.randint(1, state['students'])}", None
+
+
+def _search(rng, state):
+    terms = [rng.choice(FIRST_NAMES)[:3].lower(), rng.choice(LAST_NAMES).lower(),
+             f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}']
+    return 'GET', f"/api/students?search={rng.choice(terms).replace(' ', '+')}&limit=20", None
+
+
+def _fee_ledger(rng, state):
+    return 'GET', f"/api/students/{rng.randint(1, state['students'])}/fees?include=payments", None
+
+
+def _student_create(rng, state):
+    with state['lock']:
+        state['serial'] += 1
+        serial = state['serial']
+    return 'POST', '/api/students', {
+        'studentName': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        'parentsName': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        'rollNumber': f"B{state['run']}{serial:06d}",
+        'class': str(rng.randint(1, 12)),
+        'section': rng.choice('ABCD'),
+        'schoolJoinedDate': '2024-06-01',
+        'dateOfBirth': '2014-03-15',
+        'phoneNumber': '9000000000',
+    }
+
+
+def _student_update(rng, state):
+    return 'PUT', f"/api/students/{rng.randint(1, state['students'])}", {
+        'phoneNumber': f'9{rng.randint(0, 999999999):09d}'
+    }
+
+
+def _payment_post(rng, state):
+    return 'POST', f"/api/fees/{rng.choice(state['fees'])}/payments", {
+        'amount': 1.0, 'payment_method': 'upi', 'remarks': 'benchmark'
+    }
+
+
+def _student_delete(rng, state):
+    # Deletes students created by student_create, so the seeded data the
+    # other scenarios sample from stays intact.
+    with state['lock']:
+        student_id = state['created'].pop() if state['created'] else None
+    if student_id is None:
+        return None
+    return 'DELETE', f'/api/students/{student_id}', None
+
+
+# name -> request builder, in run order: reads, then writes, then deletes of
+# what the run created.
+SCENARIOS = {
+    'student_list': _student_list,
+    'student_get': _student_get,
+    'search': _search,
+    'fee_ledger': _fee_ledger,
+    'student_create': _student_create,
+    'student_update': _student_update,
+    'payment_post': _payment_post,
+    'student_delete': _student_delete,
+}
+
+
+def load_state(path):
+    """Ids the scenarios sample from, read straight from the database file."""
+    connection = sqlite3.connect(path)
+    try:
+        students = connection.execute('SELECT max(id) FROM students').fetchone()[0] or 0
+        fees = [row[0] for row in connection.execute(
+            'SELECT id FROM fees WHERE total_amount - amount_paid >= 100 ORDER BY random() LIMIT ?',
+            (PAYMENT_FEES,)
+        )]
+    finally:
+        connection.close()
+    if not students or not fees:
+        raise SystemExit(f'{path} has no students or no fees with a balance; generate one with benchmarks.datagen')
+    return {
+        'students': students,
+        'fees': fees,
+        'created': [],
+        'serial': 0,
+        'run': uuid.uuid4().hex[:8],
+        'lock': threading.Lock(),
+    }
+
+
+# -- transports --------------------------------------------------------------
+# A transport is a factory returning, per thread, send(method, path, body) -> (status, body).
+
+def client_transport(app):
+    def connect():
+        client = app.test_client()
+
+        def send(method, path, body):
+            response = client.open(path, method=method, json=body)
+            return response.status_code, response.get_data()
+        return send
+    return connect
+
+
+def http_transport(url):
+    parts = urlsplit(url)
+
+    def connect():
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+
+        def send(method, path, body):
+            payload = json.dumps(body).encode() if body is not None else None
+            headers = {'Content-Type': 'application/json'} if payload is not None else {}
+            # http.client reconnects by itself after a Connection: close reply.
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        return send
+    return connect
+
+
+def start_gunicorn(path, workers, port):
+    # The production profile, pointed at the benchmark database.
+    env = dict(os.environ, FLASK_ENV='production', DATABASE_URL='sqlite:///' + os.path.abspath(path),
+               RATELIMIT_ENABLED='False')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--workers', str(workers),
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('gunicorn did not come up within 30s')
+
+
+# -- measurement -------------------------------------------------------------
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def run_scenario(connect, build, state, requests, concurrency, warmup, seed):
+    """Run one scenario; returns its summary dict."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(index, count, record):
+        rng = random.Random(seed * 1000 + index)
+        send = connect()
+        mine = []
+        failed = 0
+        for _ in range(count):
+            request = build(rng, state)
+            if request is None:
+                break
+            method, path, body = request
+            started = time.perf_counter()
+            status, content = send(method, path, body)
+            mine.append(time.perf_counter() - started)
+            if status >= 400:
+                failed += 1
+            elif record and method == 'POST' and path == '/api/students':
+                with state['lock']:
+                    state['created'].append(json.loads(content)['data']['id'])
+        if record:
+            with lock:
+                latencies.extend(mine)
+                errors[0] += failed
+
+    def run(total, record):
+        threads = [
+            threading.Thread(target=worker, args=(n, total // concurrency + (n < total % concurrency), record))
+            for n in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    if warmup and build is not _student_delete:
+        run(warmup, False)
+    elapsed = run(requests, True)
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors[0],
+        'throughput': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, tolerance):
+    """Regressions of `current` against `baseline`, as printable strings."""
+    regressions = []
+    for name, result in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        for field in ('p50_ms', 'p95_ms'):
+            if (result[field] > before[field] * (1 + tolerance)
+                    and result[field] - before[field] > MIN_LATENCY_DELTA_MS):
+                regressions.append(f'{name}: {field} {before[field]:.2f} -> {result[field]:.2f}')
+        if result['throughput'] < before['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput']:.0f} -> {result['throughput']:.0f} req/s")
+        if result['errors'] > before['errors']:
+            regressions.append(f"{name}: errors {before['errors']} -> {result['errors']}")
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print(f"{'scenario':<15} {'req':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+          + ('  p95 vs baseline' if baseline else ''))
+    for name, result in results['scenarios'].items():
+        line = (f"{name:<15} {result['requests']:>6} {result['errors']:>4} {result['throughput']:>8.0f} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+        before = (baseline or {}).get('scenarios', {}).get(name)
+        if before and before['p95_ms']:
+            line += f"  {(result['p95_ms'] / before['p95_ms'] - 1) * 100:+6.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', choices=('client', 'gunicorn', 'url'), default='client')
+    parser.add_argument('--url', help='base URL of a running server for --target url')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--port', type=int, default=8099, help='gunicorn port')
+    parser.add_argument('--database', help='existing SQLite file to run against (it will be written to)')
+    parser.add_argument('--students', type=int, default=10_000, help='school size when generating')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=500, help='per scenario')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=20, help='unrecorded requests per scenario')
+    parser.add_argument('--save', help='write results as JSON, e.g. a new baseline')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed relative slowdown')
+    args = parser.parse_args()
+    if args.target == 'url' and not (args.url and args.database):
+        parser.error('--target url needs --url and the --database the server runs on')
+    if args.target == 'gunicorn' and shutil.which('gunicorn') is None:
+        parser.error('gunicorn is not installed; pip install gunicorn or use --target client')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database
+        if path is None:
+            path = os.path.join(tmp, 'school.db')
+            counts = generate(path, args.students, args.seed)
+            print(f"generated {counts['students']} students, {counts['fees']} fees, "
+                  f"{counts['payments']} payments", file=sys.stderr)
+        state = load_state(path)
+
+        server = None
+        if args.target == 'client':
+            connect = client_transport(build_app(path))
+        else:
+            if args.target == 'gunicorn':
+                server = start_gunicorn(path, args.workers, args.port)
+                args.url = f'http://127.0.0.1:{args.port}'
+            connect = http_transport(args.url)
+
+        try:
+            scenarios = {}
+            # Keep run order (creates before deletes) whatever order was asked for.
+            for index, name in enumerate(name for name in SCENARIOS if name in args.scenarios):
+                scenarios[name] = run_scenario(connect, SCENARIOS[name], state, args.requests,
+                                               args.concurrency, args.warmup, args.seed + index)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'target': args.target,
+            'workers': args.workers if args.target == 'gunicorn' else None,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'students': state['students'],
+            'seed': args.seed,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'machine': platform.node(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'scenarios': scenarios,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        for key in ('target', 'workers', 'concurrency', 'students'):
+            if baseline.get('meta', {}).get(key) != results['meta'][key]:
+                print(f"warning: baseline {key} was {baseline.get('meta', {}).get(key)}, "
+                      f"this run used {results['meta'][key]}", file=sys.stderr)
+    print_results(results, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as handle:
+            json.dump(results, handle, indent=2)
+            handle.write('\n')
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+        print(f'no regressions beyond {args.tolerance:.0%} of {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Compare FTS5 student search against the old triple ILIKE scan.
+
+Usage (from backend/):
+
+    python -m benchmarks.search_benchmark --sizes 10000 100000 1000000
+
+Each size gets a fresh SQLite file in a temporary directory. Both paths run
+the same work as GET /api/students?search=...: a count plus a 10-row page.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date
+
+from flask import Flask
+from sqlalchemy import or_
+
+from benchmarks.datagen import FIRST_NAMES, LAST_NAMES
+from models import db, Student
+from models.search import install_search_index
+from routes.students import apply_search
+
+# A short common prefix, a surname, a two-term name, a roll-number prefix and
+# a rare name.
+QUERIES = ['sar', 'reddy', 'priya nair', '20250001', 'shodhan']
+
+
+def build_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db.init_app(app)
+    return app
+
+
+def load_students(count, seed=42):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        rows.append({
+            'student_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'parents_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'roll_number': f'{2025000000 + i}',
+            'class_name': str(rng.randint(1, 12)),
+            'section': rng.choice('ABCD'),
+            'school_joined_date': date(2024, 6, 1),
+            'date_of_birth': date(2012, 1, 1),
+            'phone_number': '555-0100',
+        })
+    db.session.execute(Student.__table__.insert(), rows)
+    db.session.commit()
+
+
+def ilike_query(search):
+    return Student.query.filter(or_(
+        Student.student_name.ilike(f'%{search}%'),
+        Student.roll_number.ilike(f'%{search}%'),
+        Student.parents_name.ilike(f'%{search}%')
+    ))
+
+
+def time_path(build_query, search, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        query = build_query(search)
+        query.order_by(None).count()
+        query.limit(10).all()
+        db.session.rollback()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run(sizes, repeat):
+    print(f"{'rows':>9}  {'query':<12} {'ilike ms':>9} {'fts ms':>8} {'speedup':>8}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = build_app(os.path.join(tmp, 'bench.db'))
+            with app.app_context():
+                # Load without the sync triggers, then build the index in one pass.
+                with db.engine.begin() as connection:
+                    Student.__table__.create(connection)
+                    connection.exec_driver_sql('DROP TRIGGER IF EXISTS students_fts_ai')
+                load_students(size)
+                with db.engine.begin() as connection:
+                    install_search_index(connection, rebuild=True)
+
+                for search in QUERIES:
+                    ilike_ms = time_path(ilike_query, search, repeat)
+                    fts_ms = time_path(lambda s: apply_search(Student.query, s), search, repeat)
+                    print(f'{size:>9}  {search:<12} {ilike_ms:>9.2f} {fts_ms:>8.2f} {ilike_ms / fts_ms:>7.1f}x')
+                db.session.remove()
+                db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
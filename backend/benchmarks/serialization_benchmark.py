@@ -0,0 +1,96 @@
+"""Compare the entity + to_dict + jsonify read path with column tuples +
+precompiled serializers + json_response.
+
+Usage (from backend/):
+
+    python -m benchmarks.serialization_benchmark --pages 500
+
+Times the work behind one 100-row GET /api/students page, and checks both
+paths produce the same bytes.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, datetime
+
+from flask import Flask, jsonify
+
+from models import db, Student
+from models.serializers import student_serializer
+from utils import responses
+from utils.responses import json_response
+
+PAGE_SIZE = 100
+
+
+def build_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db.init_app(app)
+    return app
+
+
+def load_students(count):
+    db.session.execute(Student.__table__.insert(), [{
+        'student_name': f'Student {i}',
+        'parents_name': f'Parent {i}',
+        'roll_number': f'R{i:06d}',
+        'class_name': str(i % 12 + 1),
+        'section': 'ABCD'[i % 4],
+        'school_joined_date': date(2024, 6, 1),
+        'date_of_birth': date(2012, 1, 1 + i % 28),
+        'phone_number': '555-0100',
+        'updated_at': datetime(2025, 1, 2, 3, 4, 5, 6) if i % 2 else None,
+    } for i in range(count)])
+    db.session.commit()
+
+
+def orm_page(offset):
+    students = Student.query.offset(offset).limit(PAGE_SIZE).all()
+    body = jsonify({'data': [student.to_dict() for student in students]}).get_data()
+    db.session.remove()
+    return body
+
+
+def tuple_page(offset):
+    rows = db.session.query(*student_serializer.columns).offset(offset).limit(PAGE_SIZE).all()
+    body = json_response({'data': student_serializer.many(rows)}).get_data()
+    db.session.remove()
+    return body
+
+
+def timed(fn, pages, total_rows):
+    started = time.perf_counter()
+    for page in range(pages):
+        fn((page * PAGE_SIZE) % (total_rows - PAGE_SIZE))
+    return (time.perf_counter() - started) / pages * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--pages', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context(), app.test_request_context():
+            db.create_all()
+            load_students(args.rows)
+            assert orm_page(0) == tuple_page(0), 'serializers drifted from to_dict'
+
+            orm_ms = timed(orm_page, args.pages, args.rows)
+            tuple_ms = timed(tuple_page, args.pages, args.rows)
+            print(f'ORM entities + to_dict + jsonify:   {orm_ms:6.2f} ms/page')
+            print(f'tuples + serializer + json_response: {tuple_ms:6.2f} ms/page '
+                  f'({orm_ms / tuple_ms:.1f}x, JSON backend: {"orjson" if responses.orjson else "stdlib"})')
+            if responses.orjson:
+                responses.dumps = responses._dumps_stdlib
+                stdlib_ms = timed(tuple_page, args.pages, args.rows)
+                print(f'tuples + serializer + stdlib json:   {stdlib_ms:6.2f} ms/page '
+                      f'({orm_ms / stdlib_ms:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
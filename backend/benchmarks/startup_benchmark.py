@@ -0,0 +1,106 @@
+"""Cold-start time and per-worker memory of the app factory.
+
+Usage (from backend/):
+
+    python -m benchmarks.startup_benchmark --workers 4
+
+Runs in a fresh interpreter per measurement, against a generated school:
+
+- cold start: from a fresh interpreter to a built app, and its RSS;
+- preload: the app is built once, then --workers children are forked as
+  gunicorn.conf.py does (preload_app, gc.freeze), each serves a few reads
+  and reports the memory it dirtied itself (Private_Dirty, what one more
+  worker really costs) and its proportional share of the rest (PSS).
+  Database pages read through mmap are page cache, not worker memory, and
+  are left out of the former.
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import generate
+
+REQUESTS = ['/api/students?limit=20', '/api/students/{id}', '/api/students/{id}/fees?include=payments']
+
+
+def _status_mb(field):
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+
+
+def _smaps_mb():
+    values = {}
+    with open('/proc/self/smaps_rollup') as smaps:
+        for line in smaps:
+            parts = line.split()
+            if parts[0] in ('Private_Dirty:', 'Pss:'):
+                values[parts[0]] = int(parts[1]) / 1024
+    return values['Private_Dirty:'], values['Pss:']
+
+
+def measure(workers, started):
+    """Child-process entry: build the app, fork workers, print JSON."""
+    from app import create_app, after_fork
+
+    app = create_app('production')
+    result = {'build_seconds': time.time() - started, 'rss_mb': _status_mb('VmRSS'), 'workers': []}
+    gc.freeze()
+
+    read_end, write_end = os.pipe()
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            after_fork(app)
+            client = app.test_client()
+            for student_id in range(1, 51):
+                for path in REQUESTS:
+                    client.get(path.format(id=student_id))
+            dirty, pss = _smaps_mb()
+            os.write(write_end, (json.dumps({'dirty_mb': dirty, 'pss_mb': pss}) + '\n').encode())
+            os._exit(0)
+        children.append(pid)
+    for pid in children:
+        os.waitpid(pid, 0)
+    os.close(write_end)
+    with os.fdopen(read_end) as lines:
+        result['workers'] = [json.loads(line) for line in lines]
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--students', type=int, default=20_000)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'school.db')
+        generate(path, args.students)
+        env = dict(os.environ, FLASK_ENV='production', DATABASE_URL='sqlite:///' + path, LOG_LEVEL='WARNING',
+                   RATELIMIT_ENABLED='False')
+        print(f"{'run':>3} {'build s':>8} {'RSS MB':>7} {'worker dirty MB':>16} {'worker PSS MB':>14}")
+        for run in range(1, args.runs + 1):
+            output = subprocess.run(
+                [sys.executable, '-c',
+                 'import time; started = time.time(); '
+                 f'from benchmarks.startup_benchmark import measure; measure({args.workers}, started)'],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            dirty = [worker['dirty_mb'] for worker in result['workers']]
+            pss = [worker['pss_mb'] for worker in result['workers']]
+            print(f"{run:>3} {result['build_seconds']:>8.3f} {result['rss_mb']:>7.1f} "
+                  f"{sum(dirty) / len(dirty):>16.1f} {sum(pss) / len(pss):>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
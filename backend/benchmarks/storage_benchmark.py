@@ -0,0 +1,147 @@
+"""Concurrent throughput with and without the SQLite storage profile.
+
+Usage (from backend/):
+
+    python -m benchmarks.storage_benchmark --workers 4 --seconds 10
+
+Each worker is a separate process (as under gunicorn) driving the Flask app
+through its test client: mostly student list/ledger reads plus payment posts
+(--write-ratio). Runs with the profile disabled (rollback journal, no
+pragmas, no reader engine, no retries), with ProductionConfig's profile
+but no reader engine, and with the full profile, each against a freshly
+seeded database file.
+
+Read latency in a mixed run depends on the CPUs available as much as on
+storage: under the rollback journal a writer waiting for the lock leaves
+the CPU to readers, while under WAL readers and writers run side by
+side. With fewer cores than workers that shows up as slower reads next
+to faster writes, with or without the reader engine; compare
+--write-ratio 0 to see the read path on its own.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date
+
+from flask import Flask
+
+from config import ProductionConfig
+from models import db, Student, Fee, FeeType
+from models.storage import init_db
+from routes.students import students_bp
+from routes.fee import fee_bp
+
+PROFILES = {
+    'baseline': {'SQLITE_PRAGMAS': {}, 'SQLITE_READER_ENGINE': False, 'SQLITE_BUSY_RETRIES': 0},
+    'no-reader': {
+        'SQLITE_PRAGMAS': ProductionConfig.SQLITE_PRAGMAS,
+        'SQLITE_READER_ENGINE': False,
+        'SQLITE_BUSY_RETRIES': ProductionConfig.SQLITE_BUSY_RETRIES,
+        'SQLITE_BUSY_BACKOFF': ProductionConfig.SQLITE_BUSY_BACKOFF,
+    },
+    'profile': {
+        'SQLITE_PRAGMAS': ProductionConfig.SQLITE_PRAGMAS,
+        'SQLITE_READER_ENGINE': True,
+        'SQLITE_BUSY_RETRIES': ProductionConfig.SQLITE_BUSY_RETRIES,
+        'SQLITE_BUSY_BACKOFF': ProductionConfig.SQLITE_BUSY_BACKOFF,
+    },
+}
+
+
+def build_app(path, profile):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    app.config.update(PROFILES[profile])
+    init_db(app)
+    app.register_blueprint(students_bp)
+    app.register_blueprint(fee_bp)
+    return app
+
+
+def seed(path, students):
+    app = build_app(path, 'baseline')
+    with app.app_context():
+        db.create_all()
+        db.session.execute(FeeType.__table__.insert(), [{'name': 'Tuition'}])
+        db.session.execute(Student.__table__.insert(), [{
+            'student_name': f'Student {i}', 'parents_name': f'Parent {i}',
+            'roll_number': f'R{i:06d}', 'class_name': str(i % 12 + 1), 'section': 'ABCD'[i % 4],
+            'school_joined_date': date(2024, 6, 1), 'date_of_birth': date(2012, 1, 1),
+            'phone_number': '555-0100',
+        } for i in range(students)])
+        db.session.execute(Fee.__table__.insert(), [{
+            'student_id': i + 1, 'fee_type_id': 1, 'total_amount': 1e9, 'academic_year': '2024-2025',
+        } for i in range(students)])
+        db.session.commit()
+
+
+def worker(path, profile, seconds, write_ratio, students, seed_value, results):
+    rng = random.Random(seed_value)
+    app = build_app(path, profile)
+    client = app.test_client()
+    latencies = {'read': [], 'write': []}
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        student_id = rng.randint(1, students)
+        started = time.perf_counter()
+        if rng.random() < write_ratio:
+            kind = 'write'
+            response = client.post(f'/api/fees/{student_id}/payments', json={'amount': 1})
+        elif rng.random() < 0.5:
+            kind = 'read'
+            response = client.get(f'/api/students?page={rng.randint(1, 50)}&limit=20')
+        else:
+            kind = 'read'
+            response = client.get(f'/api/students/{student_id}/fees')
+        latencies[kind].append(time.perf_counter() - started)
+        if response.status_code >= 500:
+            errors += 1
+    results.put((latencies, errors))
+
+
+def run(path, profile, workers, seconds, write_ratio, students):
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(path, profile, seconds, write_ratio, students, n, results))
+        for n in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    reads = [value for latencies, _ in collected for value in latencies['read']]
+    writes = [value for latencies, _ in collected for value in latencies['write']]
+    errors = sum(error for _, error in collected)
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) > 1 else 0.0
+
+    print(f'{profile:<9} {(len(reads) + len(writes)) / seconds:>8.0f} req/s  '
+          f'reads {len(reads) / seconds:>7.0f}/s p95 {p95(reads):>7.1f} ms  '
+          f'writes {len(writes) / seconds:>6.0f}/s p95 {p95(writes):>7.1f} ms  errors {errors}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--students', type=int, default=5000)
+    args = parser.parse_args()
+
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'load.db')
+            seed(path, args.students)
+            run(path, profile, args.workers, args.seconds, args.write_ratio, args.students)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import click
+from models import db
+from models.search import install_search_index
+from models.rollups import install_rollups
+from services.payments import reconcile_fee_balances
+from services.revocation import revocations
+from services.query_plans import check_query_plans
+from services.archive import archive_year, restore_year, archived_years, ArchiveError
+from models.storage import write_transaction
+
+
+def init_schema():
+    """Create missing tables, the search index and the dashboard rollups.
+
+    create_all only fires the index DDL for new tables; databases created
+    before the search index or the rollups existed get them (and a one-off
+    rebuild) here.
+    """
+    db.create_all()
+    with db.engine.begin() as connection:
+        install_search_index(connection)
+        install_rollups(connection)
+
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create any missing tables without migrations; follow with `flask db stamp head`."""
+        init_schema()
+        click.echo('Database initialised.')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Create the student search index and repopulate it from `students`."""
+        with db.engine.begin() as connection:
+            if not install_search_index(connection, rebuild=True):
+                click.echo('Search index requires SQLite; substring search stays in use.')
+                return
+        click.echo('Student search index rebuilt.')
+
+    @app.cli.command('rebuild-dashboard-stats')
+    def rebuild_dashboard_stats():
+        """Recompute the dashboard rollup tables from students, fees and payments."""
+        with db.engine.begin() as connection:
+            if not install_rollups(connection, rebuild=True):
+                click.echo('Dashboard rollups require SQLite.')
+                return
+        click.echo('Dashboard stats rebuilt.')
+
+    @app.cli.command('purge-revoked-tokens')
+    def purge_revoked_tokens():
+        """Delete revocations of tokens that have expired anyway."""
+        click.echo(f'Purged {revocations.purge_expired()} expired token revocation(s).')
+
+    @app.cli.command('reconcile-fee-balances')
+    @click.option('--dry-run', is_flag=True, help='Report drift without fixing it.')
+    def reconcile_fee_balances_command(dry_run):
+        """Rebuild Fee.amount_paid from fee_payments and report any drift."""
+        drift = reconcile_fee_balances(apply=not dry_run)
+        for fee_id, stored, actual in drift:
+            click.echo(f'fee {fee_id}: stored {stored:.2f}, payments sum to {actual:.2f}')
+        if not drift:
+            click.echo('All fee balances match their payments.')
+        elif dry_run:
+            click.echo(f'{len(drift)} fee balance(s) drifted; rerun without --dry-run to fix.')
+        else:
+            click.echo(f'Fixed {len(drift)} fee balance(s).')
+
+    @app.cli.command('check-query-plans')
+    @click.option('--verbose', is_flag=True, help='Print every plan, not just failing ones.')
+    def check_query_plans_command(verbose):
+        """EXPLAIN the filtered read queries; exit 1 if one scans a table it should search."""
+        failed = 0
+        for name, plan, scans in check_query_plans():
+            click.echo(f"{'FAIL' if scans else 'ok':<4}  {name}")
+            if scans or verbose:
+                for line in plan:
+                    click.echo(f'        {line}')
+            failed += bool(scans)
+        if failed:
+            raise click.ClickException(f'{failed} query plan(s) fall back to a full table scan')
+
+    @app.cli.command('archive-year')
+    @click.argument('academic_year')
+    @click.option('--force', is_flag=True, help='Archive even the latest academic year.')
+    def archive_year_command(academic_year, force):
+        """Move a closed year's fees and payments into the archive tables."""
+        try:
+            archived = write_transaction(archive_year, academic_year, force=force)
+        except ArchiveError as e:
+            db.session.rollback()
+            raise click.ClickException(str(e))
+        click.echo(f"Archived {academic_year}: {archived['fee_count']} fee(s), "
+                   f"{archived['payment_count']} payment(s).")
+
+    @app.cli.command('restore-year')
+    @click.argument('academic_year')
+    def restore_year_command(academic_year):
+        """Move an archived year back into the live fee tables."""
+        try:
+            restored = write_transaction(restore_year, academic_year)
+        except ArchiveError as e:
+            db.session.rollback()
+            raise click.ClickException(str(e))
+        click.echo(f"Restored {academic_year}: {restored['fee_count']} fee(s), "
+                   f"{restored['payment_count']} payment(s).")
+
+    @app.cli.command('archived-years')
+    def archived_years_command():
+        """List the archived academic years."""
+        years = archived_years()
+        for year in years:
+            click.echo(f'{year.academic_year}  {year.fee_count} fee(s), {year.payment_count} payment(s), '
+                       f'billed {year.total_billed:.2f}, collected {year.total_collected:.2f}, '
+                       f'archived {year.archived_at:%Y-%m-%d}')
+        if not years:
+            click.echo('No academic years are archived.')
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 from dotenv import load_dotenv
 
@@ -16,36 +17,132 @@ class Config:
     # Database - SQLite configuration
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join(basedir, 'app.db'))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # SQLite storage profile, applied to every new connection (see models/storage.py)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',        # readers no longer block on writers
+        'synchronous': 'NORMAL',      # fsync at checkpoints; safe with WAL
+        'cache_size': -32000,         # 32MB page cache per connection
+        'mmap_size': 134217728,       # 128MB memory-mapped reads
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,         # ms to wait for the write lock
+    }
+    SQLITE_BUSY_RETRIES = 3           # write transaction retries after busy_timeout
+    SQLITE_BUSY_BACKOFF = 0.05        # seconds, doubled per retry
+    # Read-only engine for GET requests. Off by default: it has not shown a
+    # gain over WAL alone in benchmarks/storage_benchmark.py; set
+    # SQLITE_READER_ENGINE=true to try it on multi-core hosts.
+    SQLITE_READER_ENGINE = os.getenv('SQLITE_READER_ENGINE', 'False').lower() in ('true', '1', 't')
     
     # JWT config
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Revoked tokens (services/revocation.py): how often each worker picks up
+    # revocations made elsewhere, and drops expired ones from the table.
+    JWT_REVOCATION_POLL_INTERVAL = 1.0     # seconds
+    JWT_REVOCATION_PURGE_INTERVAL = 3600   # seconds
+
+    # Password hashing (services/credentials.py). Hashes made with other
+    # parameters are upgraded on the user's next successful login.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = 2         # hashes running at once per process
+    PASSWORD_HASH_MAX_PENDING = 16    # queued + running before logins get a 503
+    PASSWORD_HASH_TIMEOUT = 10.0      # seconds a request waits for its hash
+    AUTH_USER_CACHE_TTL = 30          # seconds /me and /refresh may serve a cached user
     
-    # CORS config
-    CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
-    
-    # Rate limiting
-    RATELIMIT_DEFAULT = "200 per day;50 per hour;1 per second"
-    RATELIMIT_STORAGE_URL = "memory://"
+    # Browser origins allowed to call /api/*, comma separated
+    CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
     
+    # Rate limiting (utils/ratelimit.py): token buckets, "N per period" each
+    # allowing bursts of N. The default applies per client address and per
+    # user; search, export and login have budgets of their own on top.
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'True').lower() in ('true', '1', 't')
+    RATELIMIT_DEFAULT = "50 per second;3000 per minute"
+    RATELIMIT_SEARCH = "10 per second;300 per minute"
+    RATELIMIT_EXPORT = "5 per minute;30 per hour"
+    RATELIMIT_LOGIN = "10 per minute;50 per hour"
+    # memory:// is per process; file:///path shares buckets between workers
+    RATELIMIT_STORAGE_URL = os.getenv('RATELIMIT_STORAGE_URL', 'memory://')
+    RATELIMIT_SLOTS = 65536           # buckets held; 24 bytes each
+
+    # Async read path (app/asgi.py): read-only SQLite connections per process
+    ASYNC_READ_POOL_SIZE = 8
+
+    # Response compression (utils/compression.py): gzip, or brotli when the
+    # brotli package is installed. Bodies of responses with an ETag are
+    # kept compressed per (path, ETag, encoding).
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 1024          # bytes; smaller bodies are sent as is
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4
+    COMPRESS_CACHE_SIZE = 512         # compressed bodies kept per process
+    COMPRESS_CACHE_TTL = 300          # seconds
+
     # File upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
 
+    # Per-process model cache (models/cache.py). Point MODEL_CACHE_CHANNEL at
+    # a file shared by all workers to propagate invalidations between them
+    # (ProductionConfig does by default).
+    MODEL_CACHE_TTL = 300             # seconds
+    MODEL_CACHE_SIZE = 2048           # entries per cache
+    MODEL_CACHE_CHANNEL = os.getenv('MODEL_CACHE_CHANNEL')
+    MODEL_CACHE_CHANNEL_POLL = 1.0    # seconds between checks for other workers' writes
+
+    # Logging (utils/logging_setup.py): written from a background thread
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = {                    # per-logger overrides
+        'werkzeug': 'INFO',
+        'sqlalchemy.engine': 'WARNING',
+    }
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # text or json
+    LOG_FILE = os.getenv('LOG_FILE')  # stderr when unset
+    LOG_DEBUG_SAMPLE_RATE = 1.0       # share of DEBUG records kept
+
+    # Request metrics served at /metrics (utils/metrics.py)
+    METRICS_ENABLED = True
+    METRICS_QUERY_WARN_THRESHOLD = 20  # log a warning above this many SQL statements per request
+
+    # Bulk student import: rows per INSERT/transaction
+    STUDENT_IMPORT_BATCH_SIZE = 1000
+
 class DevelopmentConfig(Config):
     DEBUG = True
-    SQLALCHEMY_ECHO = True  # Log SQL queries
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'dev.db')
+    # Log SQL queries on request; LOG_LEVELS['sqlalchemy.engine'] = 'INFO' does the same
+    SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO', 'False').lower() in ('true', '1', 't')
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join(basedir, 'dev.db'))
 
 class ProductionConfig(Config):
     DEBUG = False
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'prod.db')
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'WARNING')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_DEBUG_SAMPLE_RATE = 0.01
+    RATELIMIT_STORAGE_URL = os.getenv(
+        'RATELIMIT_STORAGE_URL', 'file://' + os.path.join(tempfile.gettempdir(), 'school-ratelimit.bin')
+    )
+    # gunicorn runs several workers; without a shared channel a write in one
+    # leaves student rows and auth users stale in the others until the TTL.
+    MODEL_CACHE_CHANNEL = os.getenv(
+        'MODEL_CACHE_CHANNEL', os.path.join(tempfile.gettempdir(), 'school-cache-invalidations.log')
+    )
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join(basedir, 'prod.db'))
+    SQLITE_PRAGMAS = {
+        **Config.SQLITE_PRAGMAS,
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+    }
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'  # Use in-memory database for testing
+    SQLITE_PRAGMAS = {'busy_timeout': 5000}
+    SQLITE_BUSY_RETRIES = 0
     WTF_CSRF_ENABLED = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # fast, tests don't need the cost
+    RATELIMIT_ENABLED = False
 
 # Configuration dictionary
 config = {
@@ -0,0 +1,44 @@
+"""Production gunicorn profile: `gunicorn -c gunicorn.conf.py` from backend/.
+
+SQLite serialises writers, so more processes mostly means more of them
+queued on the write lock; a few workers with a few threads each keep WAL
+reads concurrent without piling up writers. The app is built once in the
+master (preload_app) and forked, so workers share its imported code
+copy-on-write and start without building anything; after_fork then gives
+each worker its own connections and logging thread.
+
+Every setting can be overridden with the usual gunicorn flags or
+GUNICORN_CMD_ARGS.
+"""
+import gc
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8080')
+raw_env = [f"FLASK_ENV={os.getenv('FLASK_ENV', 'production')}"]
+
+preload_app = True
+workers = int(os.getenv('GUNICORN_WORKERS', min(4, multiprocessing.cpu_count())))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+timeout = 30
+graceful_timeout = 20
+keepalive = 5
+# Recycle workers now and then so slow leaks can't build up; the jitter
+# keeps them from restarting together.
+max_requests = 5000
+max_requests_jitter = 500
+
+
+def when_ready(server):
+    # Runs in the master before the first fork. Objects the preloaded app
+    # allocated are shared with workers; frozen, the collector leaves them
+    # alone instead of touching (and so copying) their pages in each worker.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import after_fork
+    after_fork(server.app.wsgi())
@@ -0,0 +1,45 @@
+"""store amount paid on fees
+
+Revision ID: 3c1f9a7d2e41
+Revises: b67fdd8ae972
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f9a7d2e41'
+down_revision = 'b67fdd8ae972'
+branch_labels = None
+depends_on = None
+
+
+def _fee_columns():
+    inspector = sa.inspect(op.get_bind())
+    if 'fees' not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns('fees')}
+
+
+def upgrade():
+    # The fees table was created by db.create_all(), so it may not exist yet
+    # on a fresh database; the schema baseline revision creates it whole.
+    columns = _fee_columns()
+    if columns is None or 'amount_paid' in columns:
+        return
+    with op.batch_alter_table('fees') as batch_op:
+        batch_op.add_column(sa.Column('amount_paid', sa.Float(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE fees SET amount_paid = COALESCE("
+        "(SELECT SUM(amount_paid) FROM fee_payments WHERE fee_payments.fee_id = fees.id), 0)"
+    )
+
+
+def downgrade():
+    columns = _fee_columns()
+    if columns is None or 'amount_paid' not in columns:
+        return
+    with op.batch_alter_table('fees') as batch_op:
+        batch_op.drop_column('amount_paid')
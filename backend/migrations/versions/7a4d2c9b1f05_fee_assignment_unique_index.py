@@ -0,0 +1,54 @@
+"""one fee per student, fee type and academic year
+
+Revision ID: 7a4d2c9b1f05
+Revises: 3c1f9a7d2e41
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4d2c9b1f05'
+down_revision = '3c1f9a7d2e41'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ux_fees_student_type_year'
+
+
+def _fee_indexes():
+    inspector = sa.inspect(op.get_bind())
+    if 'fees' not in inspector.get_table_names():
+        return None
+    # Databases from before fee types have a different fees table
+    columns = {column['name'] for column in inspector.get_columns('fees')}
+    if not {'student_id', 'fee_type_id', 'academic_year'} <= columns:
+        return None
+    return {index['name'] for index in inspector.get_indexes('fees')}
+
+
+def upgrade():
+    indexes = _fee_indexes()
+    if indexes is None or INDEX_NAME in indexes:
+        return
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT count(*) FROM (SELECT 1 FROM fees GROUP BY student_id, fee_type_id, academic_year "
+        "HAVING count(*) > 1)"
+    )).scalar()
+    if duplicates:
+        # Merging fees means moving their payments; that's a decision for
+        # the school office, not a migration.
+        raise RuntimeError(
+            f'{duplicates} student/fee type/academic year combination(s) have more than one fee; '
+            'merge them before upgrading'
+        )
+    op.create_index(INDEX_NAME, 'fees', ['student_id', 'fee_type_id', 'academic_year'], unique=True)
+
+
+def downgrade():
+    indexes = _fee_indexes()
+    if indexes is None or INDEX_NAME not in indexes:
+        return
+    op.drop_index(INDEX_NAME, table_name='fees')
@@ -0,0 +1,175 @@
+"""install the student search index and the dashboard rollups
+
+Revision ID: a3c7e5d9b1f4
+Revises: f2b6d8e4a9c3
+Create Date: 2026-10-18 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c7e5d9b1f4'
+down_revision = 'f2b6d8e4a9c3'
+branch_labels = None
+depends_on = None
+
+
+# The DDL as of this revision, written out rather than taken from
+# models.search and models.rollups, so replaying history always builds the
+# same schema.
+SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+        student_name, roll_number, parents_name,
+        content='students', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='1 2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_fts_ai AFTER INSERT ON students BEGIN
+        INSERT INTO students_fts(rowid, student_name, roll_number, parents_name)
+        VALUES (new.id, new.student_name, new.roll_number, new.parents_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_fts_ad AFTER DELETE ON students BEGIN
+        INSERT INTO students_fts(students_fts, rowid, student_name, roll_number, parents_name)
+        VALUES ('delete', old.id, old.student_name, old.roll_number, old.parents_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_fts_au
+    AFTER UPDATE OF student_name, roll_number, parents_name ON students BEGIN
+        INSERT INTO students_fts(students_fts, rowid, student_name, roll_number, parents_name)
+        VALUES ('delete', old.id, old.student_name, old.roll_number, old.parents_name);
+        INSERT INTO students_fts(rowid, student_name, roll_number, parents_name)
+        VALUES (new.id, new.student_name, new.roll_number, new.parents_name);
+    END
+    """,
+]
+
+FILL_SEARCH_INDEX = ["INSERT INTO students_fts(students_fts) VALUES ('rebuild')"]
+
+ROLLUP_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS stats_class_counts (
+        class_name VARCHAR(20) NOT NULL,
+        section VARCHAR(10) NOT NULL,
+        student_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (class_name, section)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stats_monthly (
+        month CHAR(7) PRIMARY KEY,
+        revenue FLOAT NOT NULL DEFAULT 0,
+        payment_count INTEGER NOT NULL DEFAULT 0,
+        students_joined INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stats_fee_years (
+        academic_year VARCHAR(9) PRIMARY KEY,
+        fee_count INTEGER NOT NULL DEFAULT 0,
+        total_billed FLOAT NOT NULL DEFAULT 0,
+        total_collected FLOAT NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+CLASS_DELTA = """
+    INSERT INTO stats_class_counts (class_name, section, student_count)
+    VALUES ({row}.class_name, {row}.section, {sign}1)
+    ON CONFLICT (class_name, section) DO UPDATE SET student_count = student_count + excluded.student_count;
+    DELETE FROM stats_class_counts
+    WHERE class_name = {row}.class_name AND section = {row}.section AND student_count <= 0;
+"""
+
+JOINED_DELTA = """
+    INSERT INTO stats_monthly (month, students_joined)
+    VALUES (strftime('%Y-%m', {row}.school_joined_date), {sign}1)
+    ON CONFLICT (month) DO UPDATE SET students_joined = students_joined + excluded.students_joined;
+"""
+
+REVENUE_DELTA = """
+    INSERT INTO stats_monthly (month, revenue, payment_count)
+    VALUES (strftime('%Y-%m', {row}.payment_date), {sign}{row}.amount_paid, {sign}1)
+    ON CONFLICT (month) DO UPDATE SET
+        revenue = revenue + excluded.revenue,
+        payment_count = payment_count + excluded.payment_count;
+"""
+
+FEE_DELTA = """
+    INSERT INTO stats_fee_years (academic_year, fee_count, total_billed, total_collected)
+    VALUES ({row}.academic_year, {sign}1, {sign}{row}.total_amount, {sign}{row}.amount_paid)
+    ON CONFLICT (academic_year) DO UPDATE SET
+        fee_count = fee_count + excluded.fee_count,
+        total_billed = total_billed + excluded.total_billed,
+        total_collected = total_collected + excluded.total_collected;
+"""
+
+# trigger name prefix: (table, columns whose update moves the totals, delta)
+ROLLUP_TRIGGERS = {
+    'stats_students_class': ('students', 'class_name, section', CLASS_DELTA),
+    'stats_students_joined': ('students', 'school_joined_date', JOINED_DELTA),
+    'stats_payments': ('fee_payments', 'amount_paid, payment_date', REVENUE_DELTA),
+    'stats_fees': ('fees', 'academic_year, total_amount, amount_paid', FEE_DELTA),
+}
+
+FILL_ROLLUPS = [
+    """
+    INSERT INTO stats_class_counts (class_name, section, student_count)
+    SELECT class_name, section, count(*) FROM students GROUP BY class_name, section
+    """,
+    """
+    INSERT INTO stats_monthly (month, students_joined)
+    SELECT strftime('%Y-%m', school_joined_date), count(*) FROM students GROUP BY 1
+    """,
+    """
+    INSERT INTO stats_monthly (month, revenue, payment_count)
+    SELECT strftime('%Y-%m', payment_date), sum(amount_paid), count(*) FROM fee_payments WHERE true GROUP BY 1
+    ON CONFLICT (month) DO UPDATE SET revenue = excluded.revenue, payment_count = excluded.payment_count
+    """,
+    """
+    INSERT INTO stats_fee_years (academic_year, fee_count, total_billed, total_collected)
+    SELECT academic_year, count(*), sum(total_amount), sum(amount_paid) FROM fees GROUP BY academic_year
+    """,
+]
+
+
+def _rollup_triggers():
+    statements = []
+    for name, (table, columns, delta) in ROLLUP_TRIGGERS.items():
+        old, new = delta.format(row='old', sign='-'), delta.format(row='new', sign='+')
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {table} BEGIN {new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {table} BEGIN {old} END",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF {columns} ON {table} BEGIN {old} {new} END",
+        ]
+    return statements
+
+
+def upgrade():
+    # Until now only `flask init-db` (or create_all) installed students_fts
+    # and the stats_* tables with their triggers. Whatever is missing is
+    # created and filled from the base tables; databases that already have
+    # them are left untouched. Both are SQLite-only.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    existing = set(sa.inspect(bind).get_table_names())
+    statements = SEARCH_INDEX + ([] if 'students_fts' in existing else FILL_SEARCH_INDEX)
+    statements += ROLLUP_TABLES + _rollup_triggers()
+    if 'stats_monthly' not in existing:
+        statements += FILL_ROLLUPS
+    for statement in statements:
+        bind.exec_driver_sql(statement)
+
+
+def downgrade():
+    # Usually installed by init-db long before this revision, and the
+    # dashboard needs the rollups; they stay.
+    pass
@@ -0,0 +1,43 @@
+"""add a unique reference to fee payments
+
+Revision ID: c82e5b0d4a17
+Revises: 7a4d2c9b1f05
+Create Date: 2026-10-18 12:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c82e5b0d4a17'
+down_revision = '7a4d2c9b1f05'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ux_fee_payments_reference'
+
+
+def _payment_columns():
+    inspector = sa.inspect(op.get_bind())
+    if 'fee_payments' not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns('fee_payments')}
+
+
+def upgrade():
+    columns = _payment_columns()
+    if columns is None or 'reference' in columns:
+        return
+    with op.batch_alter_table('fee_payments') as batch_op:
+        batch_op.add_column(sa.Column('reference', sa.String(length=100), nullable=True))
+    op.create_index(INDEX_NAME, 'fee_payments', ['reference'], unique=True)
+
+
+def downgrade():
+    columns = _payment_columns()
+    if columns is None or 'reference' not in columns:
+        return
+    op.drop_index(INDEX_NAME, table_name='fee_payments')
+    with op.batch_alter_table('fee_payments') as batch_op:
+        batch_op.drop_column('reference')
@@ -0,0 +1,45 @@
+"""add the revoked_tokens table for JWT revocation
+
+Revision ID: d4e8a1c3f6b2
+Revises: c82e5b0d4a17
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8a1c3f6b2'
+down_revision = 'c82e5b0d4a17'
+branch_labels = None
+depends_on = None
+
+
+def _has_table():
+    return 'revoked_tokens' in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if _has_table():
+        return
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('token_type', sa.String(length=10), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('jti'),
+        sqlite_autoincrement=True,
+    )
+    op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'])
+
+
+def downgrade():
+    if not _has_table():
+        return
+    op.drop_index('ix_revoked_tokens_expires_at', table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
@@ -0,0 +1,126 @@
+"""bring students, fee types, fees and payments under alembic; add read indexes
+
+Revision ID: e7c3a9f1b5d2
+Revises: d4e8a1c3f6b2
+Create Date: 2026-10-18 17:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c3a9f1b5d2'
+down_revision = 'd4e8a1c3f6b2'
+branch_labels = None
+depends_on = None
+
+# Created on tables that exist, whoever made them. (table, name, columns)
+INDEXES = [
+    ('students', 'ix_students_class_section_roll', ['class_name', 'section', 'roll_number']),
+    ('students', 'ix_students_school_joined_date', ['school_joined_date']),
+    ('fees', 'ix_fees_student_id', ['student_id']),
+    ('fees', 'ix_fees_academic_year', ['academic_year']),
+    ('fee_payments', 'ix_fee_payments_fee_date', ['fee_id', 'payment_date']),
+]
+
+
+def _create_tables(existing):
+    # Until now these came from db.create_all() (`flask init-db`), and the
+    # revisions above skip themselves when a table is missing; on a fresh
+    # database they are created here as they stand at this revision.
+    if 'students' not in existing:
+        op.create_table(
+            'students',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('student_name', sa.String(length=100), nullable=False),
+            sa.Column('parents_name', sa.String(length=100), nullable=False),
+            sa.Column('roll_number', sa.String(length=20), nullable=False),
+            sa.Column('class_name', sa.String(length=20), nullable=False),
+            sa.Column('section', sa.String(length=10), nullable=False),
+            sa.Column('school_joined_date', sa.Date(), nullable=False),
+            sa.Column('date_of_birth', sa.Date(), nullable=False),
+            sa.Column('phone_number', sa.String(length=20), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('roll_number'),
+        )
+    if 'fee_types' not in existing:
+        op.create_table(
+            'fee_types',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('description', sa.String(length=200), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name'),
+        )
+    if 'fees' not in existing:
+        op.create_table(
+            'fees',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('fee_type_id', sa.Integer(), nullable=False),
+            sa.Column('total_amount', sa.Float(), nullable=False),
+            sa.Column('amount_paid', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('academic_year', sa.String(length=9), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+            sa.ForeignKeyConstraint(['fee_type_id'], ['fee_types.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ux_fees_student_type_year', 'fees', ['student_id', 'fee_type_id', 'academic_year'],
+                        unique=True)
+    if 'fee_payments' not in existing:
+        op.create_table(
+            'fee_payments',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('fee_id', sa.Integer(), nullable=False),
+            sa.Column('amount_paid', sa.Float(), nullable=False),
+            sa.Column('payment_date', sa.DateTime(), nullable=False),
+            sa.Column('payment_method', sa.String(length=50), nullable=True),
+            sa.Column('remarks', sa.String(length=200), nullable=True),
+            sa.Column('reference', sa.String(length=100), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['fee_id'], ['fees.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ux_fee_payments_reference', 'fee_payments', ['reference'], unique=True)
+
+
+def _indexable():
+    """(table, name, columns) of INDEXES whose table and columns exist, with
+    whether the index does already."""
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    found = []
+    for table, name, columns in INDEXES:
+        if table not in tables:
+            continue
+        # Databases from before fee types have a different fees table
+        if not set(columns) <= {column['name'] for column in inspector.get_columns(table)}:
+            continue
+        found.append((table, name, columns, name in {index['name'] for index in inspector.get_indexes(table)}))
+    return found
+
+
+def upgrade():
+    _create_tables(set(sa.inspect(op.get_bind()).get_table_names()))
+    for table, name, columns, exists in _indexable():
+        if not exists:
+            op.create_index(name, table, columns)
+    # Fresh statistics, so the planner weighs the new indexes properly.
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ANALYZE')
+
+
+def downgrade():
+    # The tables hold the school's records and usually predate this
+    # revision; only the indexes are taken back out.
+    for table, name, columns, exists in _indexable():
+        if exists:
+            op.drop_index(name, table_name=table)
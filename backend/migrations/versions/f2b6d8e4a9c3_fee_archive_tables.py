@@ -0,0 +1,86 @@
+"""add fees_archive, fee_payments_archive and archived_years
+
+Revision ID: f2b6d8e4a9c3
+Revises: e7c3a9f1b5d2
+Create Date: 2026-10-18 19:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b6d8e4a9c3'
+down_revision = 'e7c3a9f1b5d2'
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    existing = _tables()
+    if 'fees_archive' not in existing:
+        op.create_table(
+            'fees_archive',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('fee_type_id', sa.Integer(), nullable=False),
+            sa.Column('total_amount', sa.Float(), nullable=False),
+            sa.Column('amount_paid', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('academic_year', sa.String(length=9), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+            sa.ForeignKeyConstraint(['fee_type_id'], ['fee_types.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_fees_archive_student_id', 'fees_archive', ['student_id'])
+        op.create_index('ix_fees_archive_academic_year', 'fees_archive', ['academic_year'])
+    if 'fee_payments_archive' not in existing:
+        op.create_table(
+            'fee_payments_archive',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('fee_id', sa.Integer(), nullable=False),
+            sa.Column('amount_paid', sa.Float(), nullable=False),
+            sa.Column('payment_date', sa.DateTime(), nullable=False),
+            sa.Column('payment_method', sa.String(length=50), nullable=True),
+            sa.Column('remarks', sa.String(length=200), nullable=True),
+            sa.Column('reference', sa.String(length=100), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['fee_id'], ['fees_archive.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_fee_payments_archive_fee_date', 'fee_payments_archive', ['fee_id', 'payment_date'])
+        op.create_index('ix_fee_payments_archive_payment_date', 'fee_payments_archive', ['payment_date'])
+    if 'archived_years' not in existing:
+        op.create_table(
+            'archived_years',
+            sa.Column('academic_year', sa.String(length=9), nullable=False),
+            sa.Column('fee_count', sa.Integer(), nullable=False),
+            sa.Column('payment_count', sa.Integer(), nullable=False),
+            sa.Column('total_billed', sa.Float(), nullable=False),
+            sa.Column('total_collected', sa.Float(), nullable=False),
+            sa.Column('archived_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('academic_year'),
+        )
+
+
+def downgrade():
+    existing = _tables()
+    # Dropping the tables would drop the archived years with them.
+    if 'archived_years' in existing and op.get_bind().execute(sa.text('SELECT count(*) FROM archived_years')).scalar():
+        raise RuntimeError('Restore the archived academic years (flask restore-year) before downgrading')
+    if 'fee_payments_archive' in existing:
+        op.drop_index('ix_fee_payments_archive_payment_date', table_name='fee_payments_archive')
+        op.drop_index('ix_fee_payments_archive_fee_date', table_name='fee_payments_archive')
+        op.drop_table('fee_payments_archive')
+    if 'fees_archive' in existing:
+        op.drop_index('ix_fees_archive_academic_year', table_name='fees_archive')
+        op.drop_index('ix_fees_archive_student_id', table_name='fees_archive')
+        op.drop_table('fees_archive')
+    if 'archived_years' in existing:
+        op.drop_table('archived_years')
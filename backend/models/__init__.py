@@ -1,10 +1,16 @@
 from flask_sqlalchemy import SQLAlchemy
+from .session import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Import models after db is defined
 from .student import Student
 from .user import User
 from .fee import Fee, FeeType, FeePayment
+from .archive import ArchivedYear
+from . import search  # registers the students_fts DDL hook
+from . import rollups  # registers the dashboard rollup DDL hook
+from . import counts  # registers the count cache invalidation hooks
+from . import cache  # registers the entity cache invalidation hooks
 
-__all__ = ['db', 'Student', 'User', 'Fee', 'FeeType', 'FeePayment']
+__all__ = ['db', 'Student', 'User', 'Fee', 'FeeType', 'FeePayment', 'ArchivedYear']
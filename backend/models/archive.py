@@ -0,0 +1,90 @@
+from datetime import datetime
+from sqlalchemy import Column, Table, union, union_all
+from sqlalchemy.sql import visitors
+from models import db
+from models.fee import Fee, FeePayment
+
+# Closed academic years live here instead of in fees/fee_payments: same
+# columns and ids, so a year can be moved back unchanged. Rows are only
+# ever written by services.archive, a whole year at a time.
+ArchivedFee = Table(
+    'fees_archive', db.metadata,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('student_id', db.Integer, db.ForeignKey('students.id'), nullable=False),
+    db.Column('fee_type_id', db.Integer, db.ForeignKey('fee_types.id'), nullable=False),
+    db.Column('total_amount', db.Float, nullable=False),
+    db.Column('amount_paid', db.Float, nullable=False, server_default='0'),
+    db.Column('academic_year', db.String(9), nullable=False),
+    db.Column('created_at', db.DateTime, nullable=False),
+    db.Column('updated_at', db.DateTime),
+    db.Index('ix_fees_archive_student_id', 'student_id'),
+    db.Index('ix_fees_archive_academic_year', 'academic_year'),
+)
+
+ArchivedFeePayment = Table(
+    'fee_payments_archive', db.metadata,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('fee_id', db.Integer, db.ForeignKey('fees_archive.id'), nullable=False),
+    db.Column('amount_paid', db.Float, nullable=False),
+    db.Column('payment_date', db.DateTime, nullable=False),
+    db.Column('payment_method', db.String(50)),
+    db.Column('remarks', db.String(200)),
+    db.Column('reference', db.String(100)),
+    db.Column('created_at', db.DateTime, nullable=False),
+    db.Column('updated_at', db.DateTime),
+    db.Index('ix_fee_payments_archive_fee_date', 'fee_id', 'payment_date'),
+    # Monthly revenue of archived years, for the dashboard's include_archived
+    db.Index('ix_fee_payments_archive_payment_date', 'payment_date'),
+)
+
+
+class ArchivedYear(db.Model):
+    """One archived academic year, with the totals it had when archived."""
+    __tablename__ = 'archived_years'
+
+    academic_year = db.Column(db.String(9), primary_key=True)
+    fee_count = db.Column(db.Integer, nullable=False)
+    payment_count = db.Column(db.Integer, nullable=False)
+    total_billed = db.Column(db.Float, nullable=False)
+    total_collected = db.Column(db.Float, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'academic_year': self.academic_year,
+            'fee_count': self.fee_count,
+            'payment_count': self.payment_count,
+            'total_billed': self.total_billed,
+            'total_collected': self.total_collected,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+
+ARCHIVE_TABLES = {
+    Fee.__table__: ArchivedFee,
+    FeePayment.__table__: ArchivedFeePayment,
+}
+
+
+def against_archive(statement):
+    """A copy of `statement` reading fees_archive and fee_payments_archive
+    wherever it reads fees and fee_payments."""
+    def replace(element):
+        if isinstance(element, Table):
+            return ARCHIVE_TABLES.get(element)
+        if isinstance(element, Column) and isinstance(element.table, Table) and element.table in ARCHIVE_TABLES:
+            return ARCHIVE_TABLES[element.table].c[element.key]
+        return None
+    return visitors.replacement_traverse(statement, {}, replace)
+
+
+def with_archive(statement, distinct=False, name=None):
+    """`statement` over the live tables UNION ALL (UNION when `distinct`)
+    the same over the archive, as a subquery with the statement's columns.
+
+    ORDER BY and LIMIT do not carry over; apply them to a select from the
+    subquery.
+    """
+    statement = statement.order_by(None)
+    combine = union if distinct else union_all
+    return combine(statement, against_archive(statement)).subquery(name)
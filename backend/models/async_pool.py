@@ -0,0 +1,47 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncReader:
+    """Runs SELECTs for asyncio code on a bounded set of threads.
+
+    sqlite3 blocks, so each statement runs on one of `size` threads using a
+    pooled connection of `engine` (the app's read-only engine); coroutines
+    past that wait on a semaphore rather than a thread, so any number of
+    requests can be in flight while at most `size` queries run. Statements
+    are SQLAlchemy Core selects; compiling them, the statement cache and
+    result processing happen on the thread too, exactly as on the sync
+    path, and rows come back the same.
+    """
+
+    def __init__(self, engine, size=8):
+        self.engine = engine
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='sqlite-read')
+        self._semaphores = {}  # event loop -> semaphore; uvicorn runs one loop per worker
+
+    def _run(self, statement, one):
+        with self.engine.connect() as connection:
+            result = connection.execute(statement)
+            return result.first() if one else result.all()
+
+    async def _execute(self, statement, one):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.size)
+        async with semaphore:
+            return await loop.run_in_executor(self._executor, self._run, statement, one)
+
+    async def all(self, statement):
+        return await self._execute(statement, one=False)
+
+    async def first(self, statement):
+        return await self._execute(statement, one=True)
+
+    async def scalar(self, statement):
+        row = await self.first(statement)
+        return row[0] if row is not None else None
+
+    def close(self):
+        self._executor.shutdown(wait=True)
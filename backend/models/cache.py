@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper, Session, object_session
+
+_MISSING = object()
+
+
+class ModelCache:
+    """Bounded per-process LRU cache with a TTL and hit/miss counters.
+
+    Holds immutable values (column tuples, names) keyed by primary key.
+    `None` results are not stored, so lookups of missing rows always reach
+    the database.
+    """
+
+    def __init__(self, name, ttl=300, max_entries=2048):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, load):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        value = load()
+        if value is None:
+            return None
+        with self._lock:
+            # Skip the store if an invalidation raced with the load.
+            if generation == self._generation:
+                self._entries[key] = (value, now + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key=None):
+        """Drop one entry, or everything when `key` is None."""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def configure(self, ttl=None, max_entries=None):
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+class FileInvalidationChannel:
+    """Shares cache invalidations between worker processes via a log file.
+
+    Each invalidation is appended as one JSON line (O_APPEND keeps small
+    writes whole); every worker remembers how far it has read and replays
+    newer lines. When the file outgrows `max_bytes` it is replaced, and a
+    worker that sees a new inode drops all its caches rather than guess
+    what it missed.
+    """
+
+    def __init__(self, path, poll_interval=1.0, max_bytes=1024 * 1024):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._next_poll = 0.0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._inode, self._offset = self._position()
+
+    def _position(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None, 0
+        return stat.st_ino, stat.st_size
+
+    def publish(self, name, key=None):
+        line = json.dumps({'pid': os.getpid(), 'cache': name, 'key': key}) + '\n'
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > self.max_bytes:
+            # Readers notice the inode change and start over.
+            os.replace(self.path, self.path + '.old')
+
+    def poll(self, apply):
+        """Replay invalidations published by other processes since the last poll."""
+        now = time.monotonic()
+        if now < self._next_poll:
+            return
+        with self._lock:
+            self._next_poll = now + self.poll_interval
+            inode, size = self._position()
+            if self._inode is None and inode is not None:
+                # First publish since this worker started: read it all.
+                self._inode, self._offset = inode, 0
+            elif inode != self._inode:
+                self._inode, self._offset = inode, size
+                apply(None, None)
+                return
+            if size <= self._offset:
+                return
+            with open(self.path, 'rb') as log:
+                log.seek(self._offset)
+                data = log.read(size - self._offset)
+            # Leave a partially written last line for the next poll.
+            complete = data.rfind(b'\n') + 1
+            self._offset += complete
+        pid = os.getpid()
+        for line in data[:complete].splitlines():
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get('pid') != pid:
+                apply(message.get('cache'), message.get('key'))
+
+
+student_rows = ModelCache('student_rows')
+fee_type_names = ModelCache('fee_type_names')
+# Auth user profiles for /me and /refresh; short-lived so a deactivation
+# is honoured quickly even without the cross-worker channel.
+auth_users = ModelCache('auth_users', ttl=30)
+
+# name -> object with invalidate(key=None); other modules register their
+# caches so cross-worker invalidations reach them too.
+_caches = {cache.name: cache for cache in (student_rows, fee_type_names, auth_users)}
+_channel = None
+
+
+def register_cache(name, cache):
+    _caches[name] = cache
+
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in _caches.items() if hasattr(cache, 'stats')}
+
+
+def _invalidate_local(name, key=None):
+    if name is None:
+        for cache in _caches.values():
+            cache.invalidate()
+        return
+    cache = _caches.get(name)
+    if cache is None:
+        return
+    if key is None:
+        cache.invalidate()
+    else:
+        cache.invalidate(key)
+
+
+def invalidate_cache(name, key=None):
+    """Invalidate an entry (or a whole cache) here and in the other workers."""
+    _invalidate_local(name, key)
+    if _channel is not None:
+        _channel.publish(name, key)
+
+
+def init_cache(app):
+    """Apply MODEL_CACHE_* settings and start the cross-worker channel if set."""
+    global _channel
+    ttl = app.config.get('MODEL_CACHE_TTL')
+    size = app.config.get('MODEL_CACHE_SIZE')
+    for cache in (student_rows, fee_type_names):
+        cache.configure(ttl=ttl, max_entries=size)
+    auth_users.configure(ttl=app.config.get('AUTH_USER_CACHE_TTL'), max_entries=size)
+
+    path = app.config.get('MODEL_CACHE_CHANNEL')
+    if not path:
+        _channel = None
+        return
+    _channel = FileInvalidationChannel(path, poll_interval=app.config.get('MODEL_CACHE_CHANNEL_POLL', 1.0))
+
+    @app.before_request
+    def _poll_cache_invalidations():
+        if _channel is not None:
+            _channel.poll(_invalidate_local)
+
+
+# Entity caches keyed by primary key, per table. Matched by table name so
+# the models can use the caches without an import cycle.
+_ENTITY_CACHES = {
+    'students': student_rows.name,
+    'fee_types': fee_type_names.name,
+    'user': auth_users.name,
+}
+
+
+def _record_write(mapper, connection, target):
+    name = _ENTITY_CACHES.get(mapper.local_table.name)
+    if name is None:
+        return
+    # Drop it now so this session can't read a stale copy, and again after
+    # commit in case another request reloaded the old row meanwhile.
+    _invalidate_local(name, target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('cache_invalidations', set()).add((name, target.id))
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Mapper, _event_name, _record_write)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_invalidations(session):
+    for name, key in session.info.pop('cache_invalidations', ()):
+        invalidate_cache(name, key)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_invalidations(session, previous_transaction):
+    session.info.pop('cache_invalidations', None)
@@ -0,0 +1,67 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models.student import Student
+from models.cache import register_cache, invalidate_cache
+
+
+class CountCache:
+    """Per-process cache of COUNT(*) results for list endpoints.
+
+    Entries are dropped whenever a commit touches a Student (in other workers
+    too when the cache invalidation channel is configured), and expire after
+    `ttl` seconds regardless.
+    """
+
+    def __init__(self, ttl=300, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        value = compute()
+        with self._lock:
+            # Skip the store if an invalidation raced with the count.
+            if generation == self._generation:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+                self._entries[key] = (value, now + self.ttl)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+student_counts = CountCache()
+register_cache('student_counts', student_counts)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_student_writes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Student):
+            session.info['students_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_student_counts(session):
+    if session.info.pop('students_changed', False):
+        invalidate_cache('student_counts')
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_student_writes(session, previous_transaction):
+    session.info.pop('students_changed', None)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from models import db
+from models.cache import fee_type_names
 
 class FeeType(db.Model):
     __tablename__ = 'fee_types'
@@ -21,11 +22,22 @@ class FeeType(db.Model):
 
 class Fee(db.Model):
     __tablename__ = 'fees'
+    __table_args__ = (
+        # One fee per head per student per year; bulk assignment relies on
+        # it to skip fees that already exist.
+        db.Index('ux_fees_student_type_year', 'student_id', 'fee_type_id', 'academic_year', unique=True),
+        # The ledger reads a student's fees in id order to group them; the
+        # unique index above has the wrong tail for that.
+        db.Index('ix_fees_student_id', 'student_id'),
+        db.Index('ix_fees_academic_year', 'academic_year'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
     fee_type_id = db.Column(db.Integer, db.ForeignKey('fee_types.id'), nullable=False)
     total_amount = db.Column(db.Float, nullable=False)
+    # Running sum of fee_payments.amount_paid, maintained by services.payments
+    amount_paid = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
     academic_year = db.Column(db.String(9), nullable=False)  # Format: 2023-2024
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
@@ -34,12 +46,19 @@ class Fee(db.Model):
     student = db.relationship('Student', backref=db.backref('fees', lazy=True))
     fee_type = db.relationship('FeeType', backref=db.backref('fees', lazy=True))
 
+    def _load_fee_type_name(self):
+        return db.session.query(FeeType.name).filter(FeeType.id == self.fee_type_id).scalar()
+
+    @property
+    def balance(self):
+        return self.total_amount - (self.amount_paid or 0.0)
+
     def to_dict(self):
         return {
             'id': self.id,
             'student_id': self.student_id,
             'fee_type_id': self.fee_type_id,
-            'fee_type_name': self.fee_type.name,
+            'fee_type_name': fee_type_names.get_or_load(self.fee_type_id, self._load_fee_type_name),
             'total_amount': self.total_amount,
             'academic_year': self.academic_year,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -48,6 +67,12 @@ class Fee(db.Model):
 
 class FeePayment(db.Model):
     __tablename__ = 'fee_payments'
+    __table_args__ = (
+        # Bank/gateway transaction id; batch posting skips ones already seen.
+        db.Index('ux_fee_payments_reference', 'reference', unique=True),
+        # A fee's payments, in date order for the payment date filters.
+        db.Index('ix_fee_payments_fee_date', 'fee_id', 'payment_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     fee_id = db.Column(db.Integer, db.ForeignKey('fees.id'), nullable=False)
@@ -55,6 +80,7 @@ class FeePayment(db.Model):
     payment_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     payment_method = db.Column(db.String(50))  # cash, card, bank transfer, etc.
     remarks = db.Column(db.String(200))
+    reference = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
@@ -69,6 +95,7 @@ class FeePayment(db.Model):
             'payment_date': self.payment_date.isoformat() if self.payment_date else None,
             'payment_method': self.payment_method,
             'remarks': self.remarks,
+            'reference': self.reference,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
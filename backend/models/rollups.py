@@ -0,0 +1,179 @@
+from sqlalchemy import event, text
+from models import db
+
+# Dashboard rollups. Each table holds running totals that triggers on
+# students, fees and fee_payments adjust on every insert, update and delete,
+# so the dashboard reads a handful of small rows instead of aggregating the
+# full history. Like students_fts this is SQLite-only; rebuild_rollups()
+# recomputes everything from the base tables.
+ROLLUP_TABLES = ('stats_class_counts', 'stats_monthly', 'stats_fee_years')
+
+_CREATE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS stats_class_counts (
+        class_name VARCHAR(20) NOT NULL,
+        section VARCHAR(10) NOT NULL,
+        student_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (class_name, section)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stats_monthly (
+        month CHAR(7) PRIMARY KEY,                   -- YYYY-MM
+        revenue FLOAT NOT NULL DEFAULT 0,            -- fee_payments.amount_paid by payment_date
+        payment_count INTEGER NOT NULL DEFAULT 0,
+        students_joined INTEGER NOT NULL DEFAULT 0   -- students by school_joined_date
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stats_fee_years (
+        academic_year VARCHAR(9) PRIMARY KEY,
+        fee_count INTEGER NOT NULL DEFAULT 0,
+        total_billed FLOAT NOT NULL DEFAULT 0,       -- fees.total_amount
+        total_collected FLOAT NOT NULL DEFAULT 0     -- fees.amount_paid
+    )
+    """,
+]
+
+
+def _class_delta(row, sign):
+    return f"""
+        INSERT INTO stats_class_counts (class_name, section, student_count)
+        VALUES ({row}.class_name, {row}.section, {sign}1)
+        ON CONFLICT (class_name, section) DO UPDATE SET student_count = student_count + excluded.student_count;
+        DELETE FROM stats_class_counts
+        WHERE class_name = {row}.class_name AND section = {row}.section AND student_count <= 0;
+    """
+
+
+def _joined_delta(row, sign):
+    return f"""
+        INSERT INTO stats_monthly (month, students_joined)
+        VALUES (strftime('%Y-%m', {row}.school_joined_date), {sign}1)
+        ON CONFLICT (month) DO UPDATE SET students_joined = students_joined + excluded.students_joined;
+    """
+
+
+def _revenue_delta(row, sign):
+    return f"""
+        INSERT INTO stats_monthly (month, revenue, payment_count)
+        VALUES (strftime('%Y-%m', {row}.payment_date), {sign}{row}.amount_paid, {sign}1)
+        ON CONFLICT (month) DO UPDATE SET
+            revenue = revenue + excluded.revenue,
+            payment_count = payment_count + excluded.payment_count;
+    """
+
+
+def _fee_delta(row, sign):
+    return f"""
+        INSERT INTO stats_fee_years (academic_year, fee_count, total_billed, total_collected)
+        VALUES ({row}.academic_year, {sign}1, {sign}{row}.total_amount, {sign}{row}.amount_paid)
+        ON CONFLICT (academic_year) DO UPDATE SET
+            fee_count = fee_count + excluded.fee_count,
+            total_billed = total_billed + excluded.total_billed,
+            total_collected = total_collected + excluded.total_collected;
+    """
+
+
+def _triggers(name, table, columns, delta):
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {table} BEGIN {delta('new', '+')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {table} BEGIN {delta('old', '-')} END",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF {columns} ON {table}
+            BEGIN {delta('old', '-')} {delta('new', '+')} END""",
+    ]
+
+
+_TRIGGERS = {
+    'stats_students_class': ('students', 'class_name, section', _class_delta),
+    'stats_students_joined': ('students', 'school_joined_date', _joined_delta),
+    'stats_payments': ('fee_payments', 'amount_paid, payment_date', _revenue_delta),
+    'stats_fees': ('fees', 'academic_year, total_amount, amount_paid', _fee_delta),
+}
+
+_CREATE_TRIGGERS = [
+    statement
+    for name, (table, columns, delta) in _TRIGGERS.items()
+    for statement in _triggers(name, table, columns, delta)
+]
+
+_DROP_STATEMENTS = [
+    f"DROP TRIGGER IF EXISTS {name}_{suffix}" for name in _TRIGGERS for suffix in ('ai', 'ad', 'au')
+] + [f"DROP TABLE IF EXISTS {table}" for table in ROLLUP_TABLES]
+
+_REBUILD_STATEMENTS = [
+    *(f"DELETE FROM {table}" for table in ROLLUP_TABLES),
+    """
+    INSERT INTO stats_class_counts (class_name, section, student_count)
+    SELECT class_name, section, count(*) FROM students GROUP BY class_name, section
+    """,
+    """
+    INSERT INTO stats_monthly (month, students_joined)
+    SELECT strftime('%Y-%m', school_joined_date), count(*) FROM students GROUP BY 1
+    """,
+    """
+    INSERT INTO stats_monthly (month, revenue, payment_count)
+    SELECT strftime('%Y-%m', payment_date), sum(amount_paid), count(*) FROM fee_payments WHERE true GROUP BY 1
+    ON CONFLICT (month) DO UPDATE SET revenue = excluded.revenue, payment_count = excluded.payment_count
+    """,
+    """
+    INSERT INTO stats_fee_years (academic_year, fee_count, total_billed, total_collected)
+    SELECT academic_year, count(*), sum(total_amount), sum(amount_paid) FROM fees GROUP BY academic_year
+    """,
+]
+
+
+def _has_rollups(connection):
+    row = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_monthly'")
+    ).first()
+    return row is not None
+
+
+def install_rollups(connection, rebuild=False):
+    """Create the rollup tables and their triggers if missing.
+
+    The tables are filled from the base tables when first created, or when
+    `rebuild` is set. Returns False on non-SQLite databases.
+    """
+    if connection.dialect.name != 'sqlite':
+        return False
+
+    created = not _has_rollups(connection)
+    for statement in _CREATE_TABLES + _CREATE_TRIGGERS:
+        connection.exec_driver_sql(statement)
+    if created or rebuild:
+        rebuild_rollups(connection)
+    return True
+
+
+def rebuild_rollups(connection):
+    for statement in _REBUILD_STATEMENTS:
+        connection.exec_driver_sql(statement)
+
+
+def tidy_rollups(connection, academic_year):
+    """Clear what the triggers leave behind once a year's fees and payments
+    are bulk deleted (see services.archive): the year's empty
+    stats_fee_years row, and float residue in months left with no payments.
+    """
+    if connection.dialect.name != 'sqlite' or not _has_rollups(connection):
+        return
+    connection.execute(
+        text("DELETE FROM stats_fee_years WHERE academic_year = :year AND fee_count <= 0"),
+        {'year': academic_year}
+    )
+    connection.exec_driver_sql("UPDATE stats_monthly SET revenue = 0 WHERE payment_count <= 0 AND revenue != 0")
+
+
+def drop_rollups(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    for statement in _DROP_STATEMENTS:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_rollups(target, connection, **kw):
+    # After the whole metadata, so the trigger tables exist.
+    install_rollups(connection)
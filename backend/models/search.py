@@ -0,0 +1,142 @@
+import re
+from sqlalchemy import event, text, Integer, Float
+from models.student import Student
+
+# Full-text index over the searchable student columns. It is an FTS5
+# "external content" table: the text lives in `students`, the index only
+# stores tokens, and the triggers below keep it in sync for every write
+# path (ORM, core inserts, raw SQL).
+SEARCH_TABLE = 'students_fts'
+SEARCH_COLUMNS = ('student_name', 'roll_number', 'parents_name')
+
+# bm25 weights, in SEARCH_COLUMNS order: a hit on the student's own name
+# ranks above a roll-number hit, which ranks above a parent's name.
+RANK_WEIGHTS = (10.0, 5.0, 1.0)
+
+_CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        student_name, roll_number, parents_name,
+        content='students', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='1 2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON students BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, student_name, roll_number, parents_name)
+        VALUES (new.id, new.student_name, new.roll_number, new.parents_name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON students BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, student_name, roll_number, parents_name)
+        VALUES ('delete', old.id, old.student_name, old.roll_number, old.parents_name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au
+    AFTER UPDATE OF student_name, roll_number, parents_name ON students BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, student_name, roll_number, parents_name)
+        VALUES ('delete', old.id, old.student_name, old.roll_number, old.parents_name);
+        INSERT INTO {SEARCH_TABLE}(rowid, student_name, roll_number, parents_name)
+        VALUES (new.id, new.student_name, new.roll_number, new.parents_name);
+    END
+    """,
+]
+
+_DROP_STATEMENTS = [
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_au",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+# Engine URLs known to carry a usable index, so the check is done once per
+# process instead of once per request.
+_available = {}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _has_table(connection):
+    row = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': SEARCH_TABLE}
+    ).first()
+    return row is not None
+
+
+def install_search_index(connection, rebuild=False):
+    """Create the FTS table and sync triggers if missing.
+
+    The index is populated from `students` when it is first created, or
+    when `rebuild` is set. Returns False on non-SQLite databases.
+    """
+    if connection.dialect.name != 'sqlite':
+        return False
+
+    created = not _has_table(connection)
+    for statement in _CREATE_STATEMENTS:
+        connection.exec_driver_sql(statement)
+    if created or rebuild:
+        connection.exec_driver_sql(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+    _available[str(connection.engine.url)] = True
+    return True
+
+
+def drop_search_index(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    for statement in _DROP_STATEMENTS:
+        connection.exec_driver_sql(statement)
+    _available.pop(str(connection.engine.url), None)
+
+
+def search_index_available(session):
+    bind = session.get_bind()
+    key = str(bind.url)
+    if key not in _available:
+        if bind.dialect.name != 'sqlite':
+            _available[key] = False
+        else:
+            with bind.connect() as connection:
+                _available[key] = _has_table(connection)
+    return _available[key]
+
+
+def build_match_expression(search):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every whitespace separated term becomes a quoted phrase with a prefix
+    marker on its last token, and the terms are ANDed together, so
+    `"sar smi"` finds "Sarah Smith" and `2025-00` finds roll number
+    "2025-002". Returns None when the input has no indexable tokens.
+    """
+    phrases = []
+    for term in search.split():
+        tokens = _TOKEN_RE.findall(term)
+        if tokens:
+            phrases.append('"%s"*' % ' '.join(tokens))
+    if not phrases:
+        return None
+    return ' '.join(phrases)
+
+
+def search_matches(match_expression):
+    """Subquery of (id, score) for students matching the expression.
+
+    Lower scores rank higher, as with SQLite's bm25().
+    """
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    return text(
+        f"SELECT rowid AS id, bm25({SEARCH_TABLE}, {weights}) AS score "
+        f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"
+    ).bindparams(match=match_expression).columns(id=Integer, score=Float).subquery('search_matches')
+
+
+@event.listens_for(Student.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    install_search_index(connection)
@@ -0,0 +1,112 @@
+from models.student import Student
+from models.fee import Fee, FeeType, FeePayment
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+class ModelSerializer:
+    """Turns selected column tuples into the same dicts as Model.to_dict().
+
+    Read endpoints select `serializer.columns` instead of whole entities, so
+    rows skip identity-map and change-tracking work, and each row is turned
+    into a dict with one zip plus the few date conversions the model needs.
+    """
+
+    __slots__ = ('keys', 'columns', 'converters', 'width', '_fields', '_projections')
+
+    def __init__(self, fields):
+        self.keys = tuple(key for key, _, _ in fields)
+        self.columns = tuple(column for _, column, _ in fields)
+        self.converters = tuple((key, convert) for key, _, convert in fields if convert)
+        self.width = len(fields)
+        self._fields = tuple(fields)
+        self._projections = {}
+
+    def __call__(self, row):
+        data = dict(zip(self.keys, row))
+        for key, convert in self.converters:
+            data[key] = convert(data[key])
+        return data
+
+    def many(self, rows):
+        return [self(row) for row in rows]
+
+    def index(self, column):
+        """Position of `column` within a selected row."""
+        return self.columns.index(column)
+
+    def project(self, keys):
+        """Serializer for just `keys` (None: all of them), in this one's order.
+
+        Rows may carry extra trailing columns (cursor keys, validators); the
+        serializer ignores them. Raises ValueError naming unknown keys.
+        """
+        if keys is None:
+            return self
+        keys = frozenset(keys)
+        projection = self._projections.get(keys)
+        if projection is None:
+            unknown = keys.difference(self.keys)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            # Unknown keys are rejected above, so this stays bounded.
+            projection = self._projections[keys] = ModelSerializer(
+                [field for field in self._fields if field[0] in keys])
+        return projection
+
+
+def parse_fields(value):
+    """`?fields=a,b` -> ('a', 'b'); None when absent or empty (all fields)."""
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(filter(None, (part.strip() for part in value.split(',')))))
+    return fields or None
+
+
+student_serializer = ModelSerializer([
+    ('id', Student.id, None),
+    ('studentName', Student.student_name, None),
+    ('parentsName', Student.parents_name, None),
+    ('rollNumber', Student.roll_number, None),
+    ('class', Student.class_name, None),
+    ('section', Student.section, None),
+    ('schoolJoinedDate', Student.school_joined_date, _iso),
+    ('dateOfBirth', Student.date_of_birth, _iso),
+    ('phoneNumber', Student.phone_number, None),
+    ('createdAt', Student.created_at, _iso),
+    ('updatedAt', Student.updated_at, _iso),
+])
+
+fee_type_serializer = ModelSerializer([
+    ('id', FeeType.id, None),
+    ('name', FeeType.name, None),
+    ('description', FeeType.description, None),
+    ('created_at', FeeType.created_at, _iso),
+    ('updated_at', FeeType.updated_at, _iso),
+])
+
+# Needs fee_types joined in, for fee_type_name.
+fee_serializer = ModelSerializer([
+    ('id', Fee.id, None),
+    ('student_id', Fee.student_id, None),
+    ('fee_type_id', Fee.fee_type_id, None),
+    ('fee_type_name', FeeType.name, None),
+    ('total_amount', Fee.total_amount, None),
+    ('academic_year', Fee.academic_year, None),
+    ('created_at', Fee.created_at, _iso),
+    ('updated_at', Fee.updated_at, _iso),
+])
+
+payment_serializer = ModelSerializer([
+    ('id', FeePayment.id, None),
+    ('fee_id', FeePayment.fee_id, None),
+    ('amount_paid', FeePayment.amount_paid, None),
+    ('payment_date', FeePayment.payment_date, _iso),
+    ('payment_method', FeePayment.payment_method, None),
+    ('remarks', FeePayment.remarks, None),
+    ('reference', FeePayment.reference, None),
+    ('created_at', FeePayment.created_at, _iso),
+    ('updated_at', FeePayment.updated_at, _iso),
+])
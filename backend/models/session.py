@@ -0,0 +1,25 @@
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql import Select
+
+READER_BIND = 'reader'
+
+# Requests that never write; their SELECTs may use the read-only engine.
+READ_METHODS = frozenset(('GET', 'HEAD'))
+
+
+class RoutingSession(Session):
+    """Sends SELECTs issued while serving GET/HEAD requests to the reader bind.
+
+    With WAL, the read-only engine's connections never take the write lock,
+    so list and detail endpoints keep serving while a payment burst holds it.
+    Flushes, writes and anything outside a read request use the default bind.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and isinstance(clause, Select)
+                and has_request_context() and request.method in READ_METHODS):
+            reader = self._db.engines.get(READER_BIND)
+            if reader is not None:
+                return reader
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,121 @@
+import random
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from flask import current_app
+from models import db
+from models.session import READER_BIND
+
+
+def _sqlite_file(uri):
+    """Path of a file-backed SQLite URI, or None (memory DBs, other dialects)."""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    return url
+
+
+def _reader_uri(url):
+    return url.set(database=f'file:{url.database}', query={'mode': 'ro', 'uri': 'true'}).render_as_string(
+        hide_password=False)
+
+
+def _pragma_listener(pragmas):
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+    return apply_pragmas
+
+
+def init_db(app):
+    """Initialise `db` on the app with the configured SQLite storage profile.
+
+    Applies SQLITE_PRAGMAS on every new connection (WAL, synchronous,
+    cache/mmap sizes, busy_timeout) and, with SQLITE_READER_ENGINE, adds a
+    read-only `reader` bind that GET requests use for their queries.
+    """
+    url = _sqlite_file(app.config['SQLALCHEMY_DATABASE_URI'])
+    use_reader = url is not None and app.config.get('SQLITE_READER_ENGINE')
+    if use_reader:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds.setdefault(READER_BIND, _reader_uri(url))
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+    db.init_app(app)
+
+    pragmas = dict(app.config.get('SQLITE_PRAGMAS') or {})
+    if not pragmas:
+        return
+    with app.app_context():
+        engines = db.engines
+        default = engines[None]
+        if default.dialect.name == 'sqlite':
+            event.listen(default, 'connect', _pragma_listener(pragmas))
+        if use_reader:
+            # journal_mode is a property of the file and needs write access;
+            # the writer sets it.
+            reader_pragmas = {name: value for name, value in pragmas.items() if name != 'journal_mode'}
+            reader_pragmas['query_only'] = 'ON'
+            event.listen(engines[READER_BIND], 'connect', _pragma_listener(reader_pragmas))
+
+
+def is_busy_error(error):
+    message = str(getattr(error, 'orig', error)).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def violates_unique_index(error, index_name, table):
+    """Whether IntegrityError `error` is a violation of the unique index
+    `index_name` on `table`.
+
+    SQLite names the columns rather than the index ("UNIQUE constraint
+    failed: fees.student_id, ..."), so those are matched too.
+    """
+    message = str(getattr(error, 'orig', error))
+    index = next(index for index in table.indexes if index.name == index_name)
+    columns = ', '.join(f'{table.name}.{column.name}' for column in index.columns)
+    return index_name in message or message.endswith(f'UNIQUE constraint failed: {columns}')
+
+
+def _begin_immediate():
+    # pysqlite only emits a deferred BEGIN before the first write, so a
+    # transaction that reads first can hit SQLITE_BUSY on its first write
+    # without the busy handler ever running. Taking the write lock up front
+    # makes writers queue on busy_timeout instead.
+    connection = db.session.connection()
+    if connection.dialect.name != 'sqlite':
+        return
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def write_transaction(work, *args, **kwargs):
+    """Run `work(*args, **kwargs)` in a write transaction and commit it.
+
+    When SQLite still reports the database locked after busy_timeout, the
+    transaction is rolled back and retried up to SQLITE_BUSY_RETRIES times
+    with jittered exponential backoff. `work` must therefore be safe to run
+    again from scratch. Returns whatever `work` returns.
+    """
+    retries = current_app.config.get('SQLITE_BUSY_RETRIES', 0)
+    backoff = current_app.config.get('SQLITE_BUSY_BACKOFF', 0.05)
+    attempt = 0
+    while True:
+        try:
+            _begin_immediate()
+            result = work(*args, **kwargs)
+            db.session.commit()
+            return result
+        except OperationalError as e:
+            db.session.rollback()
+            if not is_busy_error(e) or attempt >= retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+            attempt += 1
@@ -1,8 +1,17 @@
-from datetime import datetime
+import re
+from datetime import date, datetime
 from models import db
 
+_ISO_DATE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
 class Student(db.Model):
     __tablename__ = 'students'
+    __table_args__ = (
+        # Keyset pagination seeks through this in roster order; it also
+        # serves the class and section filters.
+        db.Index('ix_students_class_section_roll', 'class_name', 'section', 'roll_number'),
+        db.Index('ix_students_school_joined_date', 'school_joined_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     student_name = db.Column(db.String(100), nullable=False)
@@ -34,7 +43,8 @@ class Student(db.Model):
         }
 
     @staticmethod
-    def from_dict(data):
+    def columns_from_dict(data):
+        """Validate API-shaped data and return it as column values."""
         if not data:
             raise ValueError("No data provided")
 
@@ -46,24 +56,41 @@ class Student(db.Model):
             if not data.get(field):
                 raise ValueError(f"Missing required field: {field}")
 
+        # Text fields are used as set keys and bound parameters as they are,
+        # so nested JSON (objects, arrays) is rejected here.
+        for field in ('studentName', 'parentsName', 'rollNumber', 'class', 'section', 'phoneNumber'):
+            if not isinstance(data[field], (str, int, float)):
+                raise ValueError(f"Invalid value for {field}: expected text")
+
         def parse_date(date_str):
             if not date_str:
                 return None
+            # Fast path for the canonical form; strptime is slow enough to
+            # dominate bulk imports.
+            if isinstance(date_str, str) and _ISO_DATE.fullmatch(date_str):
+                try:
+                    return date.fromisoformat(date_str)
+                except ValueError:
+                    pass
             try:
                 return datetime.strptime(date_str, '%Y-%m-%d').date()
             except ValueError as e:
                 raise ValueError(f"Invalid date format for {date_str}. Please use YYYY-MM-DD format.")
 
         try:
-            return Student(
-                student_name=data['studentName'],
-                parents_name=data['parentsName'],
-                roll_number=data['rollNumber'],
-                class_name=data['class'],
-                section=data['section'],
-                school_joined_date=parse_date(data['schoolJoinedDate']),
-                date_of_birth=parse_date(data['dateOfBirth']),
-                phone_number=data['phoneNumber']
-            )
+            return {
+                'student_name': data['studentName'],
+                'parents_name': data['parentsName'],
+                'roll_number': data['rollNumber'],
+                'class_name': data['class'],
+                'section': data['section'],
+                'school_joined_date': parse_date(data['schoolJoinedDate']),
+                'date_of_birth': parse_date(data['dateOfBirth']),
+                'phone_number': data['phoneNumber']
+            }
         except Exception as e:
             raise ValueError(f"Error creating student: {str(e)}")
+
+    @staticmethod
+    def from_dict(data):
+        return Student(**Student.columns_from_dict(data))
@@ -0,0 +1,23 @@
+from flask import Blueprint, request, jsonify
+from services.dashboard import dashboard_stats
+from utils.filters import parse_flag
+from utils.responses import json_response
+import logging
+
+logger = logging.getLogger(__name__)
+
+dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
+
+@dashboard_bp.route('/stats', methods=['GET'])
+def get_dashboard_stats():
+    """Students by class/section, monthly revenue, outstanding dues and
+    month-over-month change, served from the rollup tables.
+
+    Archived academic years are left out unless include_archived=true.
+    """
+    try:
+        logger.debug("GET /api/dashboard/stats - Starting request")
+        return json_response(dashboard_stats(include_archived=parse_flag(request.args, 'include_archived')), 200)
+    except Exception as e:
+        logger.error("Error in get_dashboard_stats: %s", e, exc_info=True)
+        return jsonify({'error': str(e)}), 500
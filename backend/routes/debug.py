@@ -1,4 +1,7 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify
+from models.cache import cache_stats
+from services.credentials import credentials
+from utils.metrics import render_metrics
 
 debug_bp = Blueprint('debug', __name__)
 
@@ -6,5 +9,32 @@ debug_bp = Blueprint('debug', __name__)
 def health_check():
     return jsonify({'status': 'healthy'}), 200
 
+@debug_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint. Figures are per worker process."""
+    caches = cache_stats()
+    extra = {
+        'model_cache_hits_total': ('counter', 'Model cache hits.',
+                                   {(('cache', name),): stats['hits'] for name, stats in caches.items()}),
+        'model_cache_misses_total': ('counter', 'Model cache misses.',
+                                     {(('cache', name),): stats['misses'] for name, stats in caches.items()}),
+        'model_cache_entries': ('gauge', 'Entries currently cached.',
+                                {(('cache', name),): stats['size'] for name, stats in caches.items()}),
+    }
+    hashing = credentials.stats()
+    extra['password_hash_rejected_total'] = ('counter', 'Password hashes refused because the pool was full.',
+                                             {(): hashing['rejected']})
+    limiter = current_app.extensions.get('ratelimit')
+    if limiter is not None:
+        extra['rate_limited_total'] = ('counter', 'Requests refused by the rate limiter.',
+                                       {(('budget', name),): count for name, count in limiter.stats().items()})
+    histograms = {
+        'password_hash_queue_seconds': ('Time password hashes waited for a pool thread.', ('operation',),
+                                        hashing['queue_seconds']),
+        'password_hash_seconds': ('Time spent computing password hashes.', ('operation',),
+                                  hashing['hash_seconds']),
+    }
+    return Response(render_metrics(extra, histograms), mimetype='text/plain; version=0.0.4')
+
 # Export the blueprint
 __all__ = ['debug_bp']
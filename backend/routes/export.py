@@ -0,0 +1,35 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from services.export import DATASETS, EXPORT_FORMATS
+from utils.filters import parse_flag
+import logging
+
+logger = logging.getLogger(__name__)
+
+export_bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+@export_bp.route('/<dataset>', methods=['GET'])
+def export_dataset(dataset):
+    """Stream students, fees or payments as CSV or NDJSON.
+
+    Filters: class, section, academic_year; include_archived=true adds
+    archived academic years.
+    """
+    if dataset not in DATASETS:
+        return jsonify({'error': f"dataset must be one of: {', '.join(DATASETS)}"}), 404
+
+    file_format = request.args.get('format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    filters = {
+        'class': request.args.get('class'),
+        'section': request.args.get('section'),
+        'academic_year': request.args.get('academic_year'),
+        'include_archived': parse_flag(request.args, 'include_archived'),
+    }
+    logger.debug("GET /api/export/%s - format: %s, filters: %s", dataset, file_format, filters)
+
+    stream, mimetype = EXPORT_FORMATS[file_format]
+    response = Response(stream_with_context(stream(dataset, filters)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{dataset}.{file_format}"'
+    return response
@@ -1,9 +1,20 @@
 from flask import Blueprint, request, jsonify
-from models import db, Fee, FeeType, FeePayment, Student
+from werkzeug.exceptions import RequestEntityTooLarge
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from models import db, Fee, FeeType, Student
+from models.serializers import fee_type_serializer, parse_fields
+from services.ledger import student_fee_ledger, ledger_validator, ledger_plan, ledger_filters
+from services.payments import post_payment, PaymentError, FeeNotFound, FeeArchived, DuplicatePayment
+from services.payment_batch import post_payment_batch
+from services.student_import import iter_csv_rows, iter_ndjson_rows
+from services.fee_assignment import assign_fees, AssignmentError
+from services.archive import is_archived
+from models.storage import write_transaction, violates_unique_index
+from utils.conditional import make_etag, not_modified, add_validators
+from utils.responses import json_response
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 fee_bp = Blueprint('fee', __name__, url_prefix='/api')
@@ -12,118 +23,224 @@ fee_bp = Blueprint('fee', __name__, url_prefix='/api')
 def get_fee_types():
     try:
         logger.debug("GET /api/fee-types - Starting request")
-        fee_types = FeeType.query.all()
-        logger.debug(f"Found {len(fee_types)} fee types")
-        return jsonify({'fee_types': [ft.to_dict() for ft in fee_types]}), 200
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            serializer = fee_type_serializer.project(fields)
+        except ValueError as ve:
+            return jsonify({'error': str(ve)}), 400
+        count, last_modified = db.session.query(
+            func.count(FeeType.id), func.max(func.coalesce(FeeType.updated_at, FeeType.created_at))
+        ).one()
+        etag = make_etag('fee-types', count, last_modified, fields)
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+
+        fee_types = db.session.query(*serializer.columns).all()
+        logger.debug("Found %s fee types", len(fee_types))
+        response = json_response({'fee_types': serializer.many(fee_types)}, 200)
+        return add_validators(response, etag, last_modified)
     except Exception as e:
-        logger.error(f"Error in get_fee_types: {str(e)}", exc_info=True)
+        logger.error("Error in get_fee_types: %s", e, exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 @fee_bp.route('/fee-types', methods=['POST'])
 def create_fee_type():
     try:
         logger.debug("POST /api/fee-types - Starting request")
-        logger.debug(f"Request data: {request.get_json()}")
-        
         data = request.get_json()
+        logger.debug("Request data: %s", data)
         new_fee_type = FeeType(
             name=data['name'],
             description=data.get('description')
         )
-        db.session.add(new_fee_type)
-        db.session.commit()
+        write_transaction(db.session.add, new_fee_type)
         
-        logger.debug(f"Created new fee type: {new_fee_type.name}")
+        logger.debug("Created new fee type: %s", new_fee_type.name)
         return jsonify({'fee_type': new_fee_type.to_dict()}), 201
     except Exception as e:
-        logger.error(f"Error in create_fee_type: {str(e)}", exc_info=True)
+        logger.error("Error in create_fee_type: %s", e, exc_info=True)
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @fee_bp.route('/students/<int:student_id>/fees', methods=['GET'])
 def get_student_fees(student_id):
     try:
-        logger.debug(f"GET /api/students/{student_id}/fees - Starting request")
-        student = Student.query.get_or_404(student_id)
-        logger.debug(f"Found student: {student.name}")
-        
-        fees = Fee.query.filter_by(student_id=student_id).all()
-        logger.debug(f"Found {len(fees)} fees for student")
-        
-        fee_details = []
-        for fee in fees:
-            payments = FeePayment.query.filter_by(fee_id=fee.id).all()
-            total_paid = sum(payment.amount for payment in payments)
-            remaining = fee.total_amount - total_paid
-            
-            fee_dict = fee.to_dict()
-            fee_dict.update({
-                'total_paid': total_paid,
-                'remaining_amount': remaining,
-                'fee_type': fee.fee_type.to_dict() if fee.fee_type else None,
-                'payments': [payment.to_dict() for payment in payments]
-            })
-            fee_details.append(fee_dict)
+        logger.debug("GET /api/students/%s/fees - Starting request", student_id)
+        include_payments = 'payments' in set(filter(None, request.args.get('include', '').split(',')))
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            ledger_plan(fields)
+            filters = ledger_filters(request.args)
+        except ValueError as ve:
+            return jsonify({'error': str(ve)}), 400
+        validator = ledger_validator(student_id, include_archived=filters[-1])
+        if validator is None:
+            return jsonify({'error': 'Student not found'}), 404
+
+        fee_count, amount_paid, last_modified = validator
+        etag = make_etag('fees', student_id, include_payments, fee_count, amount_paid, last_modified, fields, filters)
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+
+        fee_details = student_fee_ledger(student_id, include_payments=include_payments, fields=fields,
+                                         filters=filters)
+        logger.debug("Found %s fees for student", len(fee_details))
         
-        return jsonify({'fees': fee_details}), 200
+        response = json_response({'fees': fee_details}, 200)
+        return add_validators(response, etag, last_modified)
     except Exception as e:
-        logger.error(f"Error in get_student_fees: {str(e)}", exc_info=True)
+        logger.error("Error in get_student_fees: %s", e, exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 @fee_bp.route('/students/<int:student_id>/fees', methods=['POST'])
 def create_fee(student_id):
+    logger.debug("POST /api/students/%s/fees - Starting request", student_id)
+    student = Student.query.get_or_404(student_id)
     try:
-        logger.debug(f"POST /api/students/{student_id}/fees - Starting request")
-        logger.debug(f"Request data: {request.get_json()}")
-        
-        student = Student.query.get_or_404(student_id)
-        data = request.get_json()
-        
+        data = request.get_json(silent=True) or {}
+        logger.debug("Request data: %s", data)
+        try:
+            fee_type_id = int(data['fee_type_id'])
+            total_amount = float(data['total_amount'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'fee_type_id and total_amount are required and must be numbers'}), 400
+        if total_amount <= 0:
+            return jsonify({'error': 'total_amount must be greater than zero'}), 400
+        if db.session.get(FeeType, fee_type_id) is None:
+            return jsonify({'error': f'Unknown fee_type_id: {fee_type_id}'}), 400
+
         new_fee = Fee(
             student_id=student_id,
-            fee_type_id=data['fee_type_id'],
-            total_amount=data['total_amount'],
+            fee_type_id=fee_type_id,
+            total_amount=total_amount,
             academic_year=data.get('academic_year', '2023-2024')  # Default academic year
         )
+        if is_archived(new_fee.academic_year):
+            return jsonify({'error': f'{new_fee.academic_year} is archived; restore it before adding fees'}), 409
         
-        db.session.add(new_fee)
-        db.session.commit()
+        try:
+            write_transaction(db.session.add, new_fee)
+        except IntegrityError as ie:
+            db.session.rollback()
+            if not violates_unique_index(ie, 'ux_fees_student_type_year', Fee.__table__):
+                raise
+            return jsonify({'error': 'This fee type is already assigned to the student for that academic year'}), 409
         
-        logger.debug(f"Created new fee for student {student.name}")
+        logger.debug("Created new fee for student %s", student.student_name)
         return jsonify({'fee': new_fee.to_dict()}), 201
     except Exception as e:
-        logger.error(f"Error in create_fee: {str(e)}", exc_info=True)
+        logger.error("Error in create_fee: %s", e, exc_info=True)
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@fee_bp.route('/fees/bulk', methods=['POST'])
+def assign_fees_bulk():
+    """Assign fee heads to a class, a section or a set of students.
+
+    Body: {"academic_year", "class"?, "section"?, "student_ids"?,
+           "fees": [{"fee_type_id", "total_amount"}, ...]}
+    Students who already have a head for that year are skipped.
+    """
+    try:
+        logger.debug("POST /api/fees/bulk - Starting request")
+        data = request.get_json(silent=True) or {}
+        logger.debug("Request data: %s", data)
+
+        try:
+            result = write_transaction(
+                assign_fees,
+                data.get('fees'),
+                data.get('academic_year'),
+                class_name=data.get('class'),
+                section=data.get('section'),
+                student_ids=data.get('student_ids')
+            )
+        except AssignmentError as ae:
+            db.session.rollback()
+            return jsonify({'error': str(ae)}), 400
+
+        logger.debug("Bulk fee assignment: %s created, %s skipped", result['created'], result['skipped'])
+        return jsonify(result), 200
+    except Exception as e:
+        logger.error("Error in assign_fees_bulk: %s", e, exc_info=True)
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @fee_bp.route('/fees/<int:fee_id>/payments', methods=['POST'])
 def add_payment(fee_id):
     try:
-        logger.debug(f"POST /api/fees/{fee_id}/payments - Starting request")
-        logger.debug(f"Request data: {request.get_json()}")
-        
-        fee = Fee.query.get_or_404(fee_id)
+        logger.debug("POST /api/fees/%s/payments - Starting request", fee_id)
         data = request.get_json()
+        logger.debug("Request data: %s", data)
+        if not data or 'amount' not in data:
+            return jsonify({'error': 'Missing required field: amount'}), 400
         
-        # Calculate total paid so far
-        total_paid = sum(payment.amount for payment in fee.payments)
-        if total_paid + data['amount'] > fee.total_amount:
-            return jsonify({'error': 'Payment amount exceeds remaining fee amount'}), 400
-        
-        new_payment = FeePayment(
-            fee_id=fee_id,
-            amount=data['amount'],
-            payment_date=data.get('payment_date'),
-            payment_method=data.get('payment_method', 'cash'),
-            remarks=data.get('remarks', '')
-        )
-        
-        db.session.add(new_payment)
-        db.session.commit()
+        try:
+            new_payment = write_transaction(
+                post_payment,
+                fee_id,
+                data['amount'],
+                payment_date=data.get('payment_date'),
+                payment_method=data.get('payment_method', 'cash'),
+                remarks=data.get('remarks', ''),
+                reference=data.get('reference') or None
+            )
+        except FeeNotFound as nf:
+            db.session.rollback()
+            return jsonify({'error': str(nf)}), 404
+        except (DuplicatePayment, FeeArchived) as conflict:
+            db.session.rollback()
+            return jsonify({'error': str(conflict)}), 409
+        except PaymentError as pe:
+            db.session.rollback()
+            return jsonify({'error': str(pe)}), 400
         
-        logger.debug(f"Added payment of {new_payment.amount} to fee {fee_id}")
+        logger.debug("Added payment of %s to fee %s", new_payment.amount_paid, fee_id)
         return jsonify({'payment': new_payment.to_dict()}), 201
     except Exception as e:
-        logger.error(f"Error in add_payment: {str(e)}", exc_info=True)
+        logger.error("Error in add_payment: %s", e, exc_info=True)
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+
+@fee_bp.route('/payments/batch', methods=['POST'])
+def post_payments_batch():
+    """Post a settlement file's payments in one transaction.
+
+    Accepts a JSON list (or {"payments": [...]}) or a CSV/NDJSON upload of
+    fee_id, amount, payment_date, method, reference and remarks. Rows whose
+    reference was already posted are skipped, so re-uploading is safe.
+    """
+    try:
+        logger.debug("POST /api/payments/batch - Starting request")
+
+        upload = request.files.get('file')
+        if upload is not None:
+            stream, mimetype, filename = upload.stream, upload.mimetype, upload.filename or ''
+        else:
+            stream, mimetype, filename = request.stream, request.mimetype, ''
+
+        if upload is None and request.is_json:
+            data = request.get_json(silent=True)
+            entries = data.get('payments') if isinstance(data, dict) else data
+            if not isinstance(entries, list):
+                return jsonify({'error': 'Expected a list of payments'}), 400
+        elif 'ndjson' in mimetype or 'jsonl' in mimetype or filename.endswith(('.ndjson', '.jsonl')):
+            entries = list(iter_ndjson_rows(stream))
+        else:
+            entries = list(iter_csv_rows(stream))
+
+        summary, outcomes = write_transaction(post_payment_batch, entries)
+        logger.debug("Batch payments: %s", summary)
+        return json_response({'success': True, **summary, 'results': outcomes}, 200)
+
+    except RequestEntityTooLarge:
+        return jsonify({'success': False, 'error': 'Upload exceeds the maximum allowed size'}), 413
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Upload must be UTF-8 encoded'}), 400
+    except Exception as e:
+        logger.error("Error in post_payments_batch: %s", e, exc_info=True)
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,117 @@
+from datetime import date
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from models import db
+from services.export import csv_chunks, ndjson_chunks
+from services.reports import (
+    AGING_BASES, parse_group_by, dues_report, defaulters_query, defaulter_dicts, DEFAULTER_FIELDS
+)
+from utils.filters import parse_flag
+from utils.responses import json_response
+import logging
+
+logger = logging.getLogger(__name__)
+
+reports_bp = Blueprint('reports', __name__, url_prefix='/api/reports')
+
+STREAM_FORMATS = {
+    'csv': (csv_chunks, 'text/csv'),
+    'ndjson': (ndjson_chunks, 'application/x-ndjson'),
+}
+
+
+def _report_args():
+    """Filters, aging basis and as-of date shared by the report endpoints."""
+    filters = {
+        'class': request.args.get('class'),
+        'section': request.args.get('section'),
+        'academic_year': request.args.get('academic_year'),
+        'fee_type_id': request.args.get('fee_type_id', type=int),
+        'include_archived': parse_flag(request.args, 'include_archived'),
+    }
+    aging = request.args.get('aging', 'created')
+    if aging not in AGING_BASES:
+        raise ValueError(f"aging must be one of: {', '.join(AGING_BASES)}")
+    as_of = request.args.get('as_of')
+    try:
+        as_of = date.fromisoformat(as_of) if as_of else date.today()
+    except ValueError:
+        raise ValueError('as_of must be a YYYY-MM-DD date')
+    return filters, aging, as_of
+
+
+@reports_bp.route('/dues', methods=['GET'])
+def get_dues_report():
+    """Billed, collected, outstanding and aged balances per group.
+
+    group_by: comma separated class, section, academic_year, fee_type.
+    """
+    try:
+        logger.debug("GET /api/reports/dues - args: %s", request.args)
+        try:
+            group_by = parse_group_by(request.args.get('group_by'))
+            filters, aging, as_of = _report_args()
+        except ValueError as ve:
+            return jsonify({'error': str(ve)}), 400
+
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = min(request.args.get('limit', 100, type=int), 1000)
+        if limit < 1:
+            return jsonify({'error': 'limit must be at least 1'}), 400
+
+        groups, totals = dues_report(group_by, filters, aging=aging, as_of=as_of)
+        return json_response({
+            'data': groups[(page - 1) * limit:page * limit],
+            'totals': totals,
+            'total': len(groups),
+            'page': page,
+            'limit': limit,
+            'group_by': group_by,
+            'aging': aging,
+            'as_of': as_of.isoformat(),
+        }, 200)
+    except Exception as e:
+        logger.error("Error in get_dues_report: %s", e, exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+@reports_bp.route('/defaulters', methods=['GET'])
+def get_defaulters():
+    """Students with an outstanding balance, largest first.
+
+    format=json (paginated, default), csv or ndjson (streamed, unpaginated).
+    """
+    try:
+        logger.debug("GET /api/reports/defaulters - args: %s", request.args)
+        try:
+            filters, aging, as_of = _report_args()
+        except ValueError as ve:
+            return jsonify({'error': str(ve)}), 400
+        min_outstanding = request.args.get('min_outstanding', 0.0, type=float)
+        query = defaulters_query(filters, aging=aging, as_of=as_of, min_outstanding=min_outstanding)
+
+        file_format = request.args.get('format', 'json')
+        if file_format in STREAM_FORMATS:
+            chunks, mimetype = STREAM_FORMATS[file_format]
+            response = Response(stream_with_context(chunks(DEFAULTER_FIELDS, query)), mimetype=mimetype)
+            response.headers['Content-Disposition'] = f'attachment; filename="defaulters.{file_format}"'
+            return response
+        if file_format != 'json':
+            return jsonify({'error': f"format must be one of: json, {', '.join(STREAM_FORMATS)}"}), 400
+
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = min(request.args.get('limit', 50, type=int), 1000)
+        if limit < 1:
+            return jsonify({'error': 'limit must be at least 1'}), 400
+        # Fetch one extra row to learn whether there is a next page
+        rows = db.session.execute(query.offset((page - 1) * limit).limit(limit + 1)).all()
+        return json_response({
+            'data': defaulter_dicts(rows[:limit]),
+            'page': page,
+            'limit': limit,
+            'has_more': len(rows) > limit,
+            'aging': aging,
+            'as_of': as_of.isoformat(),
+        }, 200)
+    except Exception as e:
+        logger.error("Error in get_defaulters: %s", e, exc_info=True)
+        return jsonify({'error': str(e)}), 500
@@ -1,71 +1,210 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy import or_
+from flask import Blueprint, request, jsonify, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+from sqlalchemy import or_, tuple_
 from datetime import datetime
 from models import db, Student
+from models.search import search_index_available, build_match_expression, search_matches
+from models.counts import student_counts
+from models.cache import student_rows, invalidate_cache
+from models.serializers import student_serializer, parse_fields
+from utils.pagination import TOTAL_MODES, encode_cursor, decode_cursor
+from utils.filters import parse_date_range, date_range_clauses
+from models.storage import write_transaction
+from utils.conditional import make_etag, not_modified, add_validators
+from utils.responses import json_response
+from services.student_import import import_students, iter_csv_rows, iter_ndjson_rows
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 students_bp = Blueprint('students', __name__, url_prefix='/api')
 
-@students_bp.route('/students', methods=['GET'])
-def get_students():
-    try:
-        logger.debug("GET /students - Starting request")
-        logger.debug(f"Request args: {request.args}")
-        
-        # Get query parameters
-        page = request.args.get('page', 1, type=int)
-        limit = min(request.args.get('limit', 10, type=int), 100)
-        search = request.args.get('search', '')
-        
-        logger.debug(f"Query params - page: {page}, limit: {limit}, search: {search}")
-
-        # Build query
-        query = Student.query
-
-        if search:
-            logger.debug(f"Applying search filter: {search}")
-            search_filter = or_(
-                Student.student_name.ilike(f'%{search}%'),
-                Student.roll_number.ilike(f'%{search}%'),
-                Student.parents_name.ilike(f'%{search}%')
-            )
-            query = query.filter(search_filter)
-
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination
-        students = query.offset((page - 1) * limit).limit(limit).all()
-        logger.debug(f"Found {total} total students, returning {len(students)} for current page")
+# Row positions of the timestamps the single-student validators come from
+CREATED_AT = student_serializer.index(Student.created_at)
+UPDATED_AT = student_serializer.index(Student.updated_at)
+
+IMPORT_FORMATS = {
+    'csv': iter_csv_rows,
+    'ndjson': iter_ndjson_rows,
+}
+
+# Keyset orderings for cursor pagination. Each is unique per row so a cursor
+# identifies exactly one position.
+CURSOR_ORDERS = {
+    'id': (Student.id,),
+    'class': (Student.class_name, Student.section, Student.roll_number),
+}
+
+def apply_search(query, search, rank=True):
+    """Filter (and optionally rank) a Student query by free-text search.
+
+    Uses the students_fts index when the database has one and falls back to
+    substring ILIKE matching otherwise.
+    """
+    if search_index_available(db.session):
+        match_expression = build_match_expression(search)
+        if match_expression is None:
+            return query
+        matches = search_matches(match_expression)
+        query = query.join(matches, matches.c.id == Student.id)
+        if rank:
+            query = query.order_by(matches.c.score, Student.id)
+        return query
+
+    return query.filter(or_(
+        Student.student_name.ilike(f'%{search}%'),
+        Student.roll_number.ilike(f'%{search}%'),
+        Student.parents_name.ilike(f'%{search}%')
+    ))
+
+def count_students(query, mode, cache_key):
+    if mode == 'off':
+        return None
+    if mode == 'cached':
+        return student_counts.get_or_compute(cache_key, query.order_by(None).count)
+    return query.order_by(None).count()
+
+def plan_student_list(args):
+    """Turn GET /api/students arguments into the queries that answer it.
+
+    Returns (rows_query, count_query, total_mode, cache_key, finish):
+    count_query is the filtered query to count (before any cursor filter),
+    and finish(rows, total) builds the response body from the fetched rows.
+    `class`, `section` and `joined_from`/`joined_to` (school joined date,
+    inclusive) filter the list through the students indexes; `fields`
+    limits the selected columns to the requested keys. Raises
+    ValueError for invalid arguments. The async read app runs the same
+    queries on its own connections.
+    """
+    page = args.get('page', 1, type=int)
+    limit = min(args.get('limit', 10, type=int), 100)
+    search = args.get('search', '')
+    # Any `after` parameter (empty for the first page) selects cursor mode
+    cursor_mode = 'after' in args
+    after = args.get('after', '')
+    order = args.get('order', 'id')
+    total_mode = args.get('total', 'off' if cursor_mode else 'exact')
+    student_class = args.get('class')
+    section = args.get('section')
+    joined_from, joined_to = parse_date_range(args, 'joined_from', 'joined_to')
+    serializer = student_serializer.project(parse_fields(args.get('fields')))
 
-        # Convert to dict
-        result = {
-            'data': [student.to_dict() for student in students],
+    logger.debug("Query params - page: %s, limit: %s, search: %s", page, limit, search)
+
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    if total_mode not in TOTAL_MODES:
+        raise ValueError(f"total must be one of: {', '.join(TOTAL_MODES)}")
+
+    # Build query
+    query = Student.query
+
+    if search:
+        logger.debug("Applying search filter: %s", search)
+        # Relevance ranking can't be seeked, so cursor mode keeps its key order
+        query = apply_search(query, search, rank=not cursor_mode)
+    if student_class:
+        query = query.filter(Student.class_name == student_class)
+    if section:
+        query = query.filter(Student.section == section)
+    joined = date_range_clauses(Student.school_joined_date, joined_from, joined_to)
+    if joined:
+        query = query.filter(*joined)
+    count_query = query
+    cache_key = ('search', search, student_class, section, joined_from, joined_to)
+
+    if cursor_mode:
+        if order not in CURSOR_ORDERS:
+            raise ValueError(f"order must be one of: {', '.join(CURSOR_ORDERS)}")
+        key_columns = CURSOR_ORDERS[order]
+
+        if after:
+            position = decode_cursor(after, [column.type.python_type for column in key_columns])
+            query = query.filter(tuple_(*key_columns) > tuple_(*position))
+
+        # Fetch one extra row to learn whether there is a next page. The
+        # sort key is selected after the requested fields for the cursor.
+        rows_query = (query.with_entities(*serializer.columns, *key_columns)
+                      .order_by(*key_columns).limit(limit + 1))
+
+        def finish(rows, total):
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1][serializer.width:])
+            return {
+                'data': serializer.many(rows),
+                'total': total,
+                'limit': limit,
+                'order': order,
+                'next_cursor': next_cursor
+            }
+        return rows_query, count_query, total_mode, cache_key, finish
+
+    # Apply pagination
+    rows_query = query.with_entities(*serializer.columns).offset((page - 1) * limit).limit(limit)
+
+    def finish(rows, total):
+        logger.debug("Found %s total students, returning %s for current page", total, len(rows))
+        return {
+            'data': serializer.many(rows),
             'total': total,
             'page': page,
             'limit': limit
         }
-        
+    return rows_query, count_query, total_mode, cache_key, finish
+
+@students_bp.route('/students', methods=['GET'])
+def get_students():
+    try:
+        logger.debug("GET /students - Starting request")
+        logger.debug("Request args: %s", request.args)
+
+        try:
+            rows_query, count_query, total_mode, cache_key, finish = plan_student_list(request.args)
+        except ValueError as ve:
+            return jsonify({'error': str(ve)}), 400
+
+        total = count_students(count_query, total_mode, cache_key)
+        result = finish(rows_query.all(), total)
+
         logger.debug("Successfully processed GET /students request")
-        return jsonify(result), 200
+        return json_response(result, 200)
 
     except Exception as e:
-        logger.error(f"Error in get_students: {str(e)}", exc_info=True)
+        logger.error("Error in get_students: %s", e, exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 @students_bp.route('/students/<int:student_id>', methods=['GET'])
 def get_student(student_id):
     try:
-        logger.debug(f"GET /students/{student_id} - Starting request")
-        student = Student.query.get_or_404(student_id)
-        logger.debug(f"Found student: {student.student_name}")
-        return jsonify({'data': student.to_dict()}), 200
+        logger.debug("GET /students/%s - Starting request", student_id)
+        try:
+            fields = parse_fields(request.args.get('fields'))
+            keys = student_serializer.project(fields).keys
+        except ValueError as ve:
+            return jsonify({'error': str(ve)}), 400
+        # A single row comes from the entity cache whole, and `fields` is
+        # applied to it: cheaper than any narrower query.
+        row = student_rows.get_or_load(
+            student_id,
+            lambda: db.session.query(*student_serializer.columns).filter(Student.id == student_id).first()
+        )
+        if row is None:
+            return jsonify({'error': 'Student not found'}), 404
+
+        last_modified = row[UPDATED_AT] or row[CREATED_AT]
+        etag = make_etag('student', student_id, last_modified, fields)
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+        data = student_serializer(row)
+        if fields:
+            data = {key: data[key] for key in keys}
+        response = json_response({'data': data}, 200)
+        return add_validators(response, etag, last_modified)
     except Exception as e:
-        logger.error(f"Error in get_student: {str(e)}", exc_info=True)
+        logger.error("Error in get_student: %s", e, exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 @students_bp.route('/students', methods=['POST'])
@@ -78,15 +217,14 @@ def create_student():
             logger.error("No data provided in request")
             return jsonify({'error': 'No data provided'}), 400
             
-        logger.debug(f"Request data: {data}")
+        logger.debug("Request data: %s", data)
         
         try:
             # Create new student using from_dict method
             student = Student.from_dict(data)
-            db.session.add(student)
-            db.session.commit()
+            write_transaction(db.session.add, student)
             
-            logger.debug(f"Created new student: {student.student_name}")
+            logger.debug("Created new student: %s", student.student_name)
             return jsonify({
                 'success': True,
                 'data': student.to_dict(),
@@ -94,14 +232,54 @@ def create_student():
             }), 201
             
         except ValueError as ve:
-            logger.error(f"Validation error: {str(ve)}")
+            logger.error("Validation error: %s", ve)
             return jsonify({
                 'success': False,
                 'error': str(ve)
             }), 400
             
     except Exception as e:
-        logger.error(f"Error in create_student: {str(e)}", exc_info=True)
+        logger.error("Error in create_student: %s", e, exc_info=True)
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error occurred'
+        }), 500
+
+@students_bp.route('/students/import', methods=['POST'])
+def import_students_upload():
+    try:
+        logger.debug("POST /students/import - Starting request")
+
+        upload = request.files.get('file')
+        if upload is not None:
+            stream, mimetype, filename = upload.stream, upload.mimetype, upload.filename or ''
+        else:
+            stream, mimetype, filename = request.stream, request.mimetype, ''
+
+        file_format = request.args.get('format')
+        if not file_format:
+            if 'ndjson' in mimetype or 'jsonl' in mimetype or filename.endswith(('.ndjson', '.jsonl')):
+                file_format = 'ndjson'
+            else:
+                file_format = 'csv'
+        if file_format not in IMPORT_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(IMPORT_FORMATS)}"}), 400
+
+        batch_size = request.args.get('batch_size', current_app.config['STUDENT_IMPORT_BATCH_SIZE'], type=int)
+        batch_size = max(1, min(batch_size, 10000))
+
+        report = import_students(IMPORT_FORMATS[file_format](stream), batch_size=batch_size)
+        logger.debug("Imported %s of %s students", report.imported, report.total_rows)
+        return jsonify({'success': True, **report.to_dict()}), 200
+
+    except RequestEntityTooLarge:
+        return jsonify({'success': False, 'error': 'Upload exceeds the maximum allowed size'}), 413
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Upload must be UTF-8 encoded'}), 400
+    except Exception as e:
+        logger.error("Error in import_students_upload: %s", e, exc_info=True)
         db.session.rollback()
         return jsonify({
             'success': False,
@@ -111,51 +289,54 @@ def create_student():
 @students_bp.route('/students/<int:student_id>', methods=['PUT'])
 def update_student(student_id):
     try:
-        logger.debug(f"PUT /students/{student_id} - Starting request")
-        logger.debug(f"Request data: {request.get_json()}")
-        
-        student = Student.query.get_or_404(student_id)
+        logger.debug("PUT /students/%s - Starting request", student_id)
         data = request.get_json()
+        logger.debug("Request data: %s", data)
         
-        # Update fields
-        if 'studentName' in data:
-            student.student_name = data['studentName']
-        if 'parentsName' in data:
-            student.parents_name = data['parentsName']
-        if 'rollNumber' in data:
-            student.roll_number = data['rollNumber']
-        if 'class' in data:
-            student.class_name = data['class']
-        if 'section' in data:
-            student.section = data['section']
-        if 'schoolJoinedDate' in data:
-            student.school_joined_date = datetime.strptime(data['schoolJoinedDate'], '%Y-%m-%d').date()
-        if 'dateOfBirth' in data:
-            student.date_of_birth = datetime.strptime(data['dateOfBirth'], '%Y-%m-%d').date()
-        if 'phoneNumber' in data:
-            student.phone_number = data['phoneNumber']
+        def apply_update():
+            student = Student.query.get_or_404(student_id)
+            
+            # Update fields
+            if 'studentName' in data:
+                student.student_name = data['studentName']
+            if 'parentsName' in data:
+                student.parents_name = data['parentsName']
+            if 'rollNumber' in data:
+                student.roll_number = data['rollNumber']
+            if 'class' in data:
+                student.class_name = data['class']
+            if 'section' in data:
+                student.section = data['section']
+            if 'schoolJoinedDate' in data:
+                student.school_joined_date = datetime.strptime(data['schoolJoinedDate'], '%Y-%m-%d').date()
+            if 'dateOfBirth' in data:
+                student.date_of_birth = datetime.strptime(data['dateOfBirth'], '%Y-%m-%d').date()
+            if 'phoneNumber' in data:
+                student.phone_number = data['phoneNumber']
+            return student
         
-        db.session.commit()
+        student = write_transaction(apply_update)
+        invalidate_cache('student_rows', student_id)
         
-        logger.debug(f"Updated student: {student.student_name}")
+        logger.debug("Updated student: %s", student.student_name)
         return jsonify({'data': student.to_dict()}), 200
     except Exception as e:
-        logger.error(f"Error in update_student: {str(e)}", exc_info=True)
+        logger.error("Error in update_student: %s", e, exc_info=True)
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @students_bp.route('/students/<int:student_id>', methods=['DELETE'])
 def delete_student(student_id):
     try:
-        logger.debug(f"DELETE /students/{student_id} - Starting request")
+        logger.debug("DELETE /students/%s - Starting request", student_id)
         student = Student.query.get_or_404(student_id)
         
-        db.session.delete(student)
-        db.session.commit()
+        write_transaction(db.session.delete, student)
+        invalidate_cache('student_rows', student_id)
         
-        logger.debug(f"Deleted student: {student.student_name}")
+        logger.debug("Deleted student: %s", student.student_name)
         return jsonify({'message': 'Student deleted successfully'}), 200
     except Exception as e:
-        logger.error(f"Error in delete_student: {str(e)}", exc_info=True)
+        logger.error("Error in delete_student: %s", e, exc_info=True)
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
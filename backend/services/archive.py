@@ -0,0 +1,138 @@
+"""Archiving of closed academic years.
+
+Archiving a year moves its fees, and the payments against them, from
+fees and fee_payments into fees_archive and fee_payments_archive; the
+rows keep their ids, so payments still point at their fees and restoring
+puts back exactly what was archived. Either way it is a handful of
+INSERT ... SELECT and DELETE statements in the caller's transaction.
+
+The dashboard rollups follow the live tables: their triggers take the
+moved rows out on archive and add them back on restore.
+"""
+from datetime import datetime
+from sqlalchemy import select, func, insert, delete
+from models import db, Fee, FeePayment, ArchivedYear
+from models.archive import ArchivedFee, ArchivedFeePayment
+from models.rollups import tidy_rollups
+from services.fee_assignment import ACADEMIC_YEAR
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+LIVE = (Fee.__table__, FeePayment.__table__)
+ARCHIVE = (ArchivedFee, ArchivedFeePayment)
+
+
+def _check_year(academic_year):
+    if not academic_year or not ACADEMIC_YEAR.fullmatch(str(academic_year)):
+        raise ArchiveError('academic_year must look like 2024-2025')
+
+
+def is_archived(academic_year):
+    return db.session.get(ArchivedYear, academic_year) is not None
+
+
+def _year_fee_ids(fees, academic_year):
+    return select(fees.c.id).where(fees.c.academic_year == academic_year)
+
+
+def _id_clashes(academic_year, source, target):
+    """Rows of the year whose ids are already taken in `target`."""
+    (fees, payments), (fees_to, payments_to) = source, target
+    fee_ids = _year_fee_ids(fees, academic_year)
+    payment_ids = select(payments.c.id).where(payments.c.fee_id.in_(fee_ids))
+    return (
+        db.session.scalar(select(func.count()).select_from(fees_to).where(fees_to.c.id.in_(fee_ids)))
+        + db.session.scalar(select(func.count()).select_from(payments_to).where(payments_to.c.id.in_(payment_ids)))
+    )
+
+
+def _move(academic_year, source, target):
+    """Copy the year's fees and payments from `source` to `target` tables,
+    then delete them from `source`. Returns the number of payments moved."""
+    (fees, payments), (fees_to, payments_to) = source, target
+    fee_ids = _year_fee_ids(fees, academic_year)
+    db.session.execute(insert(fees_to).from_select(
+        [column.key for column in fees.c], select(fees).where(fees.c.academic_year == academic_year)
+    ))
+    moved = db.session.execute(insert(payments_to).from_select(
+        [column.key for column in payments.c], select(payments).where(payments.c.fee_id.in_(fee_ids))
+    )).rowcount
+    db.session.execute(delete(payments).where(payments.c.fee_id.in_(fee_ids)))
+    db.session.execute(delete(fees).where(fees.c.academic_year == academic_year))
+    tidy_rollups(db.session.connection(), academic_year)
+    return moved
+
+
+def archive_year(academic_year, force=False):
+    """Move a closed year's fees and payments into the archive tables.
+
+    Refuses the most recent year on record unless `force` is set, since
+    that is normally the one still being billed. The caller commits.
+
+    Returns the ArchivedYear row as a dict.
+    """
+    _check_year(academic_year)
+    if is_archived(academic_year):
+        raise ArchiveError(f'{academic_year} is already archived')
+    fee_count, total_billed, total_collected = db.session.execute(
+        select(func.count(Fee.id), func.sum(Fee.total_amount), func.sum(Fee.amount_paid))
+        .where(Fee.academic_year == academic_year)
+    ).one()
+    if not fee_count:
+        raise ArchiveError(f'There are no fees for {academic_year}')
+    if not force and academic_year == db.session.scalar(select(func.max(Fee.academic_year))):
+        raise ArchiveError(f'{academic_year} is the latest academic year; use force to archive it anyway')
+    # SQLite hands out max(id) + 1, so an id archived from the top of the
+    # range can have been reused since an earlier year was archived.
+    clashes = _id_clashes(academic_year, LIVE, ARCHIVE)
+    if clashes:
+        raise ArchiveError(f'{clashes} row(s) of {academic_year} have ids already used in the archive')
+
+    payment_count = _move(academic_year, LIVE, ARCHIVE)
+    archived = ArchivedYear(
+        academic_year=academic_year,
+        fee_count=fee_count,
+        payment_count=payment_count,
+        total_billed=total_billed or 0.0,
+        total_collected=total_collected or 0.0,
+        archived_at=datetime.utcnow()
+    )
+    db.session.add(archived)
+    return archived.to_dict()
+
+
+def restore_year(academic_year):
+    """Move an archived year back into fees and fee_payments. The caller commits.
+
+    Returns {'academic_year', 'fee_count', 'payment_count'}.
+    """
+    _check_year(academic_year)
+    archived = db.session.get(ArchivedYear, academic_year)
+    if archived is None:
+        raise ArchiveError(f'{academic_year} is not archived')
+    if db.session.scalar(select(func.count(Fee.id)).where(Fee.academic_year == academic_year)):
+        raise ArchiveError(f'{academic_year} has live fees again; remove them before restoring')
+    clashes = _id_clashes(academic_year, ARCHIVE, LIVE)
+    if clashes:
+        raise ArchiveError(f'{clashes} archived row(s) of {academic_year} have ids taken by live rows')
+    references = db.session.scalar(
+        select(func.count()).select_from(ArchivedFeePayment)
+        .where(ArchivedFeePayment.c.fee_id.in_(_year_fee_ids(ArchivedFee, academic_year)),
+               ArchivedFeePayment.c.reference.in_(
+                   select(FeePayment.reference).where(FeePayment.reference.isnot(None))))
+    )
+    if references:
+        raise ArchiveError(f'{references} archived payment reference(s) of {academic_year} were posted again')
+
+    fee_count = db.session.scalar(select(func.count()).select_from(ArchivedFee)
+                                  .where(ArchivedFee.c.academic_year == academic_year))
+    payment_count = _move(academic_year, ARCHIVE, LIVE)
+    db.session.delete(archived)
+    return {'academic_year': academic_year, 'fee_count': fee_count, 'payment_count': payment_count}
+
+
+def archived_years():
+    return db.session.scalars(select(ArchivedYear).order_by(ArchivedYear.academic_year)).all()
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from utils.metrics import Histogram
+
+# Seconds; hashing takes tens to hundreds of ms, queueing can take longer.
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class HashingBusy(RuntimeError):
+    """Too many hashes are already queued; the caller should retry later."""
+
+
+class CredentialService:
+    """Password hashing on a small bounded thread pool.
+
+    Werkzeug's scrypt/pbkdf2 run in OpenSSL with the GIL released, so pool
+    threads hash in parallel with each other and with request threads. At
+    most `workers` hashes run at once per process and at most `max_pending`
+    may be waiting or running; past that, callers get HashingBusy at once
+    instead of stacking up behind a login rush. Queue wait and hash time are
+    recorded per operation for /metrics.
+    """
+
+    def __init__(self, method='scrypt', workers=2, max_pending=16, timeout=10.0):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.rejected = 0
+        self.queue_seconds = {}    # operation -> Histogram
+        self.hash_seconds = {}     # operation -> Histogram
+        self._method_prefix = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+
+    def configure(self, method=None, workers=None, max_pending=None, timeout=None):
+        with self._lock:
+            if method is not None and method != self.method:
+                self.method = method
+                self._method_prefix = None
+            if workers is not None:
+                self.workers = workers
+            if max_pending is not None:
+                self.max_pending = max_pending
+                self._slots = threading.BoundedSemaphore(max_pending)
+            if timeout is not None:
+                self.timeout = timeout
+            self._shutdown_pool()
+
+    def _shutdown_pool(self):
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=False)
+        self._pool = None
+
+    def _executor(self):
+        # Pool threads don't survive a fork; a forked worker starts its own.
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _observe(self, histograms, operation, seconds):
+        with self._lock:
+            histogram = histograms.get(operation)
+            if histogram is None:
+                histogram = histograms[operation] = Histogram(HASH_BUCKETS)
+            histogram.observe(seconds)
+
+    def _run(self, operation, fn, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusy('Too many logins in progress, please retry')
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            self._observe(self.queue_seconds, operation, started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                self._observe(self.hash_seconds, operation, time.perf_counter() - started)
+
+        try:
+            future = self._executor().submit(task)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the hash finishes, even if the caller has
+        # given up waiting, so abandoned work still counts against the limit.
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingBusy('Password check timed out, please retry')
+
+    def hash_password(self, password):
+        return self._run('hash', generate_password_hash, password, self.method)
+
+    def check_password(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._run('verify', check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was made with other parameters than `method`."""
+        if not password_hash:
+            return False
+        if self._method_prefix is None:
+            if self.method.count(':') == (3 if self.method.startswith('scrypt') else 2):
+                self._method_prefix = self.method
+            else:
+                # Werkzeug fills in defaults ("scrypt" -> "scrypt:32768:8:1");
+                # one throwaway hash gives the exact stored prefix.
+                self._method_prefix = self.hash_password('rehash-probe').split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+    def stats(self):
+        with self._lock:
+            copy = lambda histograms: {
+                (operation,): (histogram.bounds, list(histogram.counts), histogram.total, histogram.count)
+                for operation, histogram in histograms.items()
+            }
+            return {
+                'rejected': self.rejected,
+                'queue_seconds': copy(self.queue_seconds),
+                'hash_seconds': copy(self.hash_seconds),
+            }
+
+
+credentials = CredentialService()
+
+
+def init_credentials(app):
+    """Apply PASSWORD_HASH_* settings."""
+    credentials.configure(
+        method=app.config.get('PASSWORD_HASH_METHOD'),
+        workers=app.config.get('PASSWORD_HASH_WORKERS'),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING'),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT'),
+    )
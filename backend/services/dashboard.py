@@ -0,0 +1,135 @@
+from datetime import date, datetime
+from sqlalchemy import text, select, func
+from models import db, ArchivedYear
+from models.archive import ArchivedFeePayment
+
+# Months of revenue history returned for the dashboard chart.
+REVENUE_MONTHS = 12
+
+
+def _month_key(year, month):
+    # Normalise month arithmetic that over/underflows the year.
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return f'{year:04d}-{month:02d}'
+
+
+def _month_start(month, months_later=0):
+    year, month = int(month[:4]), int(month[5:]) + months_later
+    return datetime.fromisoformat(f'{_month_key(year, month)}-01')
+
+
+def _change(current, previous):
+    """Percentage change, or None when there is nothing to compare against."""
+    if not previous:
+        return None
+    return round((current - previous) * 100.0 / previous, 2)
+
+
+def _archived_revenue(first_month, last_month):
+    """Revenue and payment count per month of archived payments, which
+    the rollups no longer cover."""
+    month = func.strftime('%Y-%m', ArchivedFeePayment.c.payment_date)
+    return db.session.execute(
+        select(month, func.sum(ArchivedFeePayment.c.amount_paid), func.count())
+        .where(ArchivedFeePayment.c.payment_date >= _month_start(first_month),
+               ArchivedFeePayment.c.payment_date < _month_start(last_month, months_later=1))
+        .group_by(month)
+    ).all()
+
+
+def dashboard_stats(today=None, include_archived=False):
+    """Dashboard figures read from the rollup tables in models/rollups.py.
+
+    Every query reads rows keyed by class/section, month or academic year,
+    so the cost does not grow with the number of students or payments.
+    The rollups cover live fees only; `include_archived` adds the archived
+    years from archived_years and their payments in the charted months.
+    """
+    today = today or date.today()
+    current_month = _month_key(today.year, today.month)
+    previous_month = _month_key(today.year, today.month - 1)
+    first_month = _month_key(today.year, today.month - REVENUE_MONTHS + 1)
+
+    classes = db.session.execute(text(
+        "SELECT class_name, section, student_count FROM stats_class_counts "
+        "ORDER BY class_name, section"
+    )).all()
+
+    months = db.session.execute(text(
+        "SELECT month, revenue, payment_count, students_joined FROM stats_monthly "
+        "WHERE month BETWEEN :first AND :last ORDER BY month"
+    ), {'first': first_month, 'last': current_month}).all()
+    by_month = {row.month: row._asdict() for row in months}
+    if include_archived:
+        for month, revenue, payment_count in _archived_revenue(first_month, current_month):
+            row = by_month.setdefault(month, {'revenue': 0.0, 'payment_count': 0, 'students_joined': 0})
+            row['revenue'] += revenue
+            row['payment_count'] += payment_count
+
+    years = db.session.execute(text(
+        "SELECT academic_year, fee_count, total_billed, total_collected FROM stats_fee_years "
+        "ORDER BY academic_year DESC"
+    )).all()
+    if include_archived:
+        years = sorted(
+            years + db.session.execute(select(
+                ArchivedYear.academic_year, ArchivedYear.fee_count,
+                ArchivedYear.total_billed, ArchivedYear.total_collected
+            )).all(),
+            key=lambda row: row.academic_year, reverse=True
+        )
+
+    def month_value(month, field):
+        row = by_month.get(month)
+        return row[field] if row is not None else 0
+
+    revenue = [
+        {
+            'month': month,
+            'revenue': round(month_value(month, 'revenue'), 2),
+            'payment_count': month_value(month, 'payment_count'),
+        }
+        for month in (_month_key(today.year, today.month - offset) for offset in range(REVENUE_MONTHS - 1, -1, -1))
+    ]
+
+    current_revenue = month_value(current_month, 'revenue')
+    previous_revenue = month_value(previous_month, 'revenue')
+    joined_current = month_value(current_month, 'students_joined')
+    joined_previous = month_value(previous_month, 'students_joined')
+    total_billed = sum(row.total_billed for row in years)
+    total_collected = sum(row.total_collected for row in years)
+
+    return {
+        'students': {
+            'total': sum(row.student_count for row in classes),
+            'by_class': [
+                {'class': row.class_name, 'section': row.section, 'count': row.student_count}
+                for row in classes
+            ],
+            'joined_this_month': joined_current,
+            'joined_last_month': joined_previous,
+            'change_percent': _change(joined_current, joined_previous),
+        },
+        'revenue': {
+            'current_month': current_month,
+            'current': round(current_revenue, 2),
+            'previous': round(previous_revenue, 2),
+            'change_percent': _change(current_revenue, previous_revenue),
+            'monthly': revenue,
+        },
+        'dues': {
+            'billed': round(total_billed, 2),
+            'collected': round(total_collected, 2),
+            'outstanding': round(total_billed - total_collected, 2),
+            'by_academic_year': [
+                {
+                    'academic_year': row.academic_year,
+                    'fee_count': row.fee_count,
+                    'billed': round(row.total_billed, 2),
+                    'collected': round(row.total_collected, 2),
+                    'outstanding': round(row.total_billed - row.total_collected, 2),
+                }
+                for row in years
+            ],
+        },
+    }
@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+from sqlalchemy import select, exists
+from models import db, Student, Fee, FeeType, FeePayment
+from models.archive import against_archive, with_archive
+
+# Rows fetched from the cursor (and written to the response) per step. The
+# result is consumed incrementally, so memory depends on this, not on the
+# size of the table.
+EXPORT_BATCH_SIZE = 1000
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+# (output field, column, formatter) per dataset. Student fields use the same
+# names as Student.to_dict so exports line up with the API.
+STUDENT_FIELDS = [
+    ('id', Student.id, None),
+    ('studentName', Student.student_name, None),
+    ('parentsName', Student.parents_name, None),
+    ('rollNumber', Student.roll_number, None),
+    ('class', Student.class_name, None),
+    ('section', Student.section, None),
+    ('schoolJoinedDate', Student.school_joined_date, _iso),
+    ('dateOfBirth', Student.date_of_birth, _iso),
+    ('phoneNumber', Student.phone_number, None),
+    ('createdAt', Student.created_at, _iso),
+    ('updatedAt', Student.updated_at, _iso),
+]
+
+FEE_FIELDS = [
+    ('id', Fee.id, None),
+    ('student_id', Fee.student_id, None),
+    ('roll_number', Student.roll_number, None),
+    ('student_name', Student.student_name, None),
+    ('class_name', Student.class_name, None),
+    ('section', Student.section, None),
+    ('fee_type_id', Fee.fee_type_id, None),
+    ('fee_type_name', FeeType.name, None),
+    ('academic_year', Fee.academic_year, None),
+    ('total_amount', Fee.total_amount, None),
+    ('amount_paid', Fee.amount_paid, None),
+    ('balance', (Fee.total_amount - Fee.amount_paid).label('balance'), None),
+    ('created_at', Fee.created_at, _iso),
+    ('updated_at', Fee.updated_at, _iso),
+]
+
+PAYMENT_FIELDS = [
+    ('id', FeePayment.id, None),
+    ('fee_id', FeePayment.fee_id, None),
+    ('student_id', Fee.student_id, None),
+    ('roll_number', Student.roll_number, None),
+    ('class_name', Student.class_name, None),
+    ('section', Student.section, None),
+    ('fee_type_name', FeeType.name, None),
+    ('academic_year', Fee.academic_year, None),
+    ('amount_paid', FeePayment.amount_paid, None),
+    ('payment_date', FeePayment.payment_date, _iso),
+    ('payment_method', FeePayment.payment_method, None),
+    ('remarks', FeePayment.remarks, None),
+    ('reference', FeePayment.reference, None),
+    ('created_at', FeePayment.created_at, _iso),
+]
+
+
+def _student_filters(filters):
+    clauses = []
+    if filters.get('class'):
+        clauses.append(Student.class_name == filters['class'])
+    if filters.get('section'):
+        clauses.append(Student.section == filters['section'])
+    return clauses
+
+
+def _with_archive(query, filters):
+    """`query` over live and archived rows when include_archived is set,
+    in the order of its first column."""
+    if not filters.get('include_archived'):
+        return query
+    combined = with_archive(query)
+    return select(combined).order_by(list(combined.c)[0])
+
+
+def students_query(filters):
+    query = select(*[column for _, column, _ in STUDENT_FIELDS]).where(*_student_filters(filters))
+    if filters.get('academic_year'):
+        # Students have no year of their own; keep those billed in that year.
+        billed = exists().where(Fee.student_id == Student.id, Fee.academic_year == filters['academic_year'])
+        if filters.get('include_archived'):
+            billed = billed | against_archive(billed)
+        query = query.where(billed)
+    return query.order_by(Student.id)
+
+
+def fees_query(filters):
+    query = (
+        select(*[column for _, column, _ in FEE_FIELDS])
+        .join(Student, Student.id == Fee.student_id)
+        .join(FeeType, FeeType.id == Fee.fee_type_id)
+        .where(*_student_filters(filters))
+    )
+    if filters.get('academic_year'):
+        query = query.where(Fee.academic_year == filters['academic_year'])
+    return _with_archive(query.order_by(Fee.id), filters)
+
+
+def payments_query(filters):
+    query = (
+        select(*[column for _, column, _ in PAYMENT_FIELDS])
+        .join(Fee, Fee.id == FeePayment.fee_id)
+        .join(Student, Student.id == Fee.student_id)
+        .join(FeeType, FeeType.id == Fee.fee_type_id)
+        .where(*_student_filters(filters))
+    )
+    if filters.get('academic_year'):
+        query = query.where(Fee.academic_year == filters['academic_year'])
+    return _with_archive(query.order_by(FeePayment.id), filters)
+
+
+DATASETS = {
+    'students': (STUDENT_FIELDS, students_query),
+    'fees': (FEE_FIELDS, fees_query),
+    'payments': (PAYMENT_FIELDS, payments_query),
+}
+
+
+def _formatted_rows(fields, query, batch_size):
+    formatters = [(index, formatter) for index, (_, _, formatter) in enumerate(fields) if formatter]
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        rows = []
+        for row in partition:
+            row = list(row)
+            for index, formatter in formatters:
+                row[index] = formatter(row[index])
+            rows.append(row)
+        yield rows
+
+
+def csv_chunks(fields, query, batch_size=EXPORT_BATCH_SIZE):
+    """Yield CSV text chunks for a (fields, query) pair, one per fetched batch, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _, _ in fields])
+    yield buffer.getvalue()
+    for rows in _formatted_rows(fields, query, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(fields, query, batch_size=EXPORT_BATCH_SIZE):
+    """Yield newline-delimited JSON chunks for a (fields, query) pair, one per fetched batch."""
+    names = [name for name, _, _ in fields]
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    for rows in _formatted_rows(fields, query, batch_size):
+        yield ''.join(dumps(dict(zip(names, row))) + '\n' for row in rows)
+
+
+def stream_csv(dataset, filters, batch_size=EXPORT_BATCH_SIZE):
+    fields, build_query = DATASETS[dataset]
+    return csv_chunks(fields, build_query(filters), batch_size)
+
+
+def stream_ndjson(dataset, filters, batch_size=EXPORT_BATCH_SIZE):
+    fields, build_query = DATASETS[dataset]
+    return ndjson_chunks(fields, build_query(filters), batch_size)
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
@@ -0,0 +1,118 @@
+import re
+from datetime import datetime
+from sqlalchemy import select, func, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import db, Student, Fee, FeeType, ArchivedYear
+
+ACADEMIC_YEAR = re.compile(r'[0-9]{4}-[0-9]{4}')
+
+# Explicit student ids are matched in chunks to stay under SQLite's bound
+# parameter limit.
+STUDENT_ID_CHUNK = 5000
+
+
+class AssignmentError(ValueError):
+    pass
+
+
+def _fee_heads(heads):
+    """Validate [{fee_type_id, total_amount}, ...] against fee_types."""
+    if not heads:
+        raise AssignmentError('At least one fee head is required')
+    parsed = []
+    for head in heads:
+        try:
+            fee_type_id = int(head['fee_type_id'])
+            total_amount = float(head['total_amount'])
+        except (KeyError, TypeError, ValueError):
+            raise AssignmentError('Each fee head needs a numeric fee_type_id and total_amount')
+        if total_amount <= 0:
+            raise AssignmentError('total_amount must be greater than zero')
+        parsed.append((fee_type_id, total_amount))
+
+    fee_type_ids = {fee_type_id for fee_type_id, _ in parsed}
+    if len(fee_type_ids) != len(parsed):
+        raise AssignmentError('Each fee type may appear only once')
+    known = set(db.session.scalars(select(FeeType.id).where(FeeType.id.in_(fee_type_ids))))
+    missing = sorted(fee_type_ids - known)
+    if missing:
+        raise AssignmentError(f"Unknown fee_type_id: {', '.join(map(str, missing))}")
+    return parsed
+
+
+def _target_filters(class_name, section, student_ids):
+    """WHERE clauses per statement; several when student_ids needs chunking."""
+    clauses = []
+    if class_name:
+        clauses.append(Student.class_name == class_name)
+    if section:
+        clauses.append(Student.section == section)
+    if student_ids is None:
+        return [clauses]
+    ids = sorted(set(student_ids))
+    return [
+        clauses + [Student.id.in_(ids[start:start + STUDENT_ID_CHUNK])]
+        for start in range(0, len(ids), STUDENT_ID_CHUNK)
+    ]
+
+
+def assign_fees(heads, academic_year, class_name=None, section=None, student_ids=None):
+    """Give every targeted student a fee for each head, skipping existing ones.
+
+    Targets a class, a section, explicit student ids, or a combination.
+    Each head is one INSERT ... SELECT over students that does nothing on
+    conflict with ux_fees_student_type_year, so re-running an assignment
+    only fills the gaps. The caller commits.
+
+    Returns {'students', 'created', 'skipped', 'fee_heads': [...]}.
+    """
+    if not academic_year or not ACADEMIC_YEAR.fullmatch(str(academic_year)):
+        raise AssignmentError('academic_year must look like 2024-2025')
+    if db.session.get(ArchivedYear, academic_year) is not None:
+        raise AssignmentError(f'{academic_year} is archived; restore it before assigning fees')
+    if not (class_name or section or student_ids):
+        raise AssignmentError('Specify a class, a section or student_ids')
+    if student_ids is not None:
+        try:
+            student_ids = [int(student_id) for student_id in student_ids]
+        except (TypeError, ValueError):
+            raise AssignmentError('student_ids must be a list of integers')
+    heads = _fee_heads(heads)
+    filter_sets = _target_filters(class_name, section, student_ids)
+
+    students = sum(
+        db.session.execute(select(func.count(Student.id)).where(*clauses)).scalar()
+        for clauses in filter_sets
+    )
+
+    now = datetime.utcnow()
+    results = []
+    for fee_type_id, total_amount in heads:
+        created = 0
+        for clauses in filter_sets:
+            rows = select(
+                Student.id,
+                literal(fee_type_id),
+                literal(total_amount),
+                literal(0.0),
+                literal(academic_year),
+                literal(now),
+            ).where(*clauses)
+            statement = sqlite_insert(Fee).from_select(
+                ['student_id', 'fee_type_id', 'total_amount', 'amount_paid', 'academic_year', 'created_at'],
+                rows
+            ).on_conflict_do_nothing(index_elements=['student_id', 'fee_type_id', 'academic_year'])
+            created += db.session.execute(statement).rowcount
+        results.append({
+            'fee_type_id': fee_type_id,
+            'total_amount': total_amount,
+            'created': created,
+            'skipped': students - created,
+        })
+
+    return {
+        'students': students,
+        'created': sum(result['created'] for result in results),
+        'skipped': sum(result['skipped'] for result in results),
+        'fee_heads': results,
+    }
@@ -0,0 +1,183 @@
+from collections import defaultdict
+from functools import lru_cache
+from sqlalchemy import func, select
+from models import db, Student, Fee, FeeType, FeePayment
+from models.archive import with_archive
+from models.serializers import fee_serializer, fee_type_serializer, payment_serializer
+from utils.filters import parse_date_range, parse_flag, date_range_clauses
+
+
+# Per-fee payment figures the ledger adds to the fee's own fields.
+TOTAL_KEYS = ('total_paid', 'remaining_amount', 'payment_count', 'last_payment_date')
+LEDGER_FIELDS = fee_serializer.keys + TOTAL_KEYS + ('fee_type', 'payments')
+
+
+def _totals():
+    total_paid = func.coalesce(func.sum(FeePayment.amount_paid), 0.0)
+    return {
+        'total_paid': total_paid.label('total_paid'),
+        'remaining_amount': (Fee.total_amount - total_paid).label('remaining_amount'),
+        'payment_count': func.count(FeePayment.id).label('payment_count'),
+        'last_payment_date': func.max(FeePayment.payment_date).label('last_payment_date'),
+    }
+
+
+class LedgerPlan:
+    """The columns a ledger request selects, and how its rows are shaped.
+
+    With `fields`, only those keys are selected: the fee type's columns
+    only for `fee_type`, and the payments join and grouping only for the
+    payment totals. Each row ends with the fee id, for nesting payments.
+    """
+
+    def __init__(self, fields=None):
+        keys = set(fields or LEDGER_FIELDS)
+        unknown = keys.difference(LEDGER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        self.fee = fee_serializer.project(keys.intersection(fee_serializer.keys))
+        self.fee_type = 'fee_type' in keys
+        self.totals = tuple(key for key in TOTAL_KEYS if key in keys)
+        self.payments = 'payments' in keys
+
+    def statement(self, student_id, academic_year=None, include_archived=False):
+        """One SELECT for a student's fees, grouped with their payments when
+        totals are wanted; with `include_archived`, archived years too."""
+        totals = _totals()
+        statement = (
+            select(
+                *self.fee.columns,
+                *(fee_type_serializer.columns if self.fee_type else ()),
+                *(totals[key] for key in self.totals),
+                Fee.academic_year,
+                Fee.id
+            )
+            .select_from(Fee)
+            .join(FeeType, FeeType.id == Fee.fee_type_id)
+            .where(Fee.student_id == student_id)
+            .order_by(Fee.academic_year.desc(), Fee.id)
+        )
+        if academic_year:
+            statement = statement.where(Fee.academic_year == academic_year)
+        if self.totals:
+            statement = statement.outerjoin(FeePayment, FeePayment.fee_id == Fee.id).group_by(Fee.id, FeeType.id)
+        if include_archived:
+            combined = with_archive(statement)
+            academic_year_column, id_column = list(combined.c)[-2:]
+            statement = select(combined).order_by(academic_year_column.desc(), id_column)
+        return statement
+
+    def shape(self, rows, payments=None):
+        """Ledger dicts from statement() rows; `payments` (rows of
+        payments_statement) are nested per fee when given."""
+        payments_by_fee = defaultdict(list)
+        for payment in payments or ():
+            payments_by_fee[payment[1]].append(payment_serializer(payment))
+
+        fee_width = self.fee.width
+        totals_start = fee_width + (fee_type_serializer.width if self.fee_type else 0)
+        ledger = []
+        for row in rows:
+            fee_dict = self.fee(row[:fee_width])
+            for key, value in zip(self.totals, row[totals_start:]):
+                fee_dict[key] = value
+            if 'last_payment_date' in fee_dict:
+                last_payment_date = fee_dict['last_payment_date']
+                fee_dict['last_payment_date'] = last_payment_date.isoformat() if last_payment_date else None
+            if self.fee_type:
+                fee_dict['fee_type'] = fee_type_serializer(row[fee_width:totals_start])
+            if payments is not None and self.payments:
+                fee_dict['payments'] = payments_by_fee[row[-1]]
+            ledger.append(fee_dict)
+        return ledger
+
+
+@lru_cache(maxsize=256)
+def ledger_plan(fields=None):
+    """Shared LedgerPlan for a `fields` tuple; raises ValueError on unknown keys."""
+    return LedgerPlan(fields)
+
+
+def ledger_filters(args):
+    """(academic_year, paid_from, paid_to, include_archived) from ledger
+    request arguments.
+
+    Raises ValueError for malformed dates or a reversed range.
+    """
+    paid_from, paid_to = parse_date_range(args, 'paid_from', 'paid_to')
+    return args.get('academic_year') or None, paid_from, paid_to, parse_flag(args, 'include_archived')
+
+
+def payments_statement(fee_ids, paid_from=None, paid_to=None, include_archived=False):
+    """The payment rows of the given fees, newest first, optionally only
+    those paid between the two dates (inclusive)."""
+    statement = (
+        select(*payment_serializer.columns)
+        .where(FeePayment.fee_id.in_(fee_ids), *date_range_clauses(FeePayment.payment_date, paid_from, paid_to))
+        .order_by(FeePayment.payment_date.desc(), FeePayment.id.desc())
+    )
+    if include_archived:
+        combined = with_archive(statement)
+        statement = select(combined).order_by(combined.c.payment_date.desc(), combined.c.id.desc())
+    return statement
+
+
+def student_fee_ledger(student_id, include_payments=False, fields=None, filters=(None, None, None, False)):
+    """Fees for one student with paid/remaining totals computed in SQL.
+
+    Runs one grouped query for the fees, their types and payment aggregates,
+    plus one more for the payment rows when `include_payments` is set, no
+    matter how many fees or payments the student has. Rows are selected as
+    column tuples and shaped by the precompiled serializers; `fields`
+    narrows both to the requested keys. `filters` (see ledger_filters)
+    limits the fees to one academic year and the nested payments to a
+    date range; the totals always cover every payment of a fee. Archived
+    years are left out unless `filters` asks to include them.
+    """
+    academic_year, paid_from, paid_to, include_archived = filters
+    plan = ledger_plan(fields)
+    rows = db.session.execute(plan.statement(student_id, academic_year, include_archived)).all()
+    payments = None
+    if include_payments and plan.payments:
+        fee_ids = [row[-1] for row in rows]
+        statement = payments_statement(fee_ids, paid_from, paid_to, include_archived)
+        payments = db.session.execute(statement).all() if rows else []
+    return plan.shape(rows, payments)
+
+
+def ledger_validator_statement(student_id, include_archived=False):
+    fees = Fee.__table__
+    if include_archived:
+        fees = with_archive(
+            select(fees.c.id, fees.c.student_id, fees.c.fee_type_id, fees.c.amount_paid,
+                   fees.c.created_at, fees.c.updated_at)
+            .where(fees.c.student_id == student_id)
+        )
+    fee_changed = func.max(func.coalesce(fees.c.updated_at, fees.c.created_at))
+    type_changed = func.max(func.coalesce(FeeType.updated_at, FeeType.created_at))
+    return (
+        select(Student.id, func.count(fees.c.id), func.sum(fees.c.amount_paid), fee_changed, type_changed)
+        .outerjoin(fees, fees.c.student_id == Student.id)
+        .outerjoin(FeeType, FeeType.id == fees.c.fee_type_id)
+        .where(Student.id == student_id)
+        .group_by(Student.id)
+    )
+
+
+def validator_from_row(row):
+    if row is None:
+        return None
+    _, fee_count, amount_paid, fee_changed_at, type_changed_at = row
+    changes = [value for value in (fee_changed_at, type_changed_at) if value is not None]
+    return fee_count, amount_paid, max(changes) if changes else None
+
+
+def ledger_validator(student_id, include_archived=False):
+    """Cheap summary of everything the ledger depends on, or None if the
+    student does not exist.
+
+    Returns (fee count, sum of stored paid amounts, last change) where the
+    last change covers the fees and their fee types; posting a payment
+    bumps the fee's updated_at and amount_paid.
+    """
+    return validator_from_row(db.session.execute(ledger_validator_statement(student_id, include_archived)).first())
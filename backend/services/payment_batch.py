@@ -0,0 +1,158 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import insert, update, select, bindparam
+from models import db, Fee, FeePayment
+from models.archive import ArchivedFee
+from services.payments import BALANCE_TOLERANCE, PaymentError, parse_payment_date, archived_fee_error
+
+# Ids/references per IN (...) lookup, to stay under SQLite's bound parameter limit.
+LOOKUP_CHUNK = 5000
+
+POSTED = 'posted'
+DUPLICATE = 'duplicate'
+REJECTED = 'rejected'
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        yield values[start:start + LOOKUP_CHUNK]
+
+
+def _parse_entry(entry):
+    """Normalise one settlement row; raises PaymentError when unusable."""
+    if isinstance(entry, Exception):
+        raise PaymentError(str(entry))
+    if not isinstance(entry, dict):
+        raise PaymentError('Each payment must be an object')
+    try:
+        fee_id = int(entry.get('fee_id'))
+    except (TypeError, ValueError):
+        raise PaymentError('fee_id must be an integer')
+    try:
+        amount = float(entry.get('amount'))
+    except (TypeError, ValueError):
+        raise PaymentError('Payment amount must be a number')
+    if amount <= 0:
+        raise PaymentError('Payment amount must be positive')
+    reference = entry.get('reference')
+    reference = str(reference).strip() if reference not in (None, '') else None
+    return {
+        'fee_id': fee_id,
+        'amount_paid': amount,
+        'payment_date': parse_payment_date(entry.get('payment_date')),
+        'payment_method': entry.get('method') or entry.get('payment_method') or 'cash',
+        'remarks': entry.get('remarks') or '',
+        'reference': reference,
+    }
+
+
+def _balances(fee_ids):
+    """{fee_id: [total_amount, amount_paid]} for the fees that exist."""
+    balances = {}
+    for chunk in _chunks(fee_ids):
+        rows = db.session.execute(
+            select(Fee.id, Fee.total_amount, Fee.amount_paid).where(Fee.id.in_(chunk))
+        )
+        balances.update({fee_id: [total, paid or 0.0] for fee_id, total, paid in rows})
+    return balances
+
+
+def _archived_years(fee_ids):
+    """{fee_id: academic_year} for the fees that are archived."""
+    years = {}
+    for chunk in _chunks(fee_ids):
+        years.update(db.session.execute(
+            select(ArchivedFee.c.id, ArchivedFee.c.academic_year).where(ArchivedFee.c.id.in_(chunk))
+        ).all())
+    return years
+
+
+def _known_references(references):
+    known = set()
+    for chunk in _chunks(references):
+        known.update(db.session.scalars(select(FeePayment.reference).where(FeePayment.reference.in_(chunk))))
+    return known
+
+
+def post_payment_batch(entries):
+    """Validate and post a settlement file's payments in one transaction.
+
+    Fee balances and already-posted references are each read with one
+    IN query (chunked for very large files), and ids not found among the
+    fees with one more against the archive; rows are then checked in file
+    order against the running balances, so two rows that together overpay
+    a fee leave the second one rejected. Accepted payments go in with a
+    single multi-row INSERT and each touched fee gets one balance UPDATE.
+    Must run inside write_transaction so the balances stay locked between
+    the check and the write. The caller commits.
+
+    Returns (summary, outcomes) with one outcome per input row.
+    """
+    outcomes = []
+    parsed = []
+    for row_number, entry in enumerate(entries, start=1):
+        try:
+            parsed.append((row_number, _parse_entry(entry)))
+        except PaymentError as e:
+            outcomes.append({'row': row_number, 'status': REJECTED, 'error': str(e)})
+
+    balances = _balances({payment['fee_id'] for _, payment in parsed})
+    archived = _archived_years({payment['fee_id'] for _, payment in parsed} - balances.keys())
+    known = _known_references({payment['reference'] for _, payment in parsed if payment['reference']})
+
+    accepted = []
+    deltas = defaultdict(float)
+    for row_number, payment in parsed:
+        outcome = {'row': row_number, 'fee_id': payment['fee_id'], 'reference': payment['reference']}
+        balance = balances.get(payment['fee_id'])
+        if payment['reference'] is not None and payment['reference'] in known:
+            outcome['status'] = DUPLICATE
+        elif payment['fee_id'] in archived:
+            outcome.update(status=REJECTED,
+                           error=str(archived_fee_error(payment['fee_id'], archived[payment['fee_id']])))
+        elif balance is None:
+            outcome.update(status=REJECTED, error=f"Fee {payment['fee_id']} not found")
+        elif balance[1] + payment['amount_paid'] > balance[0] + BALANCE_TOLERANCE:
+            outcome.update(status=REJECTED, error='Payment amount exceeds remaining fee amount')
+        else:
+            balance[1] += payment['amount_paid']
+            deltas[payment['fee_id']] += payment['amount_paid']
+            if payment['reference'] is not None:
+                known.add(payment['reference'])
+            outcome['status'] = POSTED
+            accepted.append((outcome, payment))
+        outcomes.append(outcome)
+
+    if accepted:
+        now = datetime.utcnow()
+        rows = [
+            {**payment, 'payment_date': payment['payment_date'] or now, 'created_at': now}
+            for _, payment in accepted
+        ]
+        ids = db.session.scalars(
+            insert(FeePayment).returning(FeePayment.id, sort_by_parameter_order=True),
+            rows
+        ).all()
+        for (outcome, _), payment_id in zip(accepted, ids):
+            outcome['payment_id'] = payment_id
+
+        db.session.execute(
+            update(Fee.__table__)
+            .where(Fee.__table__.c.id == bindparam('fee'))
+            .values(amount_paid=Fee.__table__.c.amount_paid + bindparam('delta'), updated_at=now),
+            [{'fee': fee_id, 'delta': delta} for fee_id, delta in deltas.items()]
+        )
+
+    outcomes.sort(key=lambda outcome: outcome['row'])
+    counts = defaultdict(int)
+    for outcome in outcomes:
+        counts[outcome['status']] += 1
+    summary = {
+        'total_rows': len(outcomes),
+        'posted': counts[POSTED],
+        'duplicates': counts[DUPLICATE],
+        'rejected': counts[REJECTED],
+        'amount_posted': round(sum(deltas.values()), 2),
+    }
+    return summary, outcomes
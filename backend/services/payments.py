@@ -0,0 +1,119 @@
+from datetime import datetime
+from sqlalchemy import func, update, select
+from models import db, Fee, FeePayment
+from models.archive import ArchivedFee
+
+# Slack for float rounding when a payment settles a fee exactly.
+BALANCE_TOLERANCE = 1e-6
+
+
+class PaymentError(ValueError):
+    pass
+
+
+class FeeNotFound(PaymentError):
+    pass
+
+
+class FeeArchived(PaymentError):
+    pass
+
+
+class Overpayment(PaymentError):
+    pass
+
+
+class DuplicatePayment(PaymentError):
+    pass
+
+
+def parse_payment_date(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise PaymentError(f"Invalid payment_date {value!r}. Please use ISO 8601 format.")
+
+
+def archived_fee_error(fee_id, academic_year):
+    return FeeArchived(f'Fee {fee_id} belongs to {academic_year}, which is archived; '
+                       'restore it before posting payments')
+
+
+def post_payment(fee_id, amount, payment_date=None, payment_method='cash', remarks='', reference=None):
+    """Record a payment and bump the fee's stored balance in one transaction.
+
+    The balance check and increment are a single conditional UPDATE, which is
+    also the transaction's first write, so SQLite takes the write lock before
+    the check and concurrent cashiers cannot both pass it. The caller commits.
+    """
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        raise PaymentError('Payment amount must be a number')
+    if amount <= 0:
+        raise PaymentError('Payment amount must be positive')
+    payment_date = parse_payment_date(payment_date)
+    if reference is not None and db.session.query(FeePayment.id).filter_by(reference=reference).first():
+        raise DuplicatePayment(f'Payment reference {reference} has already been posted')
+
+    result = db.session.execute(
+        update(Fee)
+        .where(Fee.id == fee_id,
+               Fee.amount_paid + amount <= Fee.total_amount + BALANCE_TOLERANCE)
+        .values(amount_paid=Fee.amount_paid + amount, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        if db.session.query(Fee.id).filter_by(id=fee_id).scalar() is None:
+            academic_year = db.session.scalar(
+                select(ArchivedFee.c.academic_year).where(ArchivedFee.c.id == fee_id)
+            )
+            if academic_year is not None:
+                raise archived_fee_error(fee_id, academic_year)
+            raise FeeNotFound(f'Fee {fee_id} not found')
+        raise Overpayment('Payment amount exceeds remaining fee amount')
+
+    payment = FeePayment(
+        fee_id=fee_id,
+        amount_paid=amount,
+        payment_method=payment_method,
+        remarks=remarks,
+        reference=reference
+    )
+    if payment_date is not None:
+        payment.payment_date = payment_date
+    db.session.add(payment)
+    db.session.flush()
+    return payment
+
+
+def reconcile_fee_balances(apply=True):
+    """Compare Fee.amount_paid with SUM(fee_payments.amount_paid).
+
+    Returns (fee_id, stored, actual) for every fee that has drifted, and
+    rewrites the stored values when `apply` is set.
+    """
+    paid = (
+        db.session.query(FeePayment.fee_id, func.sum(FeePayment.amount_paid).label('paid'))
+        .group_by(FeePayment.fee_id)
+        .subquery()
+    )
+    actual = func.coalesce(paid.c.paid, 0.0)
+    drift = (
+        db.session.query(Fee.id, Fee.amount_paid, actual)
+        .outerjoin(paid, paid.c.fee_id == Fee.id)
+        .filter(func.abs(Fee.amount_paid - actual) > BALANCE_TOLERANCE)
+        .order_by(Fee.id)
+        .all()
+    )
+    if apply and drift:
+        db.session.execute(
+            update(Fee),
+            [{'id': fee_id, 'amount_paid': value} for fee_id, _, value in drift]
+        )
+        db.session.commit()
+    return drift
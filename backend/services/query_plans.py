@@ -0,0 +1,94 @@
+"""EXPLAIN QUERY PLAN checks for the filtered read queries.
+
+Each check builds a statement the way its endpoint does and names the
+tables SQLite must reach through an index (SEARCH) rather than read
+whole (SCAN). `flask check-query-plans` runs them against the configured
+database, so a query change, or a database missing the indexes of
+revisions e7c3a9f1b5d2 and f2b6d8e4a9c3, shows up before it shows up as
+latency.
+"""
+import re
+from datetime import date
+from sqlalchemy import select
+from werkzeug.datastructures import MultiDict
+from models import db, Fee
+from models.archive import ArchivedFee
+
+# SQLite before 3.36 says "SCAN TABLE fees", later versions "SCAN fees".
+_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+
+SAMPLE_YEAR = '2024-2025'
+SAMPLE_RANGE = (date(2024, 6, 1), date(2024, 12, 31))
+
+
+def _student_list(**args):
+    from routes.students import plan_student_list
+    rows_query, count_query, _, _, _ = plan_student_list(MultiDict(args))
+    return rows_query.statement
+
+
+def _ledger(**kwargs):
+    from services.ledger import ledger_plan
+    return ledger_plan().statement(1, **kwargs)
+
+
+def _payments():
+    from services.ledger import payments_statement
+    return payments_statement([1, 2, 3], *SAMPLE_RANGE)
+
+
+def _ledger_validator():
+    from services.ledger import ledger_validator_statement
+    return ledger_validator_statement(1)
+
+
+def _fees_of_year():
+    return select(Fee.id).where(Fee.academic_year == SAMPLE_YEAR)
+
+
+def _archived_ledger():
+    from services.ledger import ledger_plan
+    return ledger_plan().statement(1, include_archived=True)
+
+
+def _archived_fees_of_year():
+    return select(ArchivedFee.c.id).where(ArchivedFee.c.academic_year == SAMPLE_YEAR)
+
+
+# (name, statement builder, tables that must not be scanned)
+CHECKS = [
+    ('students by class and section', lambda: _student_list(**{'class': '5', 'section': 'A'}), ('students',)),
+    ('students by class, cursor', lambda: _student_list(**{'class': '5', 'after': '', 'order': 'class'}),
+     ('students',)),
+    ('students by joined date', lambda: _student_list(joined_from='2020-06-01', joined_to='2020-06-30'),
+     ('students',)),
+    ('fee ledger', _ledger, ('fees', 'fee_payments')),
+    ('fee ledger for a year', lambda: _ledger(academic_year=SAMPLE_YEAR), ('fees', 'fee_payments')),
+    ('ledger payments by date', _payments, ('fee_payments',)),
+    ('ledger validator', _ledger_validator, ('fees',)),
+    ('fees of an academic year', _fees_of_year, ('fees',)),
+    ('fee ledger with archived years', _archived_ledger,
+     ('fees', 'fee_payments', 'fees_archive', 'fee_payments_archive')),
+    ('archived fees of an academic year', _archived_fees_of_year, ('fees_archive',)),
+]
+
+
+def explain(statement, bind=None):
+    """SQLite's plan for `statement` as a list of detail lines."""
+    bind = bind or db.session.connection()
+    sql = statement.compile(bind, compile_kwargs={'literal_binds': True})
+    return [row[-1] for row in bind.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+def full_scans(plan, tables):
+    """Plan lines reading one of `tables` from end to end."""
+    return [line for line in plan if (match := _SCAN.match(line)) and match.group(1) in tables]
+
+
+def check_query_plans():
+    """Run CHECKS; returns [(name, plan lines, offending lines)]."""
+    results = []
+    for name, build, tables in CHECKS:
+        plan = explain(build())
+        results.append((name, plan, full_scans(plan, tables)))
+    return results
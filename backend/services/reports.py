@@ -0,0 +1,235 @@
+from datetime import date
+from sqlalchemy import select, func, case, cast, literal, Integer
+from models import db, Student, Fee, FeeType, FeePayment
+from models.archive import with_archive
+from utils.filters import date_range_clauses
+
+# Columns a dues report can be grouped by, in output order.
+GROUPINGS = {
+    'class': Student.class_name,
+    'section': Student.section,
+    'academic_year': Fee.academic_year,
+    'fee_type': FeeType.name,
+}
+
+# (label, first day, last day) of each aging bucket; None is open-ended.
+AGING_BUCKETS = [
+    ('0-30', 0, 30),
+    ('31-60', 31, 60),
+    ('61-90', 61, 90),
+    ('90+', 91, None),
+]
+
+# created: days since the fee was raised. last_payment: days since the most
+# recent payment against it, or since it was raised if nothing was paid.
+AGING_BASES = ('created', 'last_payment')
+
+
+def parse_group_by(value):
+    names = [name.strip() for name in (value or 'class,section,academic_year,fee_type').split(',') if name.strip()]
+    unknown = [name for name in names if name not in GROUPINGS]
+    if unknown or not names:
+        raise ValueError(f"group_by must be a comma separated list of: {', '.join(GROUPINGS)}")
+    return list(dict.fromkeys(names))
+
+
+def _fee_filters(filters):
+    clauses = []
+    if filters.get('class'):
+        clauses.append(Student.class_name == filters['class'])
+    if filters.get('section'):
+        clauses.append(Student.section == filters['section'])
+    if filters.get('academic_year'):
+        clauses.append(Fee.academic_year == filters['academic_year'])
+    if filters.get('fee_type_id'):
+        clauses.append(Fee.fee_type_id == filters['fee_type_id'])
+    return clauses
+
+
+def _fee_rows(filters, aging, as_of):
+    """Per-fee amount paid, outstanding balance and age in days, as of
+    `as_of`, as a subquery.
+
+    One pass over fees joined to students and fee types, and one grouped
+    pass over fee_payments for what was paid against each fee by `as_of`.
+    Fees raised after `as_of` are left out, and payments made after it
+    count neither as paid nor for the last_payment basis, so a historical
+    report shows the balances as they stood on that day and no age comes
+    out negative. Without an aging basis the age_days column is left out.
+    With include_archived the same again over the archive tables, unioned.
+    """
+    payments = (
+        select(
+            FeePayment.fee_id,
+            func.sum(FeePayment.amount_paid).label('paid'),
+            func.max(FeePayment.payment_date).label('paid_at'),
+        )
+        .where(*date_range_clauses(FeePayment.payment_date, None, as_of))
+        .group_by(FeePayment.fee_id)
+        .subquery('payments')
+    )
+    paid = func.coalesce(payments.c.paid, 0.0)
+    query = (
+        select(
+            Fee.student_id, Student.roll_number, Student.student_name,
+            *[column.label(name) for name, column in GROUPINGS.items()],
+            Fee.total_amount, paid.label('amount_paid'), (Fee.total_amount - paid).label('outstanding'),
+        )
+        .join(Student, Student.id == Fee.student_id)
+        .join(FeeType, FeeType.id == Fee.fee_type_id)
+        .outerjoin(payments, payments.c.fee_id == Fee.id)
+        .where(*_fee_filters(filters), *date_range_clauses(Fee.created_at, None, as_of))
+    )
+    if aging is not None:
+        since = func.coalesce(payments.c.paid_at, Fee.created_at) if aging == 'last_payment' else Fee.created_at
+        age = cast(func.julianday(literal(as_of.isoformat())) - func.julianday(func.date(since)), Integer)
+        query = query.add_columns(age.label('age_days'))
+    if filters.get('include_archived'):
+        return with_archive(query, name='fee_rows')
+    return query.subquery('fee_rows')
+
+
+def _bucket_sums(fees):
+    """sum(outstanding) per aging bucket, counting only fees still owed."""
+    sums = []
+    for label, low, high in AGING_BUCKETS:
+        condition = fees.c.age_days >= low if high is None else fees.c.age_days.between(low, high)
+        sums.append(func.sum(case(
+            ((fees.c.outstanding > 0) & condition, fees.c.outstanding), else_=0.0
+        )).label(f'aged_{label}'))
+    return sums
+
+
+def _percent(part, whole):
+    return round(part * 100.0 / whole, 2) if whole else None
+
+
+def dues_report(group_by, filters, aging='created', as_of=None):
+    """Outstanding dues and collection efficiency grouped by `group_by`.
+
+    Returns (groups, totals): one grouped query for the groups and one for
+    the school-wide head counts. The number of groups is bounded by the
+    class/section/year/fee-type combinations, not by the number of
+    students or fees.
+    """
+    as_of = as_of or date.today()
+    fees = _fee_rows(filters, aging, as_of)
+    keys = [fees.c[name] for name in group_by]
+    rows = db.session.execute(
+        select(
+            *keys,
+            func.count(func.distinct(fees.c.student_id)).label('students'),
+            func.count(func.distinct(case((fees.c.outstanding > 0, fees.c.student_id)))).label('students_owing'),
+            func.count().label('fees'),
+            func.sum(fees.c.total_amount).label('billed'),
+            func.sum(fees.c.amount_paid).label('collected'),
+            func.sum(case((fees.c.outstanding > 0, fees.c.outstanding), else_=0.0)).label('outstanding'),
+            *_bucket_sums(fees),
+        )
+        .group_by(*keys)
+        .order_by(*keys)
+    ).all()
+
+    bucket_names = [f'aged_{label}' for label, _, _ in AGING_BUCKETS]
+    groups = []
+    totals = {'students': 0, 'students_owing': 0, 'fees': 0, 'billed': 0.0, 'collected': 0.0,
+              'outstanding': 0.0, 'aging': dict.fromkeys((label for label, _, _ in AGING_BUCKETS), 0.0)}
+    for row in rows:
+        mapping = row._mapping
+        aged = {label: round(mapping[name] or 0.0, 2) for (label, _, _), name in zip(AGING_BUCKETS, bucket_names)}
+        groups.append({
+            **{name: mapping[name] for name in group_by},
+            'students': row.students,
+            'students_owing': row.students_owing,
+            'fees': row.fees,
+            'billed': round(row.billed or 0.0, 2),
+            'collected': round(row.collected or 0.0, 2),
+            'outstanding': round(row.outstanding or 0.0, 2),
+            'paid_percent': _percent(row.collected or 0.0, row.billed or 0.0),
+            'aging': aged,
+        })
+        for field in ('fees', 'billed', 'collected', 'outstanding'):
+            totals[field] += mapping[field] or 0
+        for label in aged:
+            totals['aging'][label] += aged[label]
+
+    # Students can span several groups, so school-wide head counts are
+    # their own query rather than a sum over groups.
+    fees = _fee_rows(filters, None, as_of)
+    head_counts = db.session.execute(select(
+        func.count(func.distinct(fees.c.student_id)),
+        func.count(func.distinct(case((fees.c.outstanding > 0, fees.c.student_id)))),
+    )).one()
+    totals['students'], totals['students_owing'] = head_counts
+    for field in ('billed', 'collected', 'outstanding'):
+        totals[field] = round(totals[field], 2)
+    totals['aging'] = {label: round(value, 2) for label, value in totals['aging'].items()}
+    totals['paid_percent'] = _percent(totals['collected'], totals['billed'])
+    return groups, totals
+
+
+def _bucket_label(age_column):
+    whens = [
+        (age_column.between(low, high), literal(label))
+        for label, low, high in AGING_BUCKETS if high is not None
+    ]
+    return case(*whens, else_=literal(AGING_BUCKETS[-1][0]))
+
+
+def defaulters_query(filters, aging='created', as_of=None, min_outstanding=0.0):
+    """Students owing more than `min_outstanding`, largest balance first.
+
+    One row per student: their outstanding balance over the selected fees
+    and the age of their oldest unpaid fee.
+    """
+    as_of = as_of or date.today()
+    fees = _fee_rows(filters, aging, as_of)
+    owing = fees.c.outstanding > 0
+    outstanding = func.sum(case((owing, fees.c.outstanding), else_=0.0))
+    oldest = func.max(case((owing, fees.c.age_days)))
+    return (
+        select(
+            fees.c.student_id,
+            fees.c.roll_number,
+            fees.c.student_name,
+            fees.c['class'],
+            fees.c.section,
+            func.count().label('fees'),
+            func.sum(fees.c.total_amount).label('billed'),
+            outstanding.label('outstanding'),
+            oldest.label('oldest_unpaid_days'),
+            _bucket_label(oldest).label('aging_bucket'),
+        )
+        .group_by(fees.c.student_id)
+        .having(outstanding > min_outstanding)
+        .order_by(outstanding.desc(), fees.c.student_id)
+    )
+
+
+def _money(value):
+    return round(value, 2) if value is not None else None
+
+
+# (output field, column name, formatter), as in services.export, so the
+# defaulters list can be streamed with the export writers.
+DEFAULTER_FIELDS = [
+    ('student_id', 'student_id', None),
+    ('roll_number', 'roll_number', None),
+    ('student_name', 'student_name', None),
+    ('class', 'class', None),
+    ('section', 'section', None),
+    ('fees', 'fees', None),
+    ('billed', 'billed', _money),
+    ('outstanding', 'outstanding', _money),
+    ('oldest_unpaid_days', 'oldest_unpaid_days', None),
+    ('aging_bucket', 'aging_bucket', None),
+]
+
+
+def defaulter_dicts(rows):
+    names = [name for name, _, _ in DEFAULTER_FIELDS]
+    formatters = [formatter for _, _, formatter in DEFAULTER_FIELDS]
+    return [
+        {name: formatter(value) if formatter else value for name, formatter, value in zip(names, formatters, row)}
+        for row in rows
+    ]
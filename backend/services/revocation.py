@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import select, delete
+from models import db
+from models.storage import write_transaction
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps of expired entries out of a worker's dict.
+SWEEP_INTERVAL = 60
+
+
+class RevocationStore:
+    """Revoked JWT ids, checked in memory on every authenticated request.
+
+    `revoked_tokens` is the durable record; each worker mirrors its
+    unexpired rows in a dict (jti -> expiry) and looks tokens up there, so a
+    check is a dict lookup. At most every `poll_interval` seconds a check
+    also reads the rows added since the last one (an indexed range on the
+    autoincrement id), which is how revocations made in other workers
+    arrive. Expired entries are swept from memory every SWEEP_INTERVAL
+    seconds and from the table by revoke() every `purge_interval` seconds,
+    or by `flask purge-revoked-tokens`.
+    """
+
+    def __init__(self, poll_interval=1.0, purge_interval=3600):
+        self.poll_interval = poll_interval
+        self.purge_interval = purge_interval
+        self._revoked = {}
+        self._last_id = 0
+        self._pid = None
+        self._next_poll = 0.0
+        self._next_sweep = 0.0
+        self._next_purge = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, poll_interval=None, purge_interval=None):
+        with self._lock:
+            if poll_interval is not None:
+                self.poll_interval = poll_interval
+            if purge_interval is not None:
+                self.purge_interval = purge_interval
+            self._pid = None
+
+    def is_revoked(self, jti):
+        if self._pid != os.getpid() or time.monotonic() >= self._next_poll:
+            self._poll()
+        return jti in self._revoked
+
+    def _poll(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._pid != os.getpid():
+                # New process (or reconfigured): start from the whole table.
+                self._revoked, self._last_id = {}, 0
+                self._pid = os.getpid()
+            elif now < self._next_poll:
+                return
+            self._next_poll = now + self.poll_interval
+            with db.engine.connect() as connection:
+                rows = connection.execute(
+                    select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                    .where(RevokedToken.id > self._last_id)
+                    .order_by(RevokedToken.id)
+                ).all()
+            utcnow = datetime.utcnow()
+            for row_id, jti, expires in rows:
+                if expires is None or expires > utcnow:
+                    self._revoked[jti] = expires
+                self._last_id = row_id
+            if now >= self._next_sweep:
+                self._next_sweep = now + SWEEP_INTERVAL
+                # Rebuilt in one pass; deleting while iterating isn't allowed.
+                self._revoked = {jti: expires for jti, expires in self._revoked.items()
+                                 if expires is None or expires > utcnow}
+
+    def revoke(self, payload):
+        """Revoke the token with decoded claims `payload` (idempotent)."""
+        jti = payload['jti']
+        expires = datetime.utcfromtimestamp(payload['exp']) if 'exp' in payload else None
+
+        def record():
+            if db.session.execute(select(RevokedToken.id).filter_by(jti=jti)).first() is None:
+                db.session.add(RevokedToken(
+                    jti=jti,
+                    token_type=payload.get('type', 'access'),
+                    user_id=int(payload['sub']) if payload.get('sub') else None,
+                    expires_at=expires,
+                ))
+
+        write_transaction(record)
+        with self._lock:
+            self._revoked[jti] = expires
+            purge = time.monotonic() >= self._next_purge
+            if purge:
+                self._next_purge = time.monotonic() + self.purge_interval
+        if purge:
+            self.purge_expired()
+
+    def purge_expired(self):
+        """Delete revocations of tokens that have expired; returns the count."""
+        with db.engine.begin() as connection:
+            deleted = connection.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow())
+            ).rowcount
+        if deleted:
+            logger.info("Purged %s expired token revocations", deleted)
+        return deleted
+
+    def stats(self):
+        return {'revoked': len(self._revoked), 'last_id': self._last_id}
+
+
+revocations = RevocationStore()
+
+
+def init_revocation(app, jwt):
+    """Apply JWT_REVOCATION_* settings and check every token against the store."""
+    revocations.configure(
+        poll_interval=app.config.get('JWT_REVOCATION_POLL_INTERVAL'),
+        purge_interval=app.config.get('JWT_REVOCATION_PURGE_INTERVAL'),
+    )
+
+    @jwt.token_in_blocklist_loader
+    def _token_revoked(jwt_header, jwt_payload):
+        return revocations.is_revoked(jwt_payload['jti'])
@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+from sqlalchemy.exc import IntegrityError
+from models import db, Student
+from models.cache import invalidate_cache
+from models.storage import write_transaction
+
+# Stop collecting per-row errors past this many, so a bad file can't produce
+# a report larger than the upload.
+MAX_REPORTED_ERRORS = 1000
+
+
+def iter_csv_rows(stream, encoding='utf-8'):
+    """Yield dicts from a CSV upload whose header uses the API's field names."""
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    for row in csv.DictReader(text):
+        yield {key.strip(): (value.strip() if isinstance(value, str) else value)
+               for key, value in row.items() if key}
+
+
+def iter_ndjson_rows(stream, encoding='utf-8'):
+    """Yield one dict per non-blank line of a newline-delimited JSON upload."""
+    text = io.TextIOWrapper(stream, encoding=encoding)
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f'Invalid JSON: {e}')
+
+
+class ImportReport:
+    def __init__(self):
+        self.total_rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, row_number, roll_number, reason):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'rollNumber': roll_number, 'error': reason})
+
+    def to_dict(self):
+        return {
+            'total_rows': self.total_rows,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'errors_truncated': self.rejected > len(self.errors)
+        }
+
+
+def _existing_roll_numbers(roll_numbers):
+    rows = db.session.query(Student.roll_number).filter(Student.roll_number.in_(roll_numbers))
+    return {roll_number for (roll_number,) in rows}
+
+
+def _flush_batch(batch, report):
+    """Insert one batch in its own transaction, skipping taken roll numbers."""
+    # A second pass covers roll numbers taken by another writer between the
+    # check and the insert.
+    for _ in range(2):
+        existing = _existing_roll_numbers([values['roll_number'] for _, values in batch])
+        accepted = [values for _, values in batch if values['roll_number'] not in existing]
+        try:
+            if accepted:
+                write_transaction(db.session.execute, Student.__table__.insert(), accepted)
+        except IntegrityError:
+            db.session.rollback()
+            continue
+        for row_number, values in batch:
+            if values['roll_number'] in existing:
+                report.reject(row_number, values['roll_number'], 'Roll number already exists')
+        report.imported += len(accepted)
+        return
+
+    for row_number, values in batch:
+        report.reject(row_number, values['roll_number'], 'Could not insert row')
+
+
+def import_students(rows, batch_size=1000):
+    """Validate and insert students from an iterable of API-shaped dicts.
+
+    Each row goes through the same validation as Student.from_dict (without
+    building an ORM instance), duplicate roll numbers are found
+    with one IN query per batch (plus a set for repeats within the upload),
+    and accepted rows are written with a single executemany INSERT per batch.
+    """
+    report = ImportReport()
+    seen = set()
+    batch = []
+    try:
+        for row_number, data in enumerate(rows, start=1):
+            report.total_rows += 1
+            roll_number = data.get('rollNumber') if isinstance(data, dict) else None
+            try:
+                if isinstance(data, Exception):
+                    raise data
+                if not isinstance(data, dict):
+                    raise ValueError('Row must be an object')
+                values = Student.columns_from_dict(data)
+            except ValueError as ve:
+                report.reject(row_number, roll_number, str(ve))
+                continue
+
+            if values['roll_number'] in seen:
+                report.reject(row_number, roll_number, 'Duplicate roll number in upload')
+                continue
+            seen.add(values['roll_number'])
+
+            batch.append((row_number, values))
+            if len(batch) >= batch_size:
+                _flush_batch(batch, report)
+                batch = []
+        if batch:
+            _flush_batch(batch, report)
+    finally:
+        if report.imported:
+            invalidate_cache('student_counts')
+    return report
@@ -0,0 +1,60 @@
+from datetime import date
+import pytest
+from flask_migrate import upgrade
+from app import create_app
+from models import db, Student, Fee, FeeType
+
+
+@pytest.fixture
+def config_overrides():
+    """Settings on top of TestingConfig; override the fixture to change them."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, config_overrides):
+    """The API on a fresh SQLite file built by `flask db upgrade` alone."""
+    app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'school.db'),
+                                 **config_overrides})
+    with app.app_context():
+        upgrade()
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def student(app):
+    """Id of a student in class 5A with no fees yet."""
+    with app.app_context():
+        student = Student(student_name='Asha Rao', parents_name='Ravi Rao', roll_number='R0001', class_name='5',
+                          section='A', school_joined_date=date(2024, 6, 1), date_of_birth=date(2014, 1, 1),
+                          phone_number='555-0100')
+        db.session.add(student)
+        db.session.commit()
+        return student.id
+
+
+@pytest.fixture
+def fee_type(app):
+    with app.app_context():
+        fee_type = FeeType(name='Tuition')
+        db.session.add(fee_type)
+        db.session.commit()
+        return fee_type.id
+
+
+@pytest.fixture
+def fee(app, student, fee_type):
+    """Id of a 1000.00 fee of `student` for 2024-2025, nothing paid."""
+    with app.app_context():
+        fee = Fee(student_id=student, fee_type_id=fee_type, total_amount=1000.0, academic_year='2024-2025')
+        db.session.add(fee)
+        db.session.commit()
+        return fee.id
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import text
+from models import db
+from models.rollups import ROLLUP_TABLES
+
+
+def _archive(app, academic_year):
+    result = app.test_cli_runner().invoke(args=['archive-year', academic_year, '--force'])
+    assert result.exit_code == 0, result.output
+
+
+def test_payment_against_archived_fee_is_a_conflict(app, client, fee):
+    _archive(app, '2024-2025')
+    response = client.post(f'/api/fees/{fee}/payments', json={'amount': 100})
+    assert response.status_code == 409
+    assert 'archived' in response.get_json()['error']
+
+    assert client.post('/api/fees/999/payments', json={'amount': 100}).status_code == 404
+
+
+def test_batch_payment_against_archived_fee_says_so(app, client, fee):
+    _archive(app, '2024-2025')
+    body = client.post('/api/payments/batch', json=[{'fee_id': fee, 'amount': 100},
+                                                     {'fee_id': 999, 'amount': 100}]).get_json()
+    assert [(row['status'], row['error']) for row in body['results']] == [
+        ('rejected', f'Fee {fee} belongs to 2024-2025, which is archived; restore it before posting payments'),
+        ('rejected', 'Fee 999 not found'),
+    ]
+
+
+def _stats_tables(app):
+    with app.app_context():
+        return {table: db.session.execute(text(f'SELECT * FROM {table} ORDER BY 1, 2')).all()
+                for table in ROLLUP_TABLES}
+
+
+@pytest.fixture
+def two_years(app, client, student, fee_type):
+    """A fee of 2023-2024 paid 300 in two payments, and an unpaid one of 2024-2025."""
+    fees = {}
+    for year in ('2023-2024', '2024-2025'):
+        response = client.post(f'/api/students/{student}/fees',
+                               json={'fee_type_id': fee_type, 'total_amount': 1000, 'academic_year': year})
+        fees[year] = response.get_json()['fee']['id']
+    for amount, day in ((100, '2024-01-10'), (200, '2024-02-10')):
+        assert client.post(f'/api/fees/{fees["2023-2024"]}/payments',
+                           json={'amount': amount, 'payment_date': day}).status_code == 201
+    return fees
+
+
+def _years(response):
+    return sorted(fee['academic_year'] for fee in response.get_json()['fees'])
+
+
+def test_archive_include_archived_and_restore(app, client, student, two_years):
+    live_stats = _stats_tables(app)
+    dues = client.get('/api/reports/dues?group_by=academic_year').get_json()['totals']
+    assert (dues['fees'], dues['billed'], dues['collected']) == (2, 2000.0, 300.0)
+
+    # The latest year is normally still being billed.
+    result = app.test_cli_runner().invoke(args=['archive-year', '2024-2025'])
+    assert result.exit_code != 0 and 'latest academic year' in result.output
+    result = app.test_cli_runner().invoke(args=['archive-year', '2023-2024'])
+    assert result.exit_code == 0, result.output
+    assert result.output.strip() == 'Archived 2023-2024: 1 fee(s), 2 payment(s).'
+
+    # Live reads only see the open year...
+    assert _years(client.get(f'/api/students/{student}/fees')) == ['2024-2025']
+    archived_dues = client.get('/api/reports/dues').get_json()['totals']
+    assert (archived_dues['fees'], archived_dues['billed'], archived_dues['collected']) == (1, 1000.0, 0.0)
+    stats = client.get('/api/dashboard/stats').get_json()['dues']
+    assert [row['academic_year'] for row in stats['by_academic_year']] == ['2024-2025']
+    with app.app_context():
+        assert db.session.execute(text('SELECT count(*) FROM stats_monthly WHERE payment_count > 0')).scalar() == 0
+
+    # ...and include_archived reads the archive too.
+    ledger = client.get(f'/api/students/{student}/fees?include=payments&include_archived=true').get_json()['fees']
+    assert sorted((fee['academic_year'], len(fee['payments'])) for fee in ledger) == [
+        ('2023-2024', 2), ('2024-2025', 0)
+    ]
+    everything = client.get('/api/reports/dues?include_archived=true').get_json()['totals']
+    assert {key: everything[key] for key in ('fees', 'billed', 'collected')} == \
+        {key: dues[key] for key in ('fees', 'billed', 'collected')}
+    stats = client.get('/api/dashboard/stats?include_archived=true').get_json()['dues']
+    assert (stats['billed'], stats['collected']) == (2000.0, 300.0)
+
+    # Writes against the archived year are refused until it is restored.
+    assert client.post(f'/api/fees/{two_years["2023-2024"]}/payments', json={'amount': 1}).status_code == 409
+    assert client.post(f'/api/students/{student}/fees', json={
+        'fee_type_id': 1, 'total_amount': 5, 'academic_year': '2023-2024'}).status_code == 409
+
+    result = app.test_cli_runner().invoke(args=['restore-year', '2023-2024'])
+    assert result.exit_code == 0, result.output
+    assert result.output.strip() == 'Restored 2023-2024: 1 fee(s), 2 payment(s).'
+    assert _years(client.get(f'/api/students/{student}/fees')) == ['2023-2024', '2024-2025']
+    assert _stats_tables(app) == live_stats
+    assert client.post(f'/api/fees/{two_years["2023-2024"]}/payments', json={'amount': 1}).status_code == 201
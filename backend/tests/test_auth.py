@@ -0,0 +1,96 @@
+import pytest
+from flask_jwt_extended import decode_token
+from werkzeug.security import generate_password_hash
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+from models import db
+from services.credentials import credentials
+
+ACCOUNT = {'email': 'office@school.test', 'password': 'correct horse', 'first_name': 'Office',
+           'last_name': 'Admin', 'role': 'admin'}
+
+
+@pytest.fixture
+def account(client):
+    assert client.post('/api/auth/register', json=ACCOUNT).status_code == 201
+
+
+def _login(client, password=ACCOUNT['password']):
+    return client.post('/api/auth/login', json={'email': ACCOUNT['email'], 'password': password})
+
+
+def _stored_hash(app):
+    with app.app_context():
+        return db.session.scalar(db.select(User.password_hash))
+
+
+def test_login(client, account):
+    assert _login(client, 'wrong').status_code == 401
+    response = _login(client)
+    assert response.status_code == 200
+    assert response.get_json()['user']['email'] == ACCOUNT['email']
+
+
+def test_login_upgrades_hashes_made_with_other_parameters(app, client, account):
+    with app.app_context():
+        db.session.execute(db.update(User).values(
+            password_hash=generate_password_hash(ACCOUNT['password'], 'pbkdf2:sha256:600')))
+        db.session.commit()
+    assert credentials.needs_rehash(_stored_hash(app))
+
+    assert _login(client, 'wrong').status_code == 401
+    assert _stored_hash(app).startswith('pbkdf2:sha256:600$')
+    assert _login(client).status_code == 200
+    assert _stored_hash(app).startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+    assert _login(client).status_code == 200
+
+
+class TestHashingBusy:
+    @pytest.fixture
+    def config_overrides(self):
+        return {'PASSWORD_HASH_MAX_PENDING': 0}
+
+    def test_logins_past_the_queue_get_a_503(self, client):
+        response = client.post('/api/auth/register', json=ACCOUNT)
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert credentials.stats()['rejected'] >= 1
+
+
+@pytest.fixture
+def tokens(client, account):
+    body = _login(client).get_json()
+    return body['access_token'], body['refresh_token']
+
+
+def _bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_logout_revokes_the_access_token(client, tokens):
+    access, refresh = tokens
+    assert client.get('/api/auth/me', headers=_bearer(access)).status_code == 200
+    assert client.post('/api/auth/logout', headers=_bearer(access)).status_code == 200
+    response = client.get('/api/auth/me', headers=_bearer(access))
+    assert response.status_code == 401
+    # The refresh token is still good until it is logged out too.
+    assert client.post('/api/auth/refresh', headers=_bearer(refresh)).status_code == 200
+    assert client.post('/api/auth/logout', headers=_bearer(refresh)).status_code == 200
+    assert client.post('/api/auth/refresh', headers=_bearer(refresh)).status_code == 401
+    # A second logout with a revoked token is refused, not recorded twice.
+    assert client.post('/api/auth/logout', headers=_bearer(access)).status_code == 401
+
+
+class TestRevocationsFromOtherWorkers:
+    @pytest.fixture
+    def config_overrides(self):
+        return {'JWT_REVOCATION_POLL_INTERVAL': 0}
+
+    def test_rows_written_elsewhere_are_picked_up(self, app, client, tokens):
+        access, _ = tokens
+        assert client.get('/api/auth/me', headers=_bearer(access)).status_code == 200
+        with app.app_context():
+            # What another worker's logout leaves behind: only the table row.
+            db.session.add(RevokedToken(jti=decode_token(access)['jti'], token_type='access', user_id=1))
+            db.session.commit()
+        assert client.get('/api/auth/me', headers=_bearer(access)).status_code == 401
@@ -0,0 +1,96 @@
+import pytest
+
+
+def test_create_fee(client, student, fee_type):
+    response = client.post(f'/api/students/{student}/fees',
+                           json={'fee_type_id': fee_type, 'total_amount': 1000, 'academic_year': '2024-2025'})
+    assert response.status_code == 201
+    assert response.get_json()['fee']['total_amount'] == 1000.0
+
+
+def test_create_fee_twice_is_a_conflict(client, student, fee_type):
+    body = {'fee_type_id': fee_type, 'total_amount': 1000, 'academic_year': '2024-2025'}
+    assert client.post(f'/api/students/{student}/fees', json=body).status_code == 201
+    response = client.post(f'/api/students/{student}/fees', json=body)
+    assert response.status_code == 409
+    assert 'already assigned' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('body', [
+    {'fee_type_id': None, 'total_amount': 1000},
+    {'total_amount': 1000},
+    {'fee_type_id': 1, 'total_amount': 'lots'},
+    {'fee_type_id': 1, 'total_amount': 0},
+    {'fee_type_id': 999, 'total_amount': 1000},
+])
+def test_create_fee_rejects_bad_bodies(client, student, fee_type, body):
+    response = client.post(f'/api/students/{student}/fees', json=body)
+    assert response.status_code == 400
+    assert 'already assigned' not in response.get_json()['error']
+
+
+def test_create_fee_for_unknown_student(client, fee_type):
+    response = client.post('/api/students/999/fees', json={'fee_type_id': fee_type, 'total_amount': 1000})
+    assert response.status_code == 404
+
+
+def _add_student(client, number, section):
+    response = client.post('/api/students', json={
+        'studentName': f'Student {number}', 'parentsName': f'Parent {number}', 'rollNumber': f'R{number:04d}',
+        'class': '6', 'section': section, 'schoolJoinedDate': '2024-06-01', 'dateOfBirth': '2013-01-01',
+        'phoneNumber': '555-0100',
+    })
+    assert response.status_code == 201
+    return response.get_json()['data']['id']
+
+
+@pytest.fixture
+def heads(app, client):
+    """Three class 6 students (two in A, one in B) and two fee types."""
+    for number, section in ((11, 'A'), (12, 'A'), (13, 'B')):
+        _add_student(client, number, section)
+    return [client.post('/api/fee-types', json={'name': name}).get_json()['fee_type']['id']
+            for name in ('Tuition', 'Transport')]
+
+
+def test_bulk_assignment_only_fills_gaps(client, heads):
+    body = {'academic_year': '2024-2025', 'class': '6',
+            'fees': [{'fee_type_id': heads[0], 'total_amount': 1000}, {'fee_type_id': heads[1], 'total_amount': 300}]}
+    first = client.post('/api/fees/bulk', json=body).get_json()
+    assert (first['students'], first['created'], first['skipped']) == (3, 6, 0)
+
+    again = client.post('/api/fees/bulk', json=body).get_json()
+    assert (again['students'], again['created'], again['skipped']) == (3, 0, 6)
+
+    newcomer = _add_student(client, 14, 'B')
+    third = client.post('/api/fees/bulk', json=body).get_json()
+    assert (third['students'], third['created'], third['skipped']) == (4, 2, 6)
+    assert [fee['total_amount'] for fee in client.get(f'/api/students/{newcomer}/fees').get_json()['fees']] \
+        == [1000.0, 300.0]
+
+
+def test_bulk_assignment_by_section_and_ids(client, heads):
+    by_section = client.post('/api/fees/bulk', json={
+        'academic_year': '2024-2025', 'class': '6', 'section': 'A',
+        'fees': [{'fee_type_id': heads[0], 'total_amount': 1000}],
+    }).get_json()
+    assert (by_section['students'], by_section['created']) == (2, 2)
+
+    by_ids = client.post('/api/fees/bulk', json={
+        'academic_year': '2024-2025', 'student_ids': [1, 2, 3],
+        'fees': [{'fee_type_id': heads[0], 'total_amount': 1000}],
+    }).get_json()
+    assert (by_ids['students'], by_ids['created'], by_ids['skipped']) == (3, 1, 2)
+
+
+@pytest.mark.parametrize('body, error', [
+    ({'academic_year': '2024', 'class': '6'}, 'academic_year must look like 2024-2025'),
+    ({'academic_year': '2024-2025'}, 'Specify a class, a section or student_ids'),
+    ({'academic_year': '2024-2025', 'class': '6', 'fees': []}, 'At least one fee head is required'),
+    ({'academic_year': '2024-2025', 'class': '6', 'fees': [{'fee_type_id': 999, 'total_amount': 10}]},
+     'Unknown fee_type_id: 999'),
+])
+def test_bulk_assignment_rejects_bad_requests(client, heads, body, error):
+    response = client.post('/api/fees/bulk', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == error
@@ -0,0 +1,69 @@
+from datetime import date, datetime
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from models import db, Student, Fee, FeeType, FeePayment
+
+
+def _add_student(number, fees, payments_per_fee):
+    student = Student(
+        student_name=f'Student {number}', parents_name=f'Parent {number}', roll_number=f'R{number:04d}',
+        class_name='5', section='A', school_joined_date=date(2024, 6, 1), date_of_birth=date(2014, 1, 1),
+        phone_number='555-0100'
+    )
+    db.session.add(student)
+    db.session.flush()
+    for index in range(fees):
+        fee_type = FeeType(name=f'Head {number}-{index}')
+        db.session.add(fee_type)
+        db.session.flush()
+        fee = Fee(student_id=student.id, fee_type_id=fee_type.id, total_amount=1000.0,
+                  amount_paid=10.0 * payments_per_fee, academic_year='2024-2025')
+        db.session.add(fee)
+        db.session.flush()
+        for payment in range(payments_per_fee):
+            db.session.add(FeePayment(fee_id=fee.id, amount_paid=10.0,
+                                      payment_date=datetime(2024, 7, 1 + payment)))
+    return student.id
+
+
+@pytest.fixture
+def students(app):
+    """Student ids by shape: no fees, one fee with one payment, many of both."""
+    with app.app_context():
+        ids = {
+            'none': _add_student(1, fees=0, payments_per_fee=0),
+            'one': _add_student(2, fees=1, payments_per_fee=1),
+            'many': _add_student(3, fees=25, payments_per_fee=4),
+        }
+        db.session.commit()
+    return ids
+
+
+@pytest.fixture
+def statements():
+    """SQL statements executed, on any engine, while the test runs."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(Engine, 'before_cursor_execute', record)
+
+
+@pytest.mark.parametrize('query, expected', [('', 2), ('?include=payments', 3)])
+def test_ledger_query_count_is_fixed(client, students, statements, query, expected):
+    counts = {}
+    for shape, student_id in students.items():
+        statements.clear()
+        response = client.get(f'/api/students/{student_id}/fees{query}')
+        assert response.status_code == 200
+        counts[shape] = len(statements)
+    assert len(response.get_json()['fees']) == 25
+    # Validator, fees and (with payments) one query for all their payments,
+    # however many fees the student has.
+    assert counts['one'] == counts['many'] == expected
+    # Without fees there are no payments to fetch.
+    assert counts['none'] == 2
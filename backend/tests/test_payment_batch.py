@@ -0,0 +1,60 @@
+from models import db, Fee
+
+
+def _statuses(body):
+    return [(row['row'], row['status'], row.get('error')) for row in body['results']]
+
+
+def test_rows_are_checked_against_running_balances(app, client, fee):
+    body = client.post('/api/payments/batch', json=[
+        {'fee_id': fee, 'amount': 600, 'reference': 'A'},
+        {'fee_id': fee, 'amount': 500, 'reference': 'B'},    # 1100 of 1000
+        {'fee_id': fee, 'amount': 400, 'reference': 'C'},    # settles it exactly
+        {'fee_id': fee, 'amount': 0.01, 'reference': 'D'},
+    ]).get_json()
+    assert _statuses(body) == [
+        (1, 'posted', None),
+        (2, 'rejected', 'Payment amount exceeds remaining fee amount'),
+        (3, 'posted', None),
+        (4, 'rejected', 'Payment amount exceeds remaining fee amount'),
+    ]
+    assert (body['posted'], body['rejected'], body['amount_posted']) == (2, 2, 1000.0)
+    with app.app_context():
+        assert db.session.get(Fee, fee).amount_paid == 1000.0
+    ledger = client.get('/api/students/1/fees?include=payments').get_json()['fees'][0]
+    assert sorted(payment['amount_paid'] for payment in ledger['payments']) == [400.0, 600.0]
+
+
+def test_references_are_posted_once(client, fee):
+    assert client.post(f'/api/fees/{fee}/payments', json={'amount': 100, 'reference': 'EARLIER'}).status_code == 201
+    rows = [
+        {'fee_id': fee, 'amount': 100, 'reference': 'EARLIER'},
+        {'fee_id': fee, 'amount': 100, 'reference': 'NEW'},
+        {'fee_id': fee, 'amount': 100, 'reference': 'NEW'},
+        {'fee_id': fee, 'amount': 100},
+    ]
+    body = client.post('/api/payments/batch', json=rows).get_json()
+    assert [status for _, status, _ in _statuses(body)] == ['duplicate', 'posted', 'duplicate', 'posted']
+    assert (body['posted'], body['duplicates'], body['amount_posted']) == (2, 2, 200.0)
+
+    # Re-uploading the file only posts the row without a reference again.
+    again = client.post('/api/payments/batch', json={'payments': rows}).get_json()
+    assert [status for _, status, _ in _statuses(again)] == ['duplicate', 'duplicate', 'duplicate', 'posted']
+
+
+def test_unusable_rows_are_rejected_without_failing_the_batch(client, fee):
+    body = client.post('/api/payments/batch', json=[
+        {'fee_id': 'x', 'amount': 10},
+        {'fee_id': fee, 'amount': -1},
+        {'fee_id': fee, 'amount': 10, 'payment_date': 'yesterday'},
+        'not an object',
+        {'fee_id': fee, 'amount': 10},
+    ]).get_json()
+    assert [status for _, status, _ in _statuses(body)] == ['rejected'] * 4 + ['posted']
+
+
+def test_csv_settlement_file(client, fee):
+    csv = 'fee_id,amount,payment_date,method,reference\n' \
+          f'{fee},250,2024-07-01,upi,UTR1\n{fee},250,2024-07-02,upi,UTR1\n'
+    body = client.post('/api/payments/batch', data=csv, content_type='text/csv').get_json()
+    assert (body['posted'], body['duplicates']) == (1, 1)
@@ -0,0 +1,50 @@
+from sqlalchemy import update
+from models import db, Fee
+from services.payments import reconcile_fee_balances
+
+
+def _paid(app, fee):
+    with app.app_context():
+        return db.session.get(Fee, fee).amount_paid
+
+
+def test_payments_update_the_stored_balance(app, client, fee):
+    assert client.post(f'/api/fees/{fee}/payments', json={'amount': 400}).status_code == 201
+    assert client.post(f'/api/fees/{fee}/payments', json={'amount': 600}).status_code == 201
+    assert _paid(app, fee) == 1000.0
+    with app.app_context():
+        assert reconcile_fee_balances(apply=False) == []
+
+
+def test_overpayment_is_refused(app, client, fee):
+    assert client.post(f'/api/fees/{fee}/payments', json={'amount': 400}).status_code == 201
+    response = client.post(f'/api/fees/{fee}/payments', json={'amount': 600.01})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Payment amount exceeds remaining fee amount'
+    assert _paid(app, fee) == 400.0
+
+
+def test_overpayment_guard_reads_the_balance_in_the_update(app, client, fee):
+    # Another worker's payment: the check is part of the UPDATE, so it
+    # compares against the balance as stored, not one read earlier.
+    with app.app_context():
+        db.session.execute(update(Fee).where(Fee.id == fee).values(amount_paid=900.0))
+        db.session.commit()
+    assert client.post(f'/api/fees/{fee}/payments', json={'amount': 200}).status_code == 400
+    assert client.post(f'/api/fees/{fee}/payments', json={'amount': 100}).status_code == 201
+    assert _paid(app, fee) == 1000.0
+
+
+def test_duplicate_reference_is_refused(app, client, fee):
+    body = {'amount': 100, 'reference': 'TXN-1'}
+    assert client.post(f'/api/fees/{fee}/payments', json=body).status_code == 201
+    response = client.post(f'/api/fees/{fee}/payments', json=body)
+    assert response.status_code == 409
+    assert response.get_json()['error'] == 'Payment reference TXN-1 has already been posted'
+    assert _paid(app, fee) == 100.0
+
+
+def test_bad_amounts_are_refused(client, fee):
+    for amount in (0, -5, 'ten', None):
+        assert client.post(f'/api/fees/{fee}/payments', json={'amount': amount}).status_code == 400
+    assert client.post('/api/fees/999/payments', json={'amount': 10}).status_code == 404
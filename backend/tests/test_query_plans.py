@@ -0,0 +1,65 @@
+import asyncio
+import json
+from datetime import date
+import pytest
+from app.asgi import create_asgi_app
+from models import db, Student, Fee, FeeType
+from services.query_plans import CHECKS, explain, full_scans
+
+
+@pytest.mark.parametrize('name, build, tables', CHECKS, ids=[name for name, _, _ in CHECKS])
+def test_query_plan_uses_indexes(app, name, build, tables):
+    with app.app_context():
+        assert full_scans(explain(build()), tables) == []
+
+
+@pytest.fixture
+def student(app):
+    with app.app_context():
+        student = Student(student_name='Asha Rao', parents_name='Ravi Rao', roll_number='R0001', class_name='5',
+                          section='A', school_joined_date=date(2024, 6, 1), date_of_birth=date(2014, 1, 1),
+                          phone_number='555-0100')
+        fee_type = FeeType(name='Tuition')
+        db.session.add_all([student, fee_type])
+        db.session.flush()
+        db.session.add(Fee(student_id=student.id, fee_type_id=fee_type.id, total_amount=1000.0,
+                           academic_year='2024-2025'))
+        db.session.commit()
+        return student.id
+
+
+def _asgi_get(asgi_app, path, query=''):
+    response = {}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = dict(message['headers'])
+        else:
+            response['body'] = response.get('body', b'') + message.get('body', b'')
+
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(),
+             'headers': [], 'client': ('127.0.0.1', 0)}
+    asyncio.run(asgi_app(scope, receive, send))
+    return response
+
+
+@pytest.mark.parametrize('path, query', [
+    ('/api/students/{id}', ''),
+    ('/api/students/{id}', 'fields=id,studentName'),
+    ('/api/students/{id}/fees', 'include=payments&academic_year=2024-2025'),
+    ('/api/fee-types', ''),
+    ('/api/fee-types', 'fields=id,name'),
+    ('/api/students', 'class=5&section=A'),
+])
+def test_async_reads_match_flask(app, client, student, path, query):
+    asgi_app = create_asgi_app('testing', {'SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI']})
+    path = path.format(id=student)
+    expected = client.get(f'{path}?{query}')
+    response = _asgi_get(asgi_app, path, query)
+    assert response['status'] == expected.status_code == 200
+    assert json.loads(response['body']) == expected.get_json()
+    assert response['headers'].get(b'etag', b'').decode() == expected.headers.get('ETag', '')
@@ -0,0 +1,58 @@
+import pytest
+from utils.ratelimit import BucketStore, parse_limits
+
+
+@pytest.fixture
+def config_overrides():
+    return {'RATELIMIT_ENABLED': True, 'RATELIMIT_STORAGE_URL': 'memory://',
+            'RATELIMIT_DEFAULT': '3 per minute', 'RATELIMIT_LOGIN': '1 per minute'}
+
+
+def test_requests_past_the_bucket_are_refused(client):
+    remaining = [client.get('/api/fee-types').headers['RateLimit-Remaining'] for _ in range(3)]
+    assert remaining == ['2', '1', '0']
+    response = client.get('/api/fee-types')
+    assert response.status_code == 429
+    assert response.get_json() == {'error': 'Too many requests, please slow down'}
+    assert response.headers['Retry-After'] == '20'
+    # Health checks are never limited.
+    assert client.get('/health').status_code == 200
+
+
+def test_login_has_a_budget_of_its_own(client):
+    body = {'email': 'nobody@school.test', 'password': 'x'}
+    assert client.post('/api/auth/login', json=body).status_code == 401
+    assert client.post('/api/auth/login', json=body).status_code == 429
+    assert client.get('/api/fee-types').status_code == 200
+
+
+def test_buckets_refill_over_their_period():
+    store = BucketStore('memory://', slots=64)
+    buckets = [('client:a', 2, 60)]
+    assert [store.acquire(buckets, now=0)[0] for _ in range(3)] == [True, True, False]
+    assert store.acquire(buckets, now=29)[0] is False
+    assert store.acquire(buckets, now=30)[0] is True
+    # Another client has a bucket of its own.
+    assert store.acquire([('client:b', 2, 60)], now=30)[0] is True
+
+
+def test_an_empty_bucket_takes_nothing_from_the_others():
+    store = BucketStore('memory://', slots=64)
+    store.acquire([('short', 1, 60)], now=0)
+    assert store.acquire([('long', 5, 60), ('short', 1, 60)], now=0)[0] is False
+    allowed, (capacity, tokens, _) = store.acquire([('long', 5, 60)], now=0)
+    assert (allowed, capacity, tokens) == (True, 5, 4)
+
+
+def test_file_store_is_shared_between_instances(tmp_path):
+    url = f'file://{tmp_path / "buckets.bin"}'
+    first, second = BucketStore(url, slots=64), BucketStore(url, slots=64)
+    assert first.acquire([('client:a', 1, 60)], now=0)[0] is True
+    assert second.acquire([('client:a', 1, 60)], now=0)[0] is False
+
+
+def test_parse_limits():
+    assert parse_limits('50 per second;3000 per minute') == [(50, 1), (3000, 60)]
+    assert parse_limits('10/5 minutes') == [(10, 300)]
+    with pytest.raises(ValueError):
+        parse_limits('lots per day')
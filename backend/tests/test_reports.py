@@ -0,0 +1,59 @@
+from datetime import date, datetime
+import pytest
+from models import db, Student, Fee, FeeType, FeePayment
+
+
+@pytest.fixture
+def fees(app):
+    """One student owing on fees raised in January, March and June 2024,
+    with a payment against the January fee in May."""
+    with app.app_context():
+        student = Student(student_name='Asha Rao', parents_name='Ravi Rao', roll_number='R0001', class_name='5',
+                          section='A', school_joined_date=date(2023, 6, 1), date_of_birth=date(2014, 1, 1),
+                          phone_number='555-0100')
+        db.session.add(student)
+        db.session.flush()
+        for number, created in enumerate((datetime(2024, 1, 10), datetime(2024, 3, 1), datetime(2024, 6, 1))):
+            fee_type = FeeType(name=f'Head {number}')
+            db.session.add(fee_type)
+            db.session.flush()
+            db.session.add(Fee(student_id=student.id, fee_type_id=fee_type.id, total_amount=100.0,
+                               amount_paid=20.0 if number == 0 else 0.0, academic_year='2023-2024',
+                               created_at=created))
+        db.session.flush()
+        january = db.session.scalar(db.select(Fee.id).order_by(Fee.created_at))
+        db.session.add(FeePayment(fee_id=january, amount_paid=20.0, payment_date=datetime(2024, 5, 1)))
+        db.session.commit()
+
+
+@pytest.mark.parametrize('aging', ['created', 'last_payment'])
+def test_historical_as_of_leaves_out_later_fees(client, fees, aging):
+    body = client.get(f'/api/reports/dues?as_of=2024-04-01&aging={aging}&group_by=class').get_json()
+    totals = body['totals']
+    # The June fee did not exist on 1 April, and the May payment had not
+    # been made yet: nothing was paid, and with last_payment the January fee
+    # ages from its creation.
+    assert totals['fees'] == 2
+    assert totals['collected'] == 0.0
+    assert totals['outstanding'] == 200.0
+    assert sum(totals['aging'].values()) == totals['outstanding']
+    assert sum(body['data'][0]['aging'].values()) == body['data'][0]['outstanding']
+
+    defaulters = client.get(f'/api/reports/defaulters?as_of=2024-04-01&aging={aging}').get_json()['data']
+    assert [(row['fees'], row['oldest_unpaid_days'], row['aging_bucket']) for row in defaulters] == [(2, 82, '61-90')]
+
+
+def test_as_of_today_covers_every_fee(client, fees):
+    totals = client.get('/api/reports/dues?as_of=2024-07-01').get_json()['totals']
+    assert totals['fees'] == 3
+    assert totals['collected'] == 20.0
+    assert sum(totals['aging'].values()) == totals['outstanding'] == 280.0
+
+
+@pytest.mark.parametrize('path', ['/api/reports/dues', '/api/reports/defaulters'])
+@pytest.mark.parametrize('limit', ['0', '-5'])
+def test_limit_below_one_is_rejected(client, path, limit):
+    response = client.get(f'{path}?limit={limit}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'limit must be at least 1'}
+
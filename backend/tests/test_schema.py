@@ -0,0 +1,25 @@
+from sqlalchemy import text
+from models import db
+
+
+def test_upgrade_installs_search_index_and_rollups(app, client):
+    # `flask db upgrade` alone must leave a database the whole API can use.
+    with app.app_context():
+        names = set(db.session.scalars(text("SELECT name FROM sqlite_master")))
+    assert {'students_fts', 'stats_class_counts', 'stats_monthly', 'stats_fee_years'} <= names
+
+    response = client.get('/api/dashboard/stats')
+    assert response.status_code == 200
+    assert response.get_json()['students']['total'] == 0
+
+
+def test_rollups_follow_writes_after_upgrade(app, client):
+    response = client.post('/api/students', json={
+        'studentName': 'Asha Rao', 'parentsName': 'Ravi Rao', 'rollNumber': 'R0001', 'class': '5',
+        'section': 'A', 'schoolJoinedDate': '2024-06-01', 'dateOfBirth': '2014-01-01', 'phoneNumber': '555-0100',
+    })
+    assert response.status_code == 201
+    assert client.get('/api/dashboard/stats').get_json()['students']['by_class'] == [
+        {'class': '5', 'section': 'A', 'count': 1}
+    ]
+    assert [row['rollNumber'] for row in client.get('/api/students?search=asha').get_json()['data']] == ['R0001']
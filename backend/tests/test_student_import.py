@@ -0,0 +1,49 @@
+import json
+
+
+def _row(number, **fields):
+    return {'studentName': f'Student {number}', 'parentsName': f'Parent {number}', 'rollNumber': f'R{number:04d}',
+            'class': '5', 'section': 'A', 'schoolJoinedDate': '2024-06-01', 'dateOfBirth': '2014-01-01',
+            'phoneNumber': '555-0100', **fields}
+
+
+def _import_ndjson(client, rows, **params):
+    body = '\n'.join(json.dumps(row) for row in rows)
+    response = client.post('/api/students/import', data=body, content_type='application/x-ndjson',
+                           query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_nested_values_are_rejected_per_row(client):
+    report = _import_ndjson(client, [_row(1), _row(2, rollNumber=['x']), _row(3, studentName={'first': 'A'})])
+    assert (report['imported'], report['rejected']) == (1, 2)
+    assert [(error['row'], error['error']) for error in report['errors']] == [
+        (2, 'Invalid value for rollNumber: expected text'),
+        (3, 'Invalid value for studentName: expected text'),
+    ]
+
+
+def test_duplicates_in_the_upload_and_the_database_are_skipped(client):
+    assert _import_ndjson(client, [_row(1)])['imported'] == 1
+    # batch_size=2 puts the repeats of R0002 in different batches.
+    report = _import_ndjson(client, [_row(1), _row(2), _row(3), _row(2), _row(4)], batch_size=2)
+    assert (report['total_rows'], report['imported'], report['rejected']) == (5, 3, 2)
+    assert sorted((error['row'], error['rollNumber'], error['error']) for error in report['errors']) == [
+        (1, 'R0001', 'Roll number already exists'),
+        (4, 'R0002', 'Duplicate roll number in upload'),
+    ]
+    assert client.get('/api/students?limit=10').get_json()['total'] == 4
+
+    # Importing the same file again changes nothing.
+    report = _import_ndjson(client, [_row(1), _row(2), _row(3), _row(4)])
+    assert (report['imported'], report['rejected']) == (0, 4)
+
+
+def test_csv_upload(client):
+    header = 'studentName,parentsName,rollNumber,class,section,schoolJoinedDate,dateOfBirth,phoneNumber'
+    lines = [header] + [','.join(str(value) for value in _row(number).values()) for number in (1, 2, 1)]
+    response = client.post('/api/students/import', data='\n'.join(lines), content_type='text/csv')
+    report = response.get_json()
+    assert (report['imported'], report['rejected']) == (2, 1)
+    assert report['errors'][0]['error'] == 'Duplicate roll number in upload'
@@ -0,0 +1,44 @@
+import pytest
+from utils.pagination import encode_cursor
+
+
+@pytest.fixture
+def students(client):
+    for number in range(1, 6):
+        response = client.post('/api/students', json={
+            'studentName': f'Student {number}', 'parentsName': f'Parent {number}', 'rollNumber': f'R{number:04d}',
+            'class': '5', 'section': 'A', 'schoolJoinedDate': '2024-06-01', 'dateOfBirth': '2014-01-01',
+            'phoneNumber': '555-0100',
+        })
+        assert response.status_code == 201
+
+
+@pytest.mark.parametrize('order', ['id', 'class'])
+def test_cursor_pages_cover_every_student(client, students, order):
+    seen, after = [], ''
+    while True:
+        body = client.get(f'/api/students?order={order}&limit=2&after={after}').get_json()
+        seen += [row['rollNumber'] for row in body['data']]
+        after = body['next_cursor']
+        if after is None:
+            break
+    assert seen == [f'R{number:04d}' for number in range(1, 6)]
+
+
+@pytest.mark.parametrize('order, values', [
+    ('id', [{'id': 1}]),
+    ('id', [[1]]),
+    ('id', ['1']),
+    ('id', [True]),
+    ('class', ['5', 'A', {'roll': 'R0001'}]),
+    ('class', ['5', 'A']),
+])
+def test_crafted_cursor_is_rejected(client, students, order, values):
+    response = client.get(f'/api/students?order={order}&after={encode_cursor(values)}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
+
+
+@pytest.mark.parametrize('limit', ['0', '-1'])
+def test_limit_below_one_is_rejected(client, students, limit):
+    assert client.get(f'/api/students?order=id&limit={limit}').status_code == 400
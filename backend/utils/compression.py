@@ -0,0 +1,116 @@
+import gzip
+import logging
+import zlib
+from flask import request
+from models.cache import ModelCache, register_cache
+
+try:
+    import brotli
+except ImportError:  # optional; responses are gzipped only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Mimetypes worth compressing; everything else (images, uploads) is sent as is.
+COMPRESSIBLE = frozenset((
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html',
+))
+
+# Bodies of responses carrying an ETag, keyed by (path, etag, encoding): the
+# ETag already names the representation, so entries never go stale and only
+# age out. Registered so /metrics reports its hits and size.
+compressed_bodies = ModelCache('compressed_bodies', ttl=300, max_entries=512)
+register_cache(compressed_bodies.name, compressed_bodies)
+
+
+class Compressor:
+    """Picks gzip or brotli from Accept-Encoding and compresses bodies.
+
+    Bodies under `min_size` bytes go out uncompressed: the framing costs
+    more than it saves. gzip output is written with mtime 0, so the same
+    body always compresses to the same bytes.
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    @staticmethod
+    def compressible(mimetype):
+        return mimetype in COMPRESSIBLE
+
+    def negotiate(self, accept, streamed=False):
+        """Best encoding `accept` (a parsed Accept-Encoding) allows, or None.
+
+        Streamed bodies are only ever gzipped.
+        """
+        return accept.best_match(('gzip',) if streamed else self.encodings)
+
+    def compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def encode(self, path, body, encoding, etag=None):
+        """`body` compressed, from compressed_bodies when `etag` is given."""
+        if etag is None:
+            return self.compress(body, encoding)
+        return compressed_bodies.get_or_load((path, etag, encoding), lambda: self.compress(body, encoding))
+
+    def stream(self, chunks):
+        """gzip `chunks` as they are produced, for streamed exports."""
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        try:
+            for chunk in chunks:
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+            yield compressor.flush()
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+
+def init_compression(app):
+    """Compress responses per COMPRESS_*; stores the compressor on app.extensions."""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return None
+    compressor = Compressor(
+        min_size=app.config.get('COMPRESS_MIN_SIZE', 1024),
+        gzip_level=app.config.get('COMPRESS_GZIP_LEVEL', 6),
+        brotli_quality=app.config.get('COMPRESS_BROTLI_QUALITY', 4),
+    )
+    compressed_bodies.configure(ttl=app.config.get('COMPRESS_CACHE_TTL'),
+                                max_entries=app.config.get('COMPRESS_CACHE_SIZE'))
+    app.extensions['compression'] = compressor
+
+    @app.after_request
+    def _compress(response):
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or not compressor.compressible(response.mimetype)):
+            return response
+        if response.is_streamed:
+            response.vary.add('Accept-Encoding')
+            encoding = compressor.negotiate(request.accept_encodings, streamed=True)
+            if encoding is None:
+                return response
+            response.response = compressor.stream(response.iter_encoded())
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < compressor.min_size:
+                return response
+            response.vary.add('Accept-Encoding')
+            encoding = compressor.negotiate(request.accept_encodings)
+            if encoding is None:
+                return response
+            etag = response.headers.get('ETag') if response.status_code == 200 else None
+            response.set_data(compressor.encode(request.path, body, encoding, etag))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return compressor
@@ -0,0 +1,50 @@
+import hashlib
+from datetime import timezone
+from flask import current_app, request
+
+# Clients may keep a copy but must revalidate it on every use, which is what
+# turns the frontend's polling into cheap 304s.
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts):
+    """Weak validator from the values that determine a representation."""
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return digest[:20]
+
+
+def _http_datetime(value):
+    if value is None:
+        return None
+    # Timestamps are stored as naive UTC; HTTP dates have whole seconds.
+    return value.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def validators_match(if_none_match, if_modified_since, etag, last_modified=None):
+    """Whether parsed request validators still match the representation.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    """
+    last_modified = _http_datetime(last_modified)
+    if if_none_match:
+        return if_none_match.contains_weak(etag)
+    if if_modified_since and last_modified is not None:
+        return last_modified <= if_modified_since
+    return False
+
+
+def not_modified(etag, last_modified=None):
+    """Return a 304 response if the request's validators still match, else None."""
+    if not validators_match(request.if_none_match, request.if_modified_since, etag, last_modified):
+        return None
+    last_modified = _http_datetime(last_modified)
+    response = current_app.response_class(status=304)
+    return add_validators(response, etag, last_modified)
+
+
+def add_validators(response, etag, last_modified=None):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = _http_datetime(last_modified)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
@@ -0,0 +1,43 @@
+from datetime import date, datetime, time, timedelta
+
+
+def parse_date_arg(args, name):
+    """`?name=YYYY-MM-DD` as a date; None when absent, ValueError when malformed."""
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a YYYY-MM-DD date')
+
+
+def parse_date_range(args, start_name, end_name):
+    """(start, end) dates from two request arguments, either may be None."""
+    start, end = parse_date_arg(args, start_name), parse_date_arg(args, end_name)
+    if start is not None and end is not None and start > end:
+        raise ValueError(f'{start_name} must not be after {end_name}')
+    return start, end
+
+
+def date_range_clauses(column, start=None, end=None):
+    """WHERE clauses for `start <= column <= end`, both days inclusive.
+
+    DateTime columns are compared against the day boundaries, so an index
+    on the column serves the range either way.
+    """
+    clauses = []
+    is_datetime = getattr(column.type, 'python_type', None) is datetime
+    if start is not None:
+        clauses.append(column >= (datetime.combine(start, time.min) if is_datetime else start))
+    if end is not None:
+        if is_datetime:
+            clauses.append(column < datetime.combine(end + timedelta(days=1), time.min))
+        else:
+            clauses.append(column <= end)
+    return clauses
+
+
+def parse_flag(args, name):
+    """`?name=true` (or 1/yes) as a bool; absent or anything else is False."""
+    return args.get(name, '').lower() in ('true', '1', 'yes')
@@ -0,0 +1,152 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from flask import g, has_request_context, request
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Incoming ids are echoed into logs, so only accept plain tokens.
+_REQUEST_ID = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+# The listener draining the queue in a background thread; kept so a
+# reconfigure (or a forked worker) can replace it.
+_listener = None
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request id, or '-' outside requests."""
+
+    def filter(self, record):
+        record.request_id = g.get('request_id', '-') if has_request_context() else '-'
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Let through only `rate` of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or self.rate >= 1.0 or random.random() < self.rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback separate from the message.
+
+    The stock prepare() folds the traceback into `msg`; keeping it in
+    exc_text lets the JSON formatter put it in its own field.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+
+def _output_handler(config):
+    path = config.get('LOG_FILE')
+    handler = logging.FileHandler(path) if path else logging.StreamHandler(sys.stderr)
+    if config.get('LOG_FORMAT') == 'json':
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(config):
+    """Set up process-wide logging from LOG_* settings.
+
+    Records are filtered and stamped with the request id in the calling
+    thread, then handed to a queue; a QueueListener thread formats and
+    writes them, so request threads never block on the stream or file.
+    Calling it again (e.g. in a forked worker, which does not inherit the
+    listener thread) replaces the previous setup.
+    """
+    global _listener
+    stop_logging()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    rate = config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)
+    if rate < 1.0:
+        queue_handler.addFilter(DebugSampler(rate))
+    root.addHandler(queue_handler)
+    root.setLevel(config.get('LOG_LEVEL', 'INFO'))
+    for name, level in (config.get('LOG_LEVELS') or {}).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, _output_handler(config), respect_handler_level=True)
+    _listener.start()
+
+
+def resolve_request_id(incoming):
+    """The caller's X-Request-ID if it is well formed, else a fresh one."""
+    return incoming if _REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+
+
+def init_logging(app):
+    """Configure logging from app.config and tag each request with an id.
+
+    The id comes from the X-Request-ID header when the caller sent a
+    usable one, and is echoed back on the response.
+    """
+    configure_logging(app.config)
+
+    @app.before_request
+    def _assign_request_id():
+        g.request_id = resolve_request_id(request.headers.get(REQUEST_ID_HEADER, ''))
+
+    @app.after_request
+    def _echo_request_id(response):
+        if 'request_id' in g:
+            response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
+
+
+atexit.register(stop_logging)
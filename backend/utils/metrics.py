@@ -0,0 +1,220 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# [queries, db seconds] for the request being handled in this context, or
+# None outside of requests (CLI commands, startup).
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # Buckets are "less than or equal", as Prometheus expects.
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class RequestMetrics:
+    """Per-process request counters and histograms, keyed by endpoint.
+
+    Labels are the blueprint, the endpoint name and the method, never the
+    raw path, so the number of series stays bounded by the route table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}       # (blueprint, endpoint, method, status) -> count
+        self.latency = {}        # (blueprint, endpoint, method) -> Histogram
+        self.queries = {}        # (blueprint, endpoint, method) -> Histogram
+        self.db_seconds = {}     # (blueprint, endpoint, method) -> float
+        self.response_size = {}  # (blueprint, endpoint, method) -> Histogram
+
+    def record(self, key, status, seconds, queries, db_seconds, size):
+        with self._lock:
+            status_key = key + (status,)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.queries[key] = Histogram(QUERY_BUCKETS)
+                self.response_size[key] = Histogram(SIZE_BUCKETS)
+                self.db_seconds[key] = 0.0
+            self.latency[key].observe(seconds)
+            self.queries[key].observe(queries)
+            self.db_seconds[key] += db_seconds
+            if size is not None:
+                self.response_size[key].observe(size)
+
+    def snapshot(self):
+        with self._lock:
+            copy = lambda histograms: {
+                key: (histogram.bounds, list(histogram.counts), histogram.total, histogram.count)
+                for key, histogram in histograms.items()
+            }
+            return {
+                'requests': dict(self.requests),
+                'latency': copy(self.latency),
+                'queries': copy(self.queries),
+                'db_seconds': dict(self.db_seconds),
+                'response_size': copy(self.response_size),
+            }
+
+
+request_metrics = RequestMetrics()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if _request_stats.get() is not None:
+        conn.info['query_started'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    started = conn.info.pop('query_started', None)
+    if stats is not None and started is not None:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+
+
+def init_metrics(app):
+    """Time every request and count the SQL it runs.
+
+    Requests issuing more than METRICS_QUERY_WARN_THRESHOLD statements are
+    logged as warnings, which is how N+1 patterns show up.
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def _start_request_metrics():
+        request.environ['metrics.started'] = time.perf_counter()
+        request.environ['metrics.token'] = _request_stats.set([0, 0.0])
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = request.environ.pop('metrics.started', None)
+        token = request.environ.pop('metrics.token', None)
+        if started is None:
+            return response
+        stats = _request_stats.get() or [0, 0.0]
+        if token is not None:
+            _request_stats.reset(token)
+
+        endpoint = request.endpoint or 'unmatched'
+        key = (request.blueprint or '', endpoint, request.method)
+        # Streamed bodies have no length yet; only sized responses are observed.
+        size = response.calculate_content_length() if not response.is_streamed else None
+        request_metrics.record(
+            key, response.status_code, time.perf_counter() - started, stats[0], stats[1], size
+        )
+        threshold = current_app.config.get('METRICS_QUERY_WARN_THRESHOLD')
+        if threshold and stats[0] > threshold:
+            logger.warning(
+                "%s %s (%s) ran %d queries, over the threshold of %d",
+                request.method, request.path, endpoint, stats[0], threshold
+            )
+        return response
+
+    @app.teardown_request
+    def _discard_request_metrics(exc):
+        # after_request is skipped when a view raises; don't leave this
+        # request's counters installed for whatever runs next on the thread.
+        token = request.environ.pop('metrics.token', None)
+        if token is not None:
+            _request_stats.reset(token)
+
+
+def _labels(names, values):
+    pairs = ','.join(
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in zip(names, values)
+    )
+    return '{%s}' % pairs if pairs else ''
+
+
+def _histogram_lines(name, label_names, histograms):
+    lines = []
+    for key, (bounds, counts, total, count) in sorted(histograms.items()):
+        cumulative = 0
+        for bound, bucket_count in zip(bounds + ('+Inf',), counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{_labels(label_names + ("le",), key + (bound,))} {cumulative}')
+        lines.append(f'{name}_sum{_labels(label_names, key)} {total}')
+        lines.append(f'{name}_count{_labels(label_names, key)} {count}')
+    return lines
+
+
+def render_metrics(extra_counters=None, extra_histograms=None):
+    """Prometheus text exposition (format 0.0.4) of this process's metrics.
+
+    `extra_counters` maps metric name -> (type, help, {((label, value), ...): sample}).
+    `extra_histograms` maps metric name -> (help, label names,
+    {label values: (bounds, counts, total, count)}).
+    """
+    snapshot = request_metrics.snapshot()
+    names = ('blueprint', 'endpoint', 'method')
+    lines = [
+        '# HELP http_requests_total Requests handled, by endpoint and status.',
+        '# TYPE http_requests_total counter',
+    ]
+    for key, count in sorted(snapshot['requests'].items()):
+        lines.append(f'http_requests_total{_labels(names + ("status",), key)} {count}')
+
+    lines += [
+        '# HELP http_request_duration_seconds Time from routing to response, by endpoint.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    lines += _histogram_lines('http_request_duration_seconds', names, snapshot['latency'])
+
+    lines += [
+        '# HELP http_request_queries SQL statements executed per request.',
+        '# TYPE http_request_queries histogram',
+    ]
+    lines += _histogram_lines('http_request_queries', names, snapshot['queries'])
+
+    lines += [
+        '# HELP http_request_db_seconds_total Time spent executing SQL, by endpoint.',
+        '# TYPE http_request_db_seconds_total counter',
+    ]
+    for key, seconds in sorted(snapshot['db_seconds'].items()):
+        lines.append(f'http_request_db_seconds_total{_labels(names, key)} {seconds}')
+
+    lines += [
+        '# HELP http_response_size_bytes Response body size, excluding streamed responses.',
+        '# TYPE http_response_size_bytes histogram',
+    ]
+    lines += _histogram_lines('http_response_size_bytes', names, snapshot['response_size'])
+
+    for name, (metric_type, help_text, samples) in (extra_counters or {}).items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels, value in sorted(samples.items()):
+            lines.append(f'{name}{_labels([label for label, _ in labels], [v for _, v in labels])} {value}')
+
+    for name, (help_text, label_names, histograms) in (extra_histograms or {}).items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        lines += _histogram_lines(name, tuple(label_names), histograms)
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,27 @@
+import base64
+import json
+
+TOTAL_MODES = ('exact', 'cached', 'off')
+
+
+def encode_cursor(values):
+    """Pack the sort key of the last row on a page into an opaque token."""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, types):
+    """Inverse of encode_cursor for a sort key of `types` (python types of
+    the key columns, e.g. (int,) or (str, str, str)); raises ValueError for
+    tampered or stale tokens, so nothing but those values gets bound."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError('Invalid cursor')
+    for value, expected in zip(values, types):
+        if value is not None and type(value) is not expected:
+            raise ValueError('Invalid cursor')
+    return values
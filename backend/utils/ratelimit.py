@@ -0,0 +1,275 @@
+import hashlib
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from flask import jsonify, request
+
+try:
+    import fcntl
+except ImportError:  # Windows: file storage falls back to per-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# One bucket per slot: key hash (0 = empty), tokens left, time of last update.
+SLOT = struct.Struct('<Qdd')
+# Slots examined for a key before the least recently used one is reused.
+PROBES = 8
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_LIMIT = re.compile(r'^\s*(\d+)\s*(?:per|/)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$', re.IGNORECASE)
+
+# Response headers browsers may read cross-origin.
+EXPOSED_HEADERS = ('Retry-After', 'RateLimit-Limit', 'RateLimit-Remaining', 'RateLimit-Reset')
+
+# Endpoints that are never limited (health checks and scrapes).
+EXEMPT_ENDPOINTS = frozenset(('debug.health_check', 'debug.metrics'))
+
+
+def parse_limits(spec):
+    """'200 per day;50 per hour' -> [(200, 86400), (50, 3600)]."""
+    limits = []
+    for part in filter(str.strip, (spec or '').split(';')):
+        match = _LIMIT.match(part)
+        if match is None:
+            raise ValueError(f'Invalid rate limit: {part!r}')
+        amount, multiplier, unit = match.groups()
+        limits.append((int(amount), int(multiplier or 1) * _PERIODS[unit.lower()]))
+    return limits
+
+
+def _key(name):
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'little') or 1
+
+
+class BucketStore:
+    """Fixed-size hash table of token buckets in memory or in a shared file.
+
+    With `file:///path` the table is mmap'd, so every worker on the host
+    reads and updates the same buckets; a check holds the file lock (flock)
+    for a few struct reads and writes. `memory://` keeps the table in the
+    process, for development and single-worker servers. Keys are hashed to
+    a slot and probed linearly; when the probed slots are all taken the
+    least recently updated bucket is reused, which only ever hands its
+    owner a fresh, full bucket.
+    """
+
+    def __init__(self, url='memory://', slots=65536):
+        self.url = url
+        self.slots = slots
+        self.size = slots * SLOT.size
+        self.path = url[len('file://'):] if url.startswith('file://') else None
+        if self.path is None and not url.startswith('memory://'):
+            raise ValueError(f'Unsupported RATELIMIT_STORAGE_URL: {url!r}')
+        self._lock = threading.Lock()
+        self._buffer = bytearray(self.size) if self.path is None else None
+        self._fd = None
+        self._pid = None
+
+    def _open(self):
+        # flock is held per open file, so each process opens its own; a
+        # descriptor inherited across fork would not exclude the parent.
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size != self.size:
+                # New file, or one sized for another slot count: start empty.
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self.size)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        self._buffer = mmap.mmap(fd, self.size)
+        self._fd = fd
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if self.path is None:
+                yield self._buffer
+                return
+            if self._pid != os.getpid():
+                self._open()
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield self._buffer
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _find(self, buffer, key):
+        start = key % self.slots
+        victim, oldest = start, math.inf
+        for probe in range(PROBES):
+            index = (start + probe) % self.slots
+            slot_key, tokens, updated = SLOT.unpack_from(buffer, index * SLOT.size)
+            if slot_key == key:
+                return index, tokens, updated
+            if slot_key == 0:
+                return index, None, None
+            if updated < oldest:
+                victim, oldest = index, updated
+        return victim, None, None
+
+    def acquire(self, buckets, now=None):
+        """Take one token from every bucket, or from none if any is empty.
+
+        `buckets` is a list of (name, capacity, period); a bucket holds up to
+        `capacity` tokens and refills at capacity/period per second. Returns
+        (allowed, state) where state is (capacity, tokens, rate) of the
+        bucket with the fewest tokens, for the response headers.
+        """
+        now = time.time() if now is None else now
+        states = []
+        with self._locked() as buffer:
+            for name, capacity, period in buckets:
+                key = _key(name)
+                rate = capacity / period
+                index, tokens, updated = self._find(buffer, key)
+                if tokens is None:
+                    tokens = float(capacity)
+                else:
+                    tokens = min(float(capacity), tokens + max(0.0, now - updated) * rate)
+                # Written now so a later bucket in this call can't claim the slot.
+                SLOT.pack_into(buffer, index * SLOT.size, key, tokens, now)
+                states.append((index, key, capacity, tokens, rate))
+            allowed = all(tokens >= 1 for _, _, _, tokens, _ in states)
+            if allowed:
+                for index, key, _, tokens, _ in states:
+                    SLOT.pack_into(buffer, index * SLOT.size, key, tokens - 1, now)
+        _, _, capacity, tokens, rate = min(states, key=lambda state: state[3])
+        return allowed, (capacity, tokens - 1 if allowed else tokens, rate)
+
+
+class RateLimiter:
+    """Token-bucket limits per client, per user and per expensive route.
+
+    Every request spends from RATELIMIT_DEFAULT twice over: once for its
+    client address and, when it carries a valid access token, once for the
+    user. Searches, exports and logins also spend from their own budget
+    (RATELIMIT_SEARCH, RATELIMIT_EXPORT, RATELIMIT_LOGIN), kept per user
+    when known and per client otherwise. Each "N per period" part is its
+    own bucket of N tokens refilling over the period, so it allows bursts of
+    N and sustains N/period.
+    """
+
+    def __init__(self, store, default, budgets):
+        self.store = store
+        self.default = default
+        self.budgets = budgets
+        self.rejected = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def budget_for(req):
+        if req.endpoint in ('auth.login', 'auth.register'):
+            return 'login'
+        if req.blueprint == 'export':
+            return 'export'
+        if req.endpoint == 'students.get_students' and req.args.get('search'):
+            return 'search'
+        return None
+
+    @staticmethod
+    def _user(req):
+        header = req.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return None
+        from flask_jwt_extended import decode_token
+        try:
+            return decode_token(header[len('Bearer '):]).get('sub')
+        except Exception:
+            # Invalid or expired: the route will say so; limit by client.
+            return None
+
+    def buckets_for(self, req):
+        client = f'client:{req.remote_addr}'
+        user = self._user(req)
+        owners = [client] if user is None else [client, f'user:{user}']
+        buckets = [(f'default:{owner}:{i}', capacity, period)
+                   for owner in owners for i, (capacity, period) in enumerate(self.default)]
+        budget = self.budget_for(req)
+        if budget in self.budgets:
+            owner = client if budget == 'login' or user is None else f'user:{user}'
+            buckets += [(f'{budget}:{owner}:{i}', capacity, period)
+                        for i, (capacity, period) in enumerate(self.budgets[budget])]
+        return buckets, budget
+
+    def check(self, req):
+        buckets, budget = self.buckets_for(req)
+        if not buckets:
+            return True, None
+        allowed, state = self.store.acquire(buckets)
+        if not allowed:
+            with self._lock:
+                name = budget or 'default'
+                self.rejected[name] = self.rejected.get(name, 0) + 1
+        return allowed, state
+
+    def stats(self):
+        with self._lock:
+            return dict(self.rejected)
+
+
+def rate_limit_headers(state):
+    capacity, tokens, rate = state
+    headers = {
+        'RateLimit-Limit': str(capacity),
+        'RateLimit-Remaining': str(max(0, int(tokens))),
+        'RateLimit-Reset': str(math.ceil((capacity - tokens) / rate)),
+    }
+    if tokens < 1:
+        headers['Retry-After'] = str(max(1, math.ceil((1 - tokens) / rate)))
+    return headers
+
+
+def init_ratelimit(app):
+    """Enforce RATELIMIT_* on every request; stores the limiter on app.extensions."""
+    if not app.config.get('RATELIMIT_ENABLED', True):
+        return None
+    budgets = {name: parse_limits(app.config.get(f'RATELIMIT_{name.upper()}'))
+               for name in ('search', 'export', 'login')}
+    limiter = RateLimiter(
+        BucketStore(app.config.get('RATELIMIT_STORAGE_URL', 'memory://'),
+                    app.config.get('RATELIMIT_SLOTS', 65536)),
+        parse_limits(app.config.get('RATELIMIT_DEFAULT')),
+        {name: limits for name, limits in budgets.items() if limits},
+    )
+    app.extensions['ratelimit'] = limiter
+
+    @app.before_request
+    def _check_rate_limit():
+        if request.method == 'OPTIONS' or request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+        try:
+            # The real object, not the proxy: the checks read it a dozen times.
+            allowed, state = limiter.check(request._get_current_object())
+        except OSError as e:
+            # A broken store must not take the API down with it.
+            logger.error("Rate limit check failed: %s", e, exc_info=True)
+            return None
+        if state is None:
+            return None
+        request.environ['ratelimit.state'] = state
+        if not allowed:
+            logger.info("Rate limited %s %s from %s", request.method, request.path, request.remote_addr)
+            return jsonify({'error': 'Too many requests, please slow down'}), 429
+
+    @app.after_request
+    def _rate_limit_headers(response):
+        state = request.environ.pop('ratelimit.state', None)
+        if state is not None:
+            response.headers.update(rate_limit_headers(state))
+        return response
+
+    return limiter
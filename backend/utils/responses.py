@@ -0,0 +1,39 @@
+import json
+from flask import current_app, jsonify
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+
+def _dumps_stdlib(payload):
+    # Same arguments Flask's DefaultJSONProvider uses for compact output.
+    return json.dumps(payload, sort_keys=True, ensure_ascii=True, separators=(',', ':')).encode('ascii')
+
+
+if orjson is not None:
+    def dumps(payload):
+        body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        # orjson writes non-ASCII as raw UTF-8 where jsonify escapes it;
+        # fall back so the bytes stay identical.
+        if not body.isascii():
+            return _dumps_stdlib(payload)
+        return body
+else:
+    dumps = _dumps_stdlib
+
+
+def json_response(payload, status=200):
+    """Drop-in for `jsonify(payload), status` on plain dicts/lists/scalars.
+
+    Produces the same bytes as jsonify in compact mode; when the app pretty
+    prints (debug, or JSON compact disabled) it defers to jsonify.
+    """
+    provider = current_app.json
+    if getattr(provider, 'compact', None) is False or (
+            getattr(provider, 'compact', None) is None and current_app.debug):
+        response = jsonify(payload)
+        response.status_code = status
+        return response
+    return current_app.response_class(dumps(payload) + b'\n', status=status, mimetype='application/json')
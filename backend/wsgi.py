@@ -1,6 +1,8 @@
+import os
 from app import create_app
 
 app = create_app()
 
 if __name__ == '__main__':
-    app.run()
+    # Development server; production runs `gunicorn -c gunicorn.conf.py`.
+    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 8080)), debug=app.config['DEBUG'])
@@ -0,0 +1,42 @@
+export interface ClassCount {
+    class: string;
+    section: string;
+    count: number;
+}
+
+export interface MonthlyRevenue {
+    month: string;  // YYYY-MM
+    revenue: number;
+    payment_count: number;
+}
+
+export interface AcademicYearDues {
+    academic_year: string;
+    fee_count: number;
+    billed: number;
+    collected: number;
+    outstanding: number;
+}
+
+export interface DashboardStats {
+    students: {
+        total: number;
+        by_class: ClassCount[];
+        joined_this_month: number;
+        joined_last_month: number;
+        change_percent: number | null;
+    };
+    revenue: {
+        current_month: string;
+        current: number;
+        previous: number;
+        change_percent: number | null;
+        monthly: MonthlyRevenue[];
+    };
+    dues: {
+        billed: number;
+        collected: number;
+        outstanding: number;
+        by_academic_year: AcademicYearDues[];
+    };
+}
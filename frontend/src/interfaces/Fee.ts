@@ -13,6 +13,7 @@ export interface FeePayment {
     payment_date: string;
     payment_method: string;
     remarks: string | null;
+    reference: string | null;
     created_at: string;
     updated_at: string | null;
 }
@@ -29,7 +30,11 @@ export interface Fee {
     student_name: string;
     roll_number: string;
     class_name: string;
-    payments: FeePayment[];
+    payment_count: number;
+    last_payment_date: string | null;
+    fee_type: FeeType;
+    // Only present when requested with ?include=payments
+    payments?: FeePayment[];
     created_at: string;
     updated_at: string | null;
 }
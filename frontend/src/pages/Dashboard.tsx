@@ -1,9 +1,9 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   UserGroupIcon,
-  AcademicCapIcon,
   CurrencyDollarIcon,
-  BookOpenIcon,
+  ExclamationCircleIcon,
+  BanknotesIcon,
 } from '@heroicons/react/24/outline';
 import { Line } from 'react-chartjs-2';
 import {
@@ -16,6 +16,8 @@ import {
   Tooltip,
   Legend,
 } from 'chart.js';
+import { DashboardStats } from '../interfaces/Dashboard';
+import { dashboardServices } from '../services/dashboardServices';
 
 ChartJS.register(
   CategoryScale,
@@ -27,33 +29,41 @@ ChartJS.register(
   Legend
 );
 
-const stats = [
+const formatNumber = (value: number) => new Intl.NumberFormat('en-US').format(value);
+
+const formatCurrency = (value: number) =>
+  new Intl.NumberFormat('en-US', { style: 'currency', currency: 'USD' }).format(value);
+
+const formatChange = (change: number | null) =>
+  change === null ? '' : `${change >= 0 ? '+' : ''}${change.toFixed(2)}%`;
+
+const buildStatCards = (data: DashboardStats) => [
   {
     name: 'Total Students',
-    stat: '1,200',
+    stat: formatNumber(data.students.total),
     icon: UserGroupIcon,
-    change: '+4.75%',
-    changeType: 'increase',
-  },
-  {
-    name: 'Total Staff',
-    stat: '85',
-    icon: AcademicCapIcon,
-    change: '+2.35%',
-    changeType: 'increase',
+    change: formatChange(data.students.change_percent),
+    changeType: (data.students.change_percent ?? 0) >= 0 ? 'increase' : 'decrease',
   },
   {
     name: 'Revenue (Monthly)',
-    stat: '$48,352',
+    stat: formatCurrency(data.revenue.current),
     icon: CurrencyDollarIcon,
-    change: '+3.2%',
+    change: formatChange(data.revenue.change_percent),
+    changeType: (data.revenue.change_percent ?? 0) >= 0 ? 'increase' : 'decrease',
+  },
+  {
+    name: 'Outstanding Dues',
+    stat: formatCurrency(data.dues.outstanding),
+    icon: ExclamationCircleIcon,
+    change: '',
     changeType: 'increase',
   },
   {
-    name: 'Library Books',
-    stat: '3,450',
-    icon: BookOpenIcon,
-    change: '+2.8%',
+    name: 'Collected (All Years)',
+    stat: formatCurrency(data.dues.collected),
+    icon: BanknotesIcon,
+    change: '',
     changeType: 'increase',
   },
 ];
@@ -83,7 +93,42 @@ const options = {
   },
 };
 
+const revenueOptions = {
+  responsive: true,
+  plugins: {
+    legend: {
+      position: 'top' as const,
+    },
+    title: {
+      display: true,
+      text: 'Monthly Fee Collection',
+    },
+  },
+};
+
 export default function Dashboard() {
+  const [data, setData] = useState<DashboardStats | null>(null);
+
+  useEffect(() => {
+    dashboardServices
+      .getStats()
+      .then(setData)
+      .catch((error) => console.error('Error loading dashboard:', error));
+  }, []);
+
+  const stats = data ? buildStatCards(data) : [];
+  const revenueData = {
+    labels: data ? data.revenue.monthly.map((month) => month.month) : [],
+    datasets: [
+      {
+        label: 'Collected',
+        data: data ? data.revenue.monthly.map((month) => month.revenue) : [],
+        borderColor: 'rgb(34, 197, 94)',
+        backgroundColor: 'rgba(34, 197, 94, 0.5)',
+      },
+    ],
+  };
+
   return (
     <div>
       <div className="mb-6">
@@ -123,9 +168,35 @@ export default function Dashboard() {
 
       {/* Charts */}
       <div className="mt-8 grid grid-cols-1 gap-5 lg:grid-cols-2">
+        <div className="rounded-lg bg-white p-6 shadow">
+          <Line options={revenueOptions} data={revenueData} />
+        </div>
         <div className="rounded-lg bg-white p-6 shadow">
           <Line options={options} data={attendanceData} />
         </div>
+        <div className="rounded-lg bg-white p-6 shadow">
+          <h3 className="text-lg font-medium leading-6 text-gray-900">
+            Students by Class
+          </h3>
+          <table className="mt-4 min-w-full divide-y divide-gray-200">
+            <thead>
+              <tr>
+                <th className="py-2 text-left text-sm font-medium text-gray-500">Class</th>
+                <th className="py-2 text-left text-sm font-medium text-gray-500">Section</th>
+                <th className="py-2 text-right text-sm font-medium text-gray-500">Students</th>
+              </tr>
+            </thead>
+            <tbody className="divide-y divide-gray-200">
+              {data?.students.by_class.map((row) => (
+                <tr key={`${row.class}-${row.section}`}>
+                  <td className="py-2 text-sm text-gray-900">{row.class}</td>
+                  <td className="py-2 text-sm text-gray-900">{row.section}</td>
+                  <td className="py-2 text-right text-sm text-gray-900">{formatNumber(row.count)}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
         <div className="rounded-lg bg-white p-6 shadow">
           <h3 className="text-lg font-medium leading-6 text-gray-900">
             Recent Activities
@@ -127,8 +127,8 @@ const FeePage: React.FC = () => {
                             {formatCurrency(fee.remaining_amount)}
                           </td>
                           <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
-                            {fee.payments.length > 0 
-                              ? formatDate(fee.payments[0].payment_date)
+                            {fee.last_payment_date
+                              ? formatDate(fee.last_payment_date)
                               : 'No payments'}
                           </td>
                           <td className="px-6 py-4 whitespace-nowrap text-sm font-medium space-x-2">
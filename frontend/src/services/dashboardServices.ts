@@ -0,0 +1,25 @@
+import axios from 'axios';
+import { DashboardStats } from '../interfaces/Dashboard';
+
+const API_URL = 'http://localhost:8080/api';
+
+const axiosInstance = axios.create({
+    baseURL: API_URL,
+    headers: {
+        'Accept': 'application/json'
+    },
+    withCredentials: true
+});
+
+export const dashboardServices = {
+    // Get dashboard statistics
+    async getStats(): Promise<DashboardStats> {
+        try {
+            const response = await axiosInstance.get('/dashboard/stats');
+            return response.data;
+        } catch (error: any) {
+            console.error('Error fetching dashboard stats:', error.response?.data || error.message);
+            throw error;
+        }
+    }
+};
@@ -9,8 +9,11 @@ fi
 cd backend
 pip install -r requirements.txt || { echo "Failed to install Python packages"; exit 1; }
 
+# Create or update the schema
+flask --app wsgi db upgrade || { echo "Database setup failed"; exit 1; }
+
 # Start the backend server
-python3 app.py &
+python3 wsgi.py &
 BACKEND_PID=$!
 
 # Check if backend started successfully